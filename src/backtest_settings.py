@@ -3,8 +3,11 @@ from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 import strategies
 
 # --- MODE SELECTION ---
-# Options: "SINGLE" (Runs one specific ticker) 
-#          "BATCH"  (Runs the full list below)
+# Options: "SINGLE"   (Runs one specific ticker) 
+#          "BATCH"    (Runs the full list below)
+#          "OPTIMIZE" (Sweeps the strategy's param_space on SINGLE_SYMBOL)
+#          "WALK_FORWARD" (Rolling optimize-then-test folds on SINGLE_SYMBOL)
+#          "CPCV"     (Combinatorial purged cross-validation + overfitting probability)
 
 RUN_MODE = "BATCH"
 
@@ -20,11 +23,70 @@ START_DATE = datetime(2023, 12, 1)
 END_DATE   = datetime(2026, 1, 1)
 
 TIMEFRAME  = TimeFrame(1, TimeFrameUnit.Hour) # Minute, Hour, Day, Week, Month
+# SINGLE/BATCH also fetch the bars the strategy's indicators need before
+# START_DATE (its max_lookback(), else measured), so it trades from START_DATE on
+# and stats cover START_DATE..END_DATE. False: indicators warm up inside the range.
+WARMUP     = True
+
+# --- DATA STORE ---
+# Bars are cached in data/parquet/{symbol}/{timeframe}/year=YYYY/ (older single-file
+# caches are migrated on first use). Codec: "zstd" (smaller), "snappy" (faster), ...
+PARQUET_COMPRESSION = "zstd"
+# CSV copy of the data in data/csv, written in the background: "off", "on" or "gzip"
+CSV_BACKUP = "on"
+# Frames loaded in this run are kept in memory (MB) for later strategies, rounds
+# or ranges inside them on the same symbol; 0 = off
+FRAME_CACHE_MB = 1024
+# Timeframes other than 1Min built from the stored minute bars instead of downloaded
+# (data/derived, rebuilt when the minutes change): "auto" = when the stored minutes
+# already cover the requested range, "always" = download minutes if needed, "never"
+DERIVE_BARS = "auto"
+# Bars are served from memory-mapped snapshots of the store (data/mmap, rebuilt when
+# it changes): loading costs ~nothing and the OS shares the pages. "float64",
+# "float32" (half the memory, ~7 significant digits) or "off" (read Parquet)
+MMAP_FRAMES = "float64"
+
+# --- DOWNLOADS ---
+# Missing bars are fetched in requests of up to SYMBOLS_PER_REQUEST symbols x one
+# date chunk, DOWNLOAD_WORKERS at a time, under API_RATE_LIMIT requests per minute
+# (Alpaca's free plan allows 200). BATCH downloads every symbol's gaps this way first.
+DOWNLOAD_WORKERS    = 4
+SYMBOLS_PER_REQUEST = 50
+API_RATE_LIMIT      = 180
 
 # --- ACCOUNT SETTINGS ---
 INITIAL_CASH = 50000
 COMMISSION   = (0.35, 0.001)  # (Minimum $0.35 per trade, or 0.1% volume)
 
+# --- PARALLEL BATCH ---
+# Worker processes for BATCH mode: 1 = sequential, None = one per CPU core
+BATCH_WORKERS  = 1
+SYMBOL_TIMEOUT = 600   # Seconds before a symbol's worker is killed (None = no limit)
+SHARED_DATA    = False # True: parent loads data once into shared memory, workers attach zero-copy
+
+# With BATCH_WORKERS = 1, symbols flow through a load -> backtest -> report
+# pipeline of threads: the next BATCH_PREFETCH symbols load while one simulates,
+# and reports are written behind it. Loaded frames waiting in the pipeline are
+# capped at PREFETCH_MB. 0 = one symbol at a time, start to finish.
+BATCH_PREFETCH = 2
+PREFETCH_MB    = 2048
+
+# --- INDICATOR CACHE ---
+# Indicator results are memoized by (function, arguments, data contents), so runs
+# that only differ in non-indicator parameters (stops, thresholds) skip recomputing.
+INDICATOR_CACHE      = True
+INDICATOR_CACHE_MB   = 512     # In-memory LRU budget per process
+INDICATOR_CACHE_DISK = False   # Also keep results in data/indicator_cache (survives restarts)
+
+# --- OUT-OF-CORE RUNS ---
+# SINGLE/BATCH stream the stored history in slices of CHUNK_BARS bars instead of
+# loading it whole (multi-year minute data), so memory doesn't grow with the
+# history. Needs a strategy with signals(); others run in memory as usual.
+# No HTML chart: equity curve and trades are written to CSV slice by slice.
+CHUNKED           = False
+CHUNK_BARS        = 100_000
+CHUNK_WARMUP_BARS = 2_000   # Bars re-read before each slice; recursive indicators (EMA, RSI, MACD) need plenty
+
 # --- STRATEGY ---
 ACTIVE_STRATEGY = strategies.LrcReversion
 
@@ -36,3 +98,37 @@ STRATEGY_PARAMS = {
     # "stop_loss_pct": 0.03
 }
 
+# --- OPTIMIZATION (RUN_MODE = "OPTIMIZE") ---
+# Searches the `param_space` declared on ACTIVE_STRATEGY. STRATEGY_PARAMS entries
+# that aren't part of the space stay fixed during the sweep.
+OPTIMIZE_METRIC    = "Sharpe Ratio"  # Any Backtest stat, e.g. "Return [%]"
+OPTIMIZE_TOP_N     = 20              # Rows kept in the *_top.csv file
+OPTIMIZE_WORKERS   = None            # None = one per CPU core
+OPTIMIZE_MAX_TRIES = None            # Random (seeded) subset of the grid if set
+FAST_PATH          = True            # Vectorized engine for strategies with signals() (same results)
+
+# "GRID"    : every combination on the full history
+# "HALVING" : successive halving - all combinations on a short prefix, only the
+#             best 1/HALVING_ETA move on to a longer one, until the full history
+OPTIMIZE_METHOD  = "GRID"
+HALVING_ETA      = 3
+HALVING_MIN_BARS = 500   # Shortest prefix; must cover indicator warm-up + a few trades
+
+# --- WALK-FORWARD (RUN_MODE = "WALK_FORWARD") ---
+# Each fold optimizes (full grid, OPTIMIZE_METRIC) on its train window and trades
+# the winner on the following test window. Folds run in parallel (OPTIMIZE_WORKERS).
+WF_TRAIN_BARS = 2000
+WF_TEST_BARS  = 500
+WF_ANCHORED   = False   # True: train windows all start at the first bar and grow
+
+
+# --- CPCV (RUN_MODE = "CPCV") ---
+# The history is cut into CPCV_GROUPS blocks; every choice of CPCV_TEST_GROUPS
+# blocks is one out-of-sample split. Train bars right before a test block (purge)
+# and right after one (embargo) are dropped to avoid lookahead through indicators
+# and open trades. Reports PBO: the probability that the in-sample winner ranks
+# at or below the out-of-sample median.
+CPCV_GROUPS       = 10
+CPCV_TEST_GROUPS  = 2
+CPCV_PURGE_BARS   = 50
+CPCV_EMBARGO_BARS = 20
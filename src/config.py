@@ -9,6 +9,9 @@ DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 PARQUET_DIR = os.path.join(DATA_DIR, "parquet")
 CSV_DIR = os.path.join(DATA_DIR, "csv")
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
+INDICATOR_CACHE_DIR = os.path.join(DATA_DIR, "indicator_cache")  # Only created if the disk cache is on
+DERIVED_DIR = os.path.join(DATA_DIR, "derived")  # Bars resampled from stored minutes (core.resample)
+MMAP_DIR = os.path.join(DATA_DIR, "mmap")  # Memory-mapped snapshots of the bars (core.mmap_store)
 
 # Alpaca API CREDENTIALS
 load_dotenv(DOTENV_PATH)
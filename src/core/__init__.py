@@ -1,2 +1,13 @@
-from .data_manager import DataManager
-from .report_manager import ReportGenerator
+import importlib
+
+# Imported on first use: data_manager reads config (API keys), which modules
+# such as core.vector_backtest or core.market_calendar don't need.
+_LAZY = {
+    "DataManager": ".data_manager",
+    "ReportGenerator": ".report_manager",
+}
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_LAZY[name], __name__), name)
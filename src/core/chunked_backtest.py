@@ -0,0 +1,135 @@
+import os
+import numpy as np
+import pandas as pd
+
+from core.metrics import RunningMetrics
+from core.vector_backtest import VectorBacktest, _Book
+from indicators import cache as indicator_cache
+
+# Out-of-core runs: a history too long to hold at once (years of minute bars)
+# arrives as consecutive frames, e.g. DataManager.iter_data(), and is simulated
+# one frame at a time on the vectorized fast path.
+#
+# - indicators: each frame is prefixed with the last bars of the one before
+#   (the warm-up overlap) and the strategy's signals() are recomputed on it, so
+#   windowed indicators (SMA, Bollinger, LRC, ...) have exactly the values of a
+#   full run from the overlap's end on. Recursive ones (EMA, MACD, SAR) only
+#   converge to them; give those a long warmup_bars.
+# - broker: cash, an open trade and an order decided on a frame's last bar are
+#   carried to the next frame (vector_backtest._Book), so trades cross frame
+#   boundaries exactly as in a full run.
+# - results: equity and closed trades are appended to CSV files frame by frame,
+#   and the summary metrics are reduced on the fly (metrics.RunningMetrics).
+# Memory is bounded by the frame size plus the overlap, whatever the history length.
+
+_TRADE_COLUMNS = ['Size', 'EntryBar', 'ExitBar', 'EntryPrice', 'ExitPrice', 'SL', 'PnL', 'Commission']
+
+class ChunkedBacktest:
+    """
+    VectorBacktest over a history given as an iterable of consecutive
+    DataFrames (no overlap between them; the warm-up overlap is added here).
+    `run(**params)` returns the same headline stats as VectorBacktest.run();
+    instead of '_equity_curve'/'_trades' it has '_equity_path'/'_trades_path'
+    (the CSV files written, if paths were given) and 'Chunks'.
+
+    warmup_bars: minimum overlap carried from one frame to the next; at least
+    the slowest indicator's warm-up (+2) is always carried.
+    """
+
+    def __init__(self, chunks, strategy, *, cash=10_000, commission=.0, finalize_trades=False,
+                 warmup_bars=1_000, equity_path=None, trades_path=None):
+        self._chunks = chunks
+        self._strategy = strategy
+        self._bt_kwargs = dict(cash=cash, commission=commission, finalize_trades=finalize_trades)
+        self._cash = cash
+        self._warmup_bars = warmup_bars
+        self._equity_path = equity_path
+        self._trades_path = trades_path
+
+    def run(self, **params):
+        book = _Book(cash=float(self._cash))
+        metrics = RunningMetrics()
+        entry_times = {}    # entry bar -> time, for trades still open when their frame is dropped
+        tail = None         # last simulated bars: warm-up overlap of the next frame
+        held = None         # leading bars not simulated yet (indicators not warmed up)
+        offset = 0          # history index of the current frame's bar 0
+        n_chunks = 0
+
+        for path in (self._equity_path, self._trades_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+        # Every frame is new data: caching it would only evict useful entries
+        with indicator_cache.disabled():
+            for chunk, final in _with_last(c for c in self._chunks if len(c)):
+                n_chunks += 1
+                parts = [part for part in (tail, held, chunk) if part is not None]
+                frame = pd.concat(parts) if len(parts) > 1 else chunk
+                first = 0 if tail is None else len(tail)
+
+                bt = VectorBacktest(frame, self._strategy, **self._bt_kwargs)
+                signals = self._strategy.signals(frame, **params)
+                if book.t is None and not final and not _warmed_up(signals):
+                    held = frame
+                    continue
+                held = None
+
+                book.offset, book.first, book.final = offset, first, final
+                equity, trades = bt._simulate(signals, book)
+
+                index = frame.index
+                metrics.update(equity, index[first:])
+                self._append(self._equity_path, pd.DataFrame({'Equity': equity}, index=index[first:]),
+                             index_label='Time')
+                if book.position is not None and book.position[1] not in entry_times:
+                    bar = book.position[1]
+                    entry_times[bar] = index[bar - offset]
+                if trades:
+                    trades = pd.DataFrame(trades, columns=_TRADE_COLUMNS)
+                    trades['EntryTime'] = [index[bar - offset] if bar >= offset else entry_times.pop(bar)
+                                           for bar in trades['EntryBar']]
+                    trades['ExitTime'] = index[trades['ExitBar'] - offset]
+                    metrics.add_trades(trades['PnL'])
+                    self._append(self._trades_path, trades, index=False)
+
+                keep = max(self._warmup_bars, signals.warmup_bars() + 2)
+                tail = frame.iloc[-keep:]
+                offset += len(frame) - len(tail)
+
+        if metrics.start is None:
+            raise ValueError("No data to backtest.")
+
+        stats = {
+            'Start': metrics.start,
+            'End': metrics.end,
+            'Duration': metrics.end - metrics.start,
+            'Equity Final [$]': metrics.last,
+            'Equity Peak [$]': metrics.peak,
+            **metrics.result(),
+            'Chunks': n_chunks,
+            '_equity_path': self._equity_path,
+            '_trades_path': self._trades_path,
+        }
+        return pd.Series(stats, dtype=object)
+
+    @staticmethod
+    def _append(path, df, **kwargs):
+        if path:
+            # Fixed timestamp format: pandas would drop the time of a chunk that is all midnights
+            df.to_csv(path, mode='a', header=not os.path.exists(path), date_format='%Y-%m-%d %H:%M:%S', **kwargs)
+
+def _warmed_up(signals):
+    """True once every indicator (every row of a 2-D one) has a value somewhere in the frame."""
+    return all(not np.isnan(np.asarray(ind, dtype=float)).all(axis=-1).any() for ind in signals.indicators)
+
+def _with_last(iterable):
+    """Yields (item, is_last_item)."""
+    it = iter(iterable)
+    try:
+        item = next(it)
+    except StopIteration:
+        return
+    for following in it:
+        yield item, False
+        item = following
+    yield item, True
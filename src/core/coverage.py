@@ -0,0 +1,123 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Coverage manifest of one symbol/timeframe in the bar store: the time ranges
+# already downloaded (closed intervals; nights, weekends and holidays included),
+# with the number of bars each holds and a checksum of their timestamps.
+#
+#   {"intervals": [{"start": "2024-01-02T00:00:00-05:00", "end": "2024-06-28T16:00:00-04:00",
+#                   "rows": 48750, "checksum": "9f3c0e..."}]}
+#
+# Deciding what to download is a look at this small file, no bar data is read,
+# and a hole inside the stored range (a chunk that failed) is a gap like any
+# other. The checksum is the sum (mod 2**64) of per-bar timestamp hashes, so
+# merging intervals adds them up; verify() recomputes it from the store.
+# Bounds are kept in New York time, like the bars.
+
+TZ = "America/New_York"
+
+class Coverage:
+    def __init__(self, path, intervals=None):
+        self.path = path
+        self.intervals = intervals or []    # [{"start", "end", "rows", "checksum"}], sorted, disjoint
+
+    @classmethod
+    def load(cls, path):
+        """The manifest at `path`; an empty one if there is none yet."""
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path) as f:
+            raw = json.load(f)
+        return cls(path, [{"start": _moment(i["start"]), "end": _moment(i["end"]),
+                           "rows": i["rows"], "checksum": int(i["checksum"], 16)} for i in raw["intervals"]])
+
+    def save(self):
+        raw = {"intervals": [{"start": i["start"].isoformat(), "end": i["end"].isoformat(),
+                              "rows": i["rows"], "checksum": f"{i['checksum']:016x}"} for i in self.intervals]}
+        # Temp file + rename: a crash never leaves a half-written manifest
+        tmp_path = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(raw, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def empty(self):
+        return not self.intervals
+
+    @property
+    def rows(self):
+        return sum(i["rows"] for i in self.intervals)
+
+    @property
+    def end(self):
+        """End of the latest covered interval (None if nothing is covered)."""
+        return self.intervals[-1]["end"] if self.intervals else None
+
+    def missing(self, start, end):
+        """The parts of [start, end] no interval covers, as (start, end) ranges to download."""
+        gaps = []
+        for interval in self.intervals:
+            if interval["end"] < start:
+                continue
+            if interval["start"] > end:
+                break
+            if interval["start"] > start:
+                gaps.append((start, interval["start"]))
+            start = max(start, interval["end"])
+        if start < end:
+            gaps.append((start, end))
+        return gaps
+
+    def add(self, start, end, df):
+        """
+        Marks [start, end] as downloaded. `df` holds the bars that arrived for it
+        (those outside the range or already covered aren't counted again).
+        """
+        start, end = _moment(start), _moment(end)
+        new = df[(df.index >= start) & (df.index <= end)] if not df.empty else df
+        if len(new):
+            fresh = np.ones(len(new), dtype=bool)
+            for interval in self.intervals:
+                fresh &= ~((new.index >= interval["start"]) & (new.index <= interval["end"]))
+            new = new[fresh]
+
+        merged = {"start": start, "end": end, "rows": len(new), "checksum": timestamp_checksum(new.index)}
+        kept = []
+        for interval in self.intervals:
+            if interval["end"] < start or interval["start"] > end:
+                kept.append(interval)
+                continue
+            merged["start"] = min(merged["start"], interval["start"])
+            merged["end"] = max(merged["end"], interval["end"])
+            merged["rows"] += interval["rows"]
+            merged["checksum"] = (merged["checksum"] + interval["checksum"]) % 2**64
+        self.intervals = sorted(kept + [merged], key=lambda i: i["start"])
+
+    def verify(self, read):
+        """
+        Intervals whose stored bars no longer match their row count or checksum.
+        `read(start, end)` returns the stored bars of a range.
+        """
+        bad = []
+        for interval in self.intervals:
+            df = read(interval["start"], interval["end"])
+            if len(df) != interval["rows"] or timestamp_checksum(df.index) != interval["checksum"]:
+                bad.append(interval)
+        return bad
+
+    def discard(self, intervals):
+        """Forgets `intervals` so they are downloaded again."""
+        self.intervals = [i for i in self.intervals if i not in intervals]
+
+def _moment(value):
+    return pd.Timestamp(value).tz_convert(TZ)
+
+def timestamp_checksum(index):
+    """Order-independent checksum of bar timestamps (any resolution or time zone)."""
+    if not len(index):
+        return 0
+    hashes = pd.util.hash_array(index.as_unit("ns").asi8)
+    return int(np.sum(hashes, dtype=np.uint64))
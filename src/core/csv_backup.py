@@ -0,0 +1,83 @@
+import os
+import queue
+import threading
+
+# Human-readable CSV mirror of the Parquet store, written behind the caller's
+# back: DataManager queues the work and returns as soon as Parquet (the primary)
+# is on disk. One writer thread works through a bounded queue, so a burst of
+# updates applies backpressure instead of piling up frames in memory.
+#
+# Policies: "off" (no mirror), "on" ({symbol}_{tf}.csv), "gzip" ({symbol}_{tf}.csv.gz).
+
+POLICIES = ("off", "on", "gzip")
+
+class CsvBackup:
+    def __init__(self, csv_dir, policy="on", max_pending=8):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown CSV backup policy '{policy}'. Options: {', '.join(POLICIES)}")
+        self.csv_dir = csv_dir
+        self.policy = policy
+        self.errors = []
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._queued = {}           # path -> jobs not done yet
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.policy != "off"
+
+    def path(self, symbol, tf_tag):
+        suffix = ".csv.gz" if self.policy == "gzip" else ".csv"
+        return os.path.join(self.csv_dir, f"{symbol}_{tf_tag}{suffix}")
+
+    def exists(self, symbol, tf_tag):
+        """The backup is on disk or about to be."""
+        path = self.path(symbol, tf_tag)
+        with self._lock:
+            return path in self._queued or os.path.exists(path)
+
+    def append(self, symbol, tf_tag, df):
+        """Adds rows that come after everything already in the backup."""
+        self._submit(self.path(symbol, tf_tag), df, append=True)
+
+    def rewrite(self, symbol, tf_tag, load):
+        """Replaces the backup with `load()` (called on the writer thread, e.g. a full store read)."""
+        self._submit(self.path(symbol, tf_tag), load, append=False)
+
+    def flush(self):
+        """Blocks until every queued write is on disk (call before exiting)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _submit(self, path, data, append):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._queued[path] = self._queued.get(path, 0) + 1
+            if self._thread is None:
+                # Daemon: an unflushed backup never keeps the process alive
+                self._thread = threading.Thread(target=self._run, name="csv-backup", daemon=True)
+                self._thread.start()
+        self._queue.put((path, data, append))     # Blocks while max_pending jobs are waiting
+
+    def _run(self):
+        while True:
+            path, data, append = self._queue.get()
+            try:
+                if append:
+                    data.to_csv(path, mode='a', header=False)
+                else:
+                    # Temp file + rename: a crash never leaves a truncated backup
+                    tmp_path = path + ".tmp"
+                    data().to_csv(tmp_path, compression="gzip" if path.endswith(".gz") else None)
+                    os.replace(tmp_path, path)
+            except Exception as e:
+                self.errors.append(f"{os.path.basename(path)}: {e}")
+                print(f"CSV Backup Error: {e}")
+            finally:
+                with self._lock:
+                    self._queued[path] -= 1
+                    if not self._queued[path]:
+                        del self._queued[path]
+                self._queue.task_done()
@@ -3,111 +3,299 @@ import pandas as pd
 import pytz
 from datetime import timedelta
 from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from alpaca.data.enums import Adjustment
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 
-from config import PARQUET_DIR, CSV_DIR
+from config import PARQUET_DIR, CSV_DIR, DERIVED_DIR, MMAP_DIR
+from core.parquet_store import ParquetStore
+from core.csv_backup import CsvBackup
+from core.frame_cache import FrameCache, tz_naive_frame
+from core.downloader import BulkDownloader
+from core.coverage import Coverage
+from core.resample import DerivedBars, MINUTES, TZ
+from core.mmap_store import MmapStore
+
+# Alpaca's free feed publishes bars with a delay; newer ranges aren't marked as downloaded
+DATA_DELAY = timedelta(minutes=15)
+# Coarser timeframes from the stored minutes: "auto" (symbols with minute data), "always", "never"
+DERIVE_POLICIES = ("auto", "always", "never")
+# Frames served from memory-mapped snapshots of the store: "off", "float64" or "float32"
+MMAP_POLICIES = ("off", "float64", "float32")
 
 class DataManager:
-    def __init__(self, api_key, secret_key):
+    def __init__(self, api_key, secret_key, compression="zstd", csv_backup="on", frame_cache_bytes=1024 * 2**20,
+                 download_workers=4, symbols_per_request=50, requests_per_minute=180, derive_bars="auto",
+                 mmap_frames="float64"):
         self.client = StockHistoricalDataClient(api_key, secret_key)
+        self.downloader = BulkDownloader(self.client,
+                                         symbols_per_request=symbols_per_request,
+                                         workers=download_workers,
+                                         requests_per_minute=requests_per_minute)
         self.ny_tz = pytz.timezone('America/New_York')
+        self.store = ParquetStore(PARQUET_DIR, compression=compression)
+        self.csv = CsvBackup(CSV_DIR, policy=csv_backup)
+        if derive_bars not in DERIVE_POLICIES:
+            raise ValueError(f"Unknown derive_bars '{derive_bars}'. Options: {', '.join(DERIVE_POLICIES)}")
+        self.derive_bars = derive_bars
+        self.derived = DerivedBars(self.store, DERIVED_DIR, compression=compression)
+        # Frames already loaded in this process (0 bytes = off)
+        self.frames = FrameCache(frame_cache_bytes) if frame_cache_bytes else None
+        if mmap_frames not in MMAP_POLICIES:
+            raise ValueError(f"Unknown mmap_frames '{mmap_frames}'. Options: {', '.join(MMAP_POLICIES)}")
+        self.mapped = MmapStore(MMAP_DIR, dtype=mmap_frames) if mmap_frames != "off" else None
 
-    def get_data(self, symbol, start_date, end_date, timeframe=TimeFrame.Minute):
+    def get_data(self, symbol, start_date, end_date, timeframe=TimeFrame.Minute, tz_naive=False):
         """
-        Primary: Parquet.
-        Backup: CSV.
-        Logic: Reads Parquet to check dates, but writes to BOTH when updating.
+        Primary: Parquet dataset (core.parquet_store), partitioned by year.
+        Backup: CSV (core.csv_backup policy), written in the background.
+        Logic: Checks the coverage manifest (core.coverage) without reading any
+        bars, downloads only the missing ranges, writes to BOTH when updating,
+        then reads only the requested range: mapped from a snapshot of the
+        store (core.mmap_store) unless `mmap_frames` is "off".
+        Coarser timeframes are built from the stored minute bars when the
+        `derive_bars` policy says so (core.resample), instead of downloaded.
+        A range already loaded in this process (or inside one) comes from the
+        frame cache instead; the returned frame is shared, don't modify it.
+        tz_naive=True drops the time zone (New York wall-clock times, as Backtest expects).
         """
         print(f"DEBUG: DataManager received timeframe: {timeframe} (Value: {timeframe.value})")
         
         tf_tag = timeframe.value
-
-        parquet_path = os.path.join(PARQUET_DIR, f"{symbol}_{tf_tag}.parquet")
-        csv_path = os.path.join(CSV_DIR, f"{symbol}_{tf_tag}.csv")
         
         req_start = self.ny_tz.localize(start_date)
         req_end = self.ny_tz.localize(end_date)
-        
-        # IF NO PARQUET EXISTS: Download everything & Save Both
-        if not os.path.exists(parquet_path):
-            print(f"No local data for {symbol}. Downloading full history...")
-            df = self._fetch_from_alpaca(symbol, req_start, req_end, timeframe)
-            if not df.empty:
-                self._save_to_disk(df, parquet_path, csv_path) # <--- Helper function
+
+        if self.frames is not None:
+            df = self.frames.get(symbol, tf_tag, req_start, req_end, tz_naive=tz_naive)
+            if df is not None:
+                print(f"Using cached {tf_tag} data for {symbol}.")
+                return df
+
+        df, naive = self._load(symbol, tf_tag, req_start, req_end, timeframe)
+        if self.frames is not None:
+            return self.frames.put(symbol, tf_tag, req_start, req_end, df, tz_naive=tz_naive, naive=naive)
+        if not tz_naive:
             return df
+        return naive if naive is not None else tz_naive_frame(df)
 
-        # IF PARQUET EXISTS: Load it and check gaps
-        print(f"Found local {tf_tag} data for {symbol}. Checking for gaps...")
-        df = pd.read_parquet(parquet_path)
-        
-        local_start = df.index[0]
-        local_end = df.index[-1]
-        is_updated = False
-        
-        # --- CHECK BACKWARD (PREPEND) ---
-        if req_start < local_start:
-            print(f"   Downloading missing history: {req_start.date()} -> {local_start.date()}")
-            prepend_df = self._fetch_from_alpaca(symbol, req_start, local_start, timeframe)
-            if not prepend_df.empty:
-                df = pd.concat([prepend_df, df])
-                is_updated = True
-        
-        # --- CHECK FORWARD (APPEND) ---
-        if req_end > local_end:
-            print(f"   Downloading new data: {local_end.date()} -> {req_end.date()}")
-            buffer = timedelta(minutes=1) if timeframe == TimeFrame.Minute else timedelta(days=1)
-            append_df = self._fetch_from_alpaca(symbol, local_end + buffer, req_end, timeframe)
-            if not append_df.empty:
-                df = pd.concat([df, append_df])
-                is_updated = True
-        
-        # SAVE BOTH IF CHANGED
-        if is_updated:
-            print(f"   Saving merged data ({len(df)} rows) to Parquet and CSV...")
-            # Sort and Drop Duplicates
-            df = df.sort_index()
-            df = df[~df.index.duplicated(keep='last')]
-            
-            # Save to both locations
-            self._save_to_disk(df, parquet_path, csv_path)
+    def _load(self, symbol, tf_tag, req_start, req_end, timeframe):
+        """
+        get_data() without the frame cache: store + downloads of the missing
+        ranges. Returns the bars and, when mapped, their tz-naive twin (else None).
+        """
+        source = self._source(symbol, timeframe, req_start, req_end)
+        derive = source is not timeframe
+        self._update(symbol, source.value, req_start, req_end, source)
+        if self.mapped is not None:
+            return self._mapped(symbol, tf_tag, req_start, req_end, timeframe, derive)
+
+        if derive:
+            print(f"   Building {tf_tag} bars for {symbol} from the stored minutes.")
+            return self.derived.read(symbol, timeframe, req_start, req_end), None
+        # Only the row groups overlapping the range are decoded
+        return self.store.read(symbol, tf_tag, req_start, req_end), None
+
+    def _mapped(self, symbol, tf_tag, req_start, req_end, timeframe, derive):
+        """
+        The range as (tz-aware, tz-naive) views of the symbol's memory-mapped
+        snapshots, one per stored year; a year whose stored (or source minute)
+        parts changed since its snapshot was taken is rebuilt first, alone.
+        """
+        partitions = self.store.partitions(symbol, MINUTES if derive else tf_tag)
+        if derive and timeframe.unit in (TimeFrameUnit.Week, TimeFrameUnit.Month):
+            # A weekly/monthly bar at either end of a year also holds minutes of the year next to it
+            stamps = [""] + [fingerprint for _, fingerprint in partitions] + [""]
+            partitions = [(year, "|".join(stamps[i:i + 3])) for i, (year, _) in enumerate(partitions)]
+
+        def build(year):
+            print(f"   Snapshotting {symbol} {tf_tag} bars of {year} for memory mapping.")
+            first, last = pd.Timestamp(year, 1, 1, tz=TZ), pd.Timestamp(year, 12, 31, 23, 59, 59, 999999, tz=TZ)
+            if not derive:
+                return self.store.read(symbol, tf_tag, first, last)
+            return self.derived.read(symbol, timeframe, first, last)
+
+        return self.mapped.read(symbol, tf_tag, partitions, req_start, req_end, build=build)
+
+    def _update(self, symbol, tf_tag, req_start, req_end, timeframe):
+        """Downloads and saves whatever the store is missing of [req_start, req_end]."""
+        coverage = self._coverage(symbol, tf_tag)
+        gaps = coverage.missing(req_start, req_end)
+
+        if coverage.empty:
+            print(f"No local data for {symbol}. Downloading full history...")
         else:
+            print(f"Found local {tf_tag} data for {symbol}. Checking for gaps...")
+
+        # Only what the manifest doesn't cover, interior holes included
+        for start, end in gaps:
+            print(f"   Downloading missing range: {start:%Y-%m-%d %H:%M} -> {end:%Y-%m-%d %H:%M}")
+            result = self._fill([symbol], start, end, timeframe)
+            if symbol in result.frames:
+                print(f"   Saved {len(result.frames[symbol])} new rows to Parquet and CSV.")
+
+        if not gaps:
             print("   Local data covers the requested range.")
             
             # If Parquet exists but User deleted CSV manually, re-create CSV
-            if not os.path.exists(csv_path):
-                print("   (Restoring missing CSV backup...)")
-                df.to_csv(csv_path)
-
-        return df.loc[req_start:req_end]
-
-    def _save_to_disk(self, df, parquet_path, csv_path):
-        """Helper to ensure we always save both at the same time"""
-        df.to_parquet(parquet_path)
-        df.to_csv(csv_path)
-
-    def _fetch_from_alpaca(self, symbol, start, end, timeframe):
-        req = StockBarsRequest(
-            symbol_or_symbols=[symbol],
-            timeframe=timeframe,
-            start=start,
-            end=end,
-            adjustment=Adjustment.ALL
-        )
-        try:
-            bars = self.client.get_stock_bars(req)
-            if bars.data:
-                df = bars.df.reset_index()
-                df = df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"})
-                df['timestamp'] = df['timestamp'].dt.tz_convert('America/New_York')
-                df = df.set_index('timestamp')
-                
-                if "Min" in timeframe.value or "Hour" in timeframe.value:
-                    df = df.between_time('09:30', '16:00')
-                
-                return df[['Open', 'High', 'Low', 'Close', 'Volume']]
-            return pd.DataFrame()
-        except Exception as e:
-            print(f"Error: {e}")
-            return pd.DataFrame()
+            if self.csv.enabled and not self.csv.exists(symbol, tf_tag):
+                print("   (Restoring missing CSV backup in the background...)")
+                self.csv.rewrite(symbol, tf_tag, lambda: self.store.read(symbol, tf_tag))
+
+    def backfill(self, symbols, start_date, end_date, timeframe=TimeFrame.Minute):
+        """
+        Downloads and saves what the store is missing of [start_date, end_date]
+        for many symbols at once: symbols missing the same range share requests
+        (core.downloader), so a later get_data() per symbol finds its bars locally.
+        Ranges whose request failed stay missing (get_data() retries them alone).
+        Returns the DownloadResults.
+        """
+        tf_tag = timeframe.value
+        req_start = self.ny_tz.localize(start_date)
+        req_end = self.ny_tz.localize(end_date)
+
+        missing = {}    # (timeframe downloaded, start, end) -> [symbols]
+        sources = {}
+        for symbol in symbols:
+            source = self._source(symbol, timeframe, req_start, req_end)
+            sources[source.value] = source
+            for start, end in self._coverage(symbol, source.value).missing(req_start, req_end):
+                missing.setdefault((source.value, start, end), []).append(symbol)
+
+        results = []
+        for (source, start, end), group in missing.items():
+            print(f"Bulk download: {len(group)} symbols, {source}, {start:%Y-%m-%d %H:%M} -> {end:%Y-%m-%d %H:%M}")
+            result = self._fill(group, start, end, sources[source])
+            print(f"   {result.summary()}")
+            results.append(result)
+        return results
+
+    def iter_data(self, symbol, start_date, end_date, timeframe=TimeFrame.Minute, chunk_rows=100_000):
+        """
+        get_data() for histories too long to hold in memory: yields the requested
+        range as consecutive frames of at most `chunk_rows` bars, read from the
+        Parquet dataset one record batch at a time.
+        If the store doesn't cover the range yet, get_data() downloads and saves
+        the missing part first.
+        """
+        tf_tag = timeframe.value
+
+        req_start = self.ny_tz.localize(start_date)
+        req_end = self.ny_tz.localize(end_date)
+
+        source = self._source(symbol, timeframe, req_start, req_end)
+        if source is not timeframe:
+            # Derived bars are few (hours, days): build them whole, hand them out in slices
+            df = self.get_data(symbol, start_date, end_date, timeframe)
+            for i in range(0, len(df), chunk_rows):
+                yield df.iloc[i:i + chunk_rows]
+            return
+
+        if self._coverage(symbol, tf_tag).missing(req_start, req_end):
+            self.get_data(symbol, start_date, end_date, timeframe)
+
+        yield from self.store.iter_batches(symbol, tf_tag, req_start, req_end, batch_rows=chunk_rows)
+
+    def verify_coverage(self, symbol, timeframe=TimeFrame.Minute, repair=False):
+        """
+        Re-reads the stored bars of every manifest interval and returns those whose
+        row count or checksum no longer match. repair=True drops them from the
+        manifest, so the next get_data() downloads them again.
+        """
+        tf_tag = timeframe.value
+        coverage = self._coverage(symbol, tf_tag)
+        bad = coverage.verify(lambda start, end: self.store.read(symbol, tf_tag, start, end))
+        if bad and repair:
+            coverage.discard(bad)
+            coverage.save()
+        return bad
+
+    def _source(self, symbol, timeframe, req_start, req_end):
+        """
+        The timeframe get_data() downloads and stores for `timeframe` over
+        [req_start, req_end]: minutes when its bars are derived from them
+        ("always", or "auto" when the stored minutes already cover the whole
+        range), else `timeframe` itself. "auto" never downloads minutes just to
+        derive: a year of them costs hundreds of times the bars requested.
+        """
+        if timeframe.value == MINUTES or self.derive_bars == "never":
+            return timeframe
+        if self.derive_bars == "always" or not self._coverage(symbol, MINUTES).missing(req_start, req_end):
+            return TimeFrame.Minute
+        return timeframe
+
+    def _coverage(self, symbol, tf_tag):
+        """
+        The coverage manifest, after moving a legacy single-file cache into the
+        dataset. Data stored before manifests existed is taken as complete from
+        its first to its last bar (one full read to count it).
+        """
+        legacy_path = os.path.join(PARQUET_DIR, f"{symbol}_{tf_tag}.parquet")
+        if self.store.migrate(symbol, tf_tag, legacy_path):
+            print(f"   Migrated {os.path.basename(legacy_path)} to the partitioned Parquet store.")
+
+        path = self.store.coverage_path(symbol, tf_tag)
+        coverage = Coverage.load(path)
+        if not os.path.exists(path):
+            stored = self.store.stored_range(symbol, tf_tag)
+            if stored is not None:
+                coverage.add(stored[0], stored[1], self.store.read(symbol, tf_tag))
+                coverage.save()
+        return coverage
+
+    def _fill(self, symbols, start, end, timeframe):
+        """
+        Downloads [start, end] for `symbols` (core.downloader), saves the bars
+        that arrived and records the range in each manifest, minus the chunks
+        that failed. Returns the DownloadResult.
+        """
+        tf_tag = timeframe.value
+        result = self.downloader.download(symbols, start, end, timeframe)
+        for failure in result.failures:
+            print(f"   Failed: {failure}")
+
+        # Bars of the last minutes may not be published yet: leave them missing
+        settled = min(end, pd.Timestamp.now(tz=self.ny_tz) - DATA_DELAY)
+        for symbol in symbols:
+            coverage = self._coverage(symbol, tf_tag)
+            df = result.frames.get(symbol, pd.DataFrame())
+            if not df.empty:
+                # Newer bars only: the CSV can be extended instead of rewritten
+                self._save_to_disk(df, symbol, tf_tag,
+                                   append_csv=not coverage.empty and start >= coverage.end
+                                   and self.csv.exists(symbol, tf_tag))
+            failed = sorted((f.start, f.end) for f in result.failures if symbol in f.symbols)
+            for covered_start, covered_end in _subtract(start, settled, failed):
+                coverage.add(covered_start, covered_end, df)
+            coverage.save()
+        return result
+
+    def _save_to_disk(self, df, symbol, tf_tag, append_csv=False):
+        """
+        Helper to ensure we always save both at the same time.
+        Parquet (a new part file) is durable when this returns; the CSV backup
+        is only queued: appended to when `df` comes after everything in it,
+        rewritten otherwise. Cached frames of the symbol/timeframe are dropped.
+        """
+        self.store.write(symbol, tf_tag, df)
+        if self.frames is not None:
+            # New minutes change every timeframe derived from them
+            self.frames.invalidate(symbol, None if tf_tag == MINUTES else tf_tag)
+        if append_csv:
+            self.csv.append(symbol, tf_tag, df)
+        else:
+            self.csv.rewrite(symbol, tf_tag, lambda: self.store.read(symbol, tf_tag))
+
+    def close(self):
+        """Waits for background work (CSV backup writes, part compaction) to finish."""
+        self.csv.flush()
+        self.store.wait()
+
+def _subtract(start, end, ranges):
+    """[start, end] minus the sorted (start, end) `ranges`, as a list of ranges."""
+    pieces = []
+    for range_start, range_end in ranges:
+        if range_start > start:
+            pieces.append((start, min(range_start, end)))
+        start = max(start, range_end)
+    if start < end:
+        pieces.append((start, end))
+    return [(a, b) for a, b in pieces if a < b]
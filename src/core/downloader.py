@@ -0,0 +1,218 @@
+import random
+import threading
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from alpaca.data.requests import StockBarsRequest
+from alpaca.data.timeframe import TimeFrameUnit
+from alpaca.data.enums import Adjustment
+
+from core.market_calendar import session_mask
+
+# Bulk bar downloads from Alpaca.
+#
+# A download of N symbols over a long range is cut into requests of at most
+# `symbols_per_request` symbols x one date chunk, fetched concurrently by a
+# thread pool. Every request first takes a token from a shared bucket, so the
+# pool as a whole stays under the account's rate limit. Throttling and server
+# errors (429, 5xx, connection errors) are retried with exponential backoff; a
+# request rejected outright (e.g. 422 for an unknown symbol) is split in halves
+# until the offending symbols are isolated, so one bad ticker doesn't sink its
+# group. Whatever still fails is reported per (symbols, date range).
+#
+# The client only needs get_stock_bars(StockBarsRequest) -> BarSet-like (.data,
+# .df), so tests can pass a local stand-in for StockHistoricalDataClient.
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Date span of one request per timeframe unit (x the timeframe amount); None = whole range
+CHUNK_SPAN = {
+    TimeFrameUnit.Minute: timedelta(days=30),
+    TimeFrameUnit.Hour: timedelta(days=365),
+    TimeFrameUnit.Day: None,
+    TimeFrameUnit.Week: None,
+    TimeFrameUnit.Month: None,
+}
+
+class TokenBucket:
+    """Thread-safe limiter: `rate` tokens per second on average, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+@dataclass
+class Failure:
+    """A request that still failed after its retries: which symbols, which range, why."""
+    symbols: tuple
+    start: object
+    end: object
+    error: str
+    attempts: int
+
+    def __str__(self):
+        return (f"{', '.join(self.symbols)} {self.start:%Y-%m-%d %H:%M} -> {self.end:%Y-%m-%d %H:%M}: "
+                f"{self.error} (after {self.attempts} attempts)")
+
+@dataclass
+class DownloadResult:
+    frames: dict = field(default_factory=dict)     # symbol -> bars (New York time), symbols with data only
+    failures: list = field(default_factory=list)   # [Failure]
+    requests: int = 0                              # Requests sent, retries included
+    elapsed: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    def failed_symbols(self):
+        return sorted({symbol for failure in self.failures for symbol in failure.symbols})
+
+    def summary(self):
+        bars = sum(len(df) for df in self.frames.values())
+        text = (f"Downloaded {bars:,} bars for {len(self.frames)} symbols in {self.requests} requests "
+                f"({self.elapsed:.1f}s)")
+        if self.failures:
+            text += f" | {len(self.failures)} failed requests: {', '.join(self.failed_symbols())}"
+        return text
+
+class BulkDownloader:
+    """
+        downloader = BulkDownloader(client, symbols_per_request=50, workers=4, requests_per_minute=180)
+        result = downloader.download(["AAPL", "MSFT"], start, end, TimeFrame.Minute)
+        result.frames["AAPL"]    # Open/High/Low/Close/Volume, New York time
+        result.failures          # [Failure(symbols, start, end, error, attempts)]
+    """
+
+    def __init__(self, client, symbols_per_request=50, chunk_span=None, workers=4,
+                 requests_per_minute=180, retries=4, backoff=1.0):
+        self.client = client
+        self.symbols_per_request = symbols_per_request
+        self.chunk_span = chunk_span        # timedelta; None = CHUNK_SPAN of the timeframe
+        self.workers = workers
+        # Counts our requests; the SDK may page a large response into several calls
+        self._bucket = TokenBucket(requests_per_minute / 60) if requests_per_minute else None
+        self.retries = retries
+        self.backoff = backoff
+
+    def chunks(self, start, end, timeframe):
+        """[start, end] as consecutive (start, end) request ranges."""
+        span = self.chunk_span
+        if span is None:
+            span = CHUNK_SPAN[timeframe.unit]
+            span = span * timeframe.amount if span is not None else None
+        if span is None:
+            return [(start, end)]
+        ranges = []
+        while start < end:
+            ranges.append((start, min(start + span, end)))
+            start += span
+        return ranges or [(start, end)]
+
+    def download(self, symbols, start, end, timeframe):
+        """Bars of every symbol in [start, end]; failed requests are listed in the result, not raised."""
+        started = time.perf_counter()
+        symbols = list(dict.fromkeys(symbols))
+        groups = [symbols[i:i + self.symbols_per_request] for i in range(0, len(symbols), self.symbols_per_request)]
+        jobs = [(group, s, e) for group in groups for s, e in self.chunks(start, end, timeframe)]
+
+        result = DownloadResult()
+        parts = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(jobs))),
+                                thread_name_prefix="bars-download") as pool:
+            for frames, failures, requests in pool.map(lambda job: self._request(*job, timeframe), jobs):
+                for symbol, df in frames.items():
+                    parts.setdefault(symbol, []).append(df)
+                result.failures += failures
+                result.requests += requests
+
+        for symbol in symbols:
+            if symbol in parts:
+                df = pd.concat(parts[symbol]) if len(parts[symbol]) > 1 else parts[symbol][0]
+                # Adjacent chunks share their boundary timestamp
+                df = df.sort_index(kind='stable')
+                result.frames[symbol] = df[~df.index.duplicated(keep='last')]
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _request(self, symbols, start, end, timeframe):
+        """One request with its retries (and splits). Returns (frames by symbol, failures, requests sent)."""
+        attempts = 0
+        while True:
+            attempts += 1
+            if self._bucket is not None:
+                self._bucket.acquire()
+            try:
+                bars = self.client.get_stock_bars(StockBarsRequest(
+                    symbol_or_symbols=list(symbols),
+                    timeframe=timeframe,
+                    start=start,
+                    end=end,
+                    adjustment=Adjustment.ALL
+                ))
+                return split_bars(bars, timeframe), [], attempts
+            except Exception as e:
+                error = e
+            if _retryable(error) and attempts <= self.retries:
+                time.sleep(self.backoff * 2 ** (attempts - 1) * random.uniform(0.5, 1.5))
+                continue
+            break
+
+        if not _retryable(error) and len(symbols) > 1:
+            # Rejected outright: find the symbols it's about
+            frames, failures, requests = {}, [], attempts
+            half = len(symbols) // 2
+            for part in (symbols[:half], symbols[half:]):
+                part_frames, part_failures, part_requests = self._request(part, start, end, timeframe)
+                frames.update(part_frames)
+                failures += part_failures
+                requests += part_requests
+            return frames, failures, requests
+        return {}, [Failure(tuple(symbols), start, end, f"{type(error).__name__}: {error}", attempts)], attempts
+
+def split_bars(bars, timeframe):
+    """
+    A multi-symbol BarSet as {symbol: Open/High/Low/Close/Volume frame indexed
+    by New York time}. Intraday bars outside the session (core.market_calendar) are dropped.
+    """
+    if not bars.data:
+        return {}
+    df = bars.df.reset_index()
+    df = df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"})
+    df['timestamp'] = df['timestamp'].dt.tz_convert('America/New_York')
+
+    frames = {}
+    for symbol, part in df.groupby('symbol', sort=False):
+        part = part.set_index('timestamp')
+        if "Min" in timeframe.value or "Hour" in timeframe.value:
+            # Bars starting in the regular session, close included; none on holidays, none after an early close
+            part = part[session_mask(part.index, bar=0)]
+        if not part.empty:
+            frames[symbol] = part[COLUMNS]
+    return frames
+
+def _retryable(error):
+    """Throttling, server errors and connection problems are worth another try."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # requests' ConnectionError / Timeout derive from OSError
+    return isinstance(error, OSError)
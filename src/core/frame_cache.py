@@ -0,0 +1,123 @@
+import numpy as np
+from collections import OrderedDict
+
+# In-process LRU of the frames DataManager.get_data() loaded, bounded by bytes.
+#
+# An entry is keyed by (symbol, timeframe, requested range). Any request inside
+# an entry's range is answered with a positional slice of it, sharing the
+# column data instead of copying it, so several strategies, timeframes or
+# optimization rounds on one symbol decode the Parquet store once. The tz-naive
+# variant Backtest needs is derived once per entry and shares the columns too.
+# Frames handed out are shared: treat them as read-only.
+
+class FrameCache:
+    """
+        cache = FrameCache(max_bytes=1024 * 2**20)
+        cache.put("AAPL", "1Min", start, end, df)
+        cache.get("AAPL", "1Min", start + one_month, end)   # slice of df, or None
+        cache.stats()   # {'hits': ..., 'misses': ..., 'bytes': ..., ...}
+    """
+
+    def __init__(self, max_bytes=1024 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # (symbol, tf_tag, start, end) -> _Entry
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, symbol, tf_tag, start, end, tz_naive=False):
+        """Bars in [start, end] from an entry covering that range, or None."""
+        for key in reversed(self._entries):
+            entry_symbol, entry_tf, entry_start, entry_end = key
+            if entry_symbol == symbol and entry_tf == tf_tag and entry_start <= start and end <= entry_end:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                entry = self._entries[key]
+                first, stop = entry.bounds(start, end)
+                return self._view(entry, tz_naive).iloc[first:stop]
+        self.misses += 1
+        return None
+
+    def put(self, symbol, tf_tag, start, end, df, tz_naive=False, naive=None):
+        """
+        Remembers `df` as the bars of [start, end] (entries it covers are
+        dropped) and returns it, tz-naive if asked. `naive`: its tz-naive
+        variant, if the caller already has one (core.mmap_store).
+        """
+        size = 0 if df.empty else int(np.sum(df.memory_usage(index=True, deep=False)))
+        if not size or size > self.max_bytes:
+            if not tz_naive:
+                return df
+            return naive if naive is not None else tz_naive_frame(df)
+        for key in [k for k in self._entries
+                    if k[0] == symbol and k[1] == tf_tag and start <= k[2] and k[3] <= end]:
+            self._drop(key)
+        entry = _Entry(df, size)
+        entry.naive = naive
+        self._entries[(symbol, tf_tag, start, end)] = entry
+        self._grow(entry.nbytes)
+        return self._view(entry, tz_naive)
+
+    def invalidate(self, symbol, tf_tag=None):
+        """Drops every entry of symbol/timeframe (its stored data changed); tf_tag=None: every timeframe."""
+        for key in [k for k in self._entries if k[0] == symbol and tf_tag in (None, k[1])]:
+            self._drop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _view(self, entry, tz_naive):
+        if not tz_naive:
+            return entry.frame
+        if entry.naive is None:
+            entry.naive = tz_naive_frame(entry.frame)
+            self._grow(entry.naive.index.nbytes)
+        return entry.naive
+
+    def _grow(self, size):
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key).nbytes
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"Frame cache: {s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.0%}) | "
+                f"{s['entries']} entries, {s['bytes'] / 2**20:.1f} MB")
+
+class _Entry:
+    def __init__(self, frame, nbytes):
+        self.frame = frame
+        self.naive = None
+        self._nbytes = nbytes
+
+    @property
+    def nbytes(self):
+        return self._nbytes + (self.naive.index.nbytes if self.naive is not None else 0)
+
+    def bounds(self, start, end):
+        """Positions of the bars in [start, end]: a slice of them shares the data."""
+        index = self.frame.index
+        return index.searchsorted(start, side='left'), index.searchsorted(end, side='right')
+
+def tz_naive_frame(df):
+    """`df` with its index's time zone dropped (wall-clock times), sharing the column data."""
+    if df.empty or df.index.tz is None:
+        return df
+    naive = df.copy(deep=False)
+    naive.index = df.index.tz_localize(None)
+    return naive
@@ -0,0 +1,262 @@
+import weakref
+import functools
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+# NYSE trading sessions, computed locally from the exchange's holiday rules (no
+# data feed, no network): full closures, 13:00 early closes, and the regular
+# 09:30-16:00 session of every other weekday.
+#
+# The calendar is built once per span of years as dense per-day arrays (open
+# and close time of day, early-close flag), so classifying any number of bars
+# is one array lookup by day number. session_masks() turns a bar index into
+# boolean masks (regular-session bars, half-day bars, first/last bar of each
+# day, week and month), cached for as long as that index object lives.
+#
+# Rules are the current ones (Juneteenth from 2022, MLK Day from 1998); one-off
+# closures are listed from 2001. Times are New York wall-clock.
+
+TZ = "America/New_York"
+OPEN = pd.Timedelta(hours=9, minutes=30)
+CLOSE = pd.Timedelta(hours=16)
+EARLY_CLOSE = pd.Timedelta(hours=13)
+
+# Closures no rule predicts: 9/11, national days of mourning, Hurricane Sandy
+SPECIAL_CLOSURES = ("2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14", "2004-06-11", "2007-01-02",
+                    "2012-10-29", "2012-10-30", "2018-12-05", "2025-01-09")
+
+_DAY = 86_400 * 10**9
+_TICKS_PER_SECOND = {"s": 1, "ms": 10**3, "us": 10**6, "ns": 10**9}
+
+def holidays(year):
+    """The weekdays of `year` the exchange is closed (dates)."""
+    new_year = pd.Timestamp(year, 1, 1)
+    days = [
+        # A Saturday New Year's Day isn't moved to the Friday (it would fall in the old year)
+        new_year + pd.Timedelta(days=1) if new_year.weekday() == 6 else new_year,
+        _nth_weekday(year, 1, 0, 3) if year >= 1998 else None,      # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                                 # Washington's Birthday
+        _easter(year) - pd.Timedelta(days=2),                        # Good Friday
+        _nth_weekday(year, 6, 0, 1) - pd.Timedelta(days=7),          # Memorial Day (last Monday of May)
+        _observed(pd.Timestamp(year, 6, 19)) if year >= 2022 else None,  # Juneteenth
+        _observed(pd.Timestamp(year, 7, 4)),                         # Independence Day
+        _nth_weekday(year, 9, 0, 1),                                 # Labor Day
+        _nth_weekday(year, 11, 3, 4),                                # Thanksgiving
+        _observed(pd.Timestamp(year, 12, 25)),                       # Christmas
+    ]
+    days += [pd.Timestamp(day) for day in SPECIAL_CLOSURES if day.startswith(str(year))]
+    return sorted(day for day in days if day is not None and day.weekday() < 5)
+
+def early_closes(year):
+    """The days of `year` the session ends at EARLY_CLOSE (dates)."""
+    # July 3rd and Christmas Eve on a Monday-Thursday (on a Friday they are the observed holiday)
+    days = [day for day in (pd.Timestamp(year, 7, 3), pd.Timestamp(year, 12, 24)) if day.weekday() < 4]
+    days.append(_nth_weekday(year, 11, 3, 4) + pd.Timedelta(days=1))   # Day after Thanksgiving
+    closed = set(holidays(year))
+    return sorted(day for day in days if day not in closed)
+
+def sessions(start, end):
+    """
+    The trading days in [start, end] (dates) with their open and close
+    (tz-aware New York times) and whether they close early.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if start.tz is not None:
+        start, end = start.tz_localize(None), end.tz_localize(None)
+    table = _table(start.year, end.year)
+    days = np.arange(_day_number(start), _day_number(end) + 1)
+    days = days[table.trading[days - table.first]]
+    rows = days - table.first
+    dates = pd.DatetimeIndex(days.astype("datetime64[D]"), name="date").as_unit("ns")
+    return pd.DataFrame({
+        "open": (dates + OPEN).tz_localize(TZ),
+        "close": (dates + pd.to_timedelta(table.close[rows], unit="ns")).tz_localize(TZ),
+        "early_close": table.early[rows],
+    }, index=dates)
+
+def is_trading_day(dates):
+    """Boolean array: which of `dates` (anything DatetimeIndex accepts) the exchange is open."""
+    wall, tick = _wall_ticks(pd.DatetimeIndex(dates))
+    days = wall // (_DAY // tick)
+    if not len(days):
+        return np.zeros(0, dtype=bool)
+    table = _table_for(days)
+    return table.trading[days - table.first]
+
+@dataclass(frozen=True)
+class SessionMasks:
+    """
+    Per-bar boolean arrays of one index (read-only). The first/last masks
+    only look at regular bars, and at the bars present: the last bar of an
+    index ending mid-month is its "last of month".
+    """
+    regular: np.ndarray         # bar holds part of a regular session
+    half_day: np.ndarray        # bar is on an early-close day
+    first_of_day: np.ndarray
+    last_of_day: np.ndarray
+    first_of_week: np.ndarray
+    last_of_week: np.ndarray
+    first_of_month: np.ndarray
+    last_of_month: np.ndarray
+
+def session_masks(index, bar=None):
+    """
+    SessionMasks of `index` (tz-aware, or naive New York wall-clock times, as
+    Backtest has it). A bar counts as regular if it starts at or before the
+    close (the closing auction prints in the bar labeled 16:00) and ends after
+    the open: `bar` is its length, the smallest spacing in the index by
+    default, and 0 tests the start alone. 1Day bars are regular on trading
+    days; coarser bars always are.
+    Cached per (index object, bar): repeated calls on one frame cost nothing.
+    """
+    key = _key(index, bar)
+    cached = _masks.get(key)
+    if cached is not None and cached[0]() is index:
+        return cached[1]
+    masks = _compute_masks(index, bar)
+    _masks[key] = (weakref.ref(index), masks)
+    weakref.finalize(index, _masks.pop, key, None)
+    return masks
+
+def session_mask(index, bar=None):
+    """
+    session_masks(index, bar).regular without the other masks: the cached
+    ones if there are, else only this one is computed (filters of fresh frames).
+    """
+    cached = _masks.get(_key(index, bar))
+    if cached is not None and cached[0]() is index:
+        return cached[1].regular
+    wall, _ = _wall_ticks(index)
+    return wall_session_mask(wall, index.unit, bar)
+
+def wall_session_mask(wall, resolution="ns", bar=0):
+    """session_mask() of naive New York wall-clock int64 ticks of `resolution` (for callers that have them)."""
+    tick = _DAY // (86_400 * _TICKS_PER_SECOND[resolution])
+    return _regular(wall, tick, bar)[0] if len(wall) else np.zeros(0, dtype=bool)
+
+_masks = {}     # (id(index), bar ns) -> (weakref to the index, SessionMasks)
+
+def _key(index, bar):
+    return id(index), None if bar is None else pd.Timedelta(bar).value
+
+def _compute_masks(index, bar):
+    wall, tick = _wall_ticks(index)
+    n = len(wall)
+    if not n:
+        empty = np.zeros(0, dtype=bool)
+        return SessionMasks(*([empty] * 8))
+
+    regular, day, table, rows = _regular(wall, tick, bar)
+    half_day = table.early[rows]
+
+    positions = np.flatnonzero(regular)
+    week = (day + 3) // 7       # 1970-01-01 was a Thursday: Monday-based weeks
+    month = table.month[rows]
+    edges = []
+    for key in (day, week, month):
+        first, last = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        if len(positions):
+            key = key[positions]
+            change = key[1:] != key[:-1]
+            first[positions[np.r_[True, change]]] = True
+            last[positions[np.r_[change, True]]] = True
+        edges += [first, last]
+
+    arrays = [regular, half_day, *edges]
+    for array in arrays:
+        array.flags.writeable = False
+    return SessionMasks(*arrays)
+
+def _regular(wall, tick, bar):
+    """(regular mask, day numbers, calendar table, table rows) of wall-clock ticks (ns per tick: `tick`)."""
+    if bar is None:
+        steps = np.diff(wall)
+        steps = steps[steps > 0]
+        bar = int(steps.min()) if len(steps) else 0
+    else:
+        bar = pd.Timedelta(bar).value // tick
+
+    # Ticks of the index's own unit: converting a long index to ns costs more than the rest
+    day_ticks = _DAY // tick
+    day = wall // day_ticks
+    table = _table_for(day)
+    rows = day - table.first
+    if bar > day_ticks:
+        return np.ones(len(wall), dtype=bool), day, table, rows
+    time_of_day = wall - day * day_ticks
+    # Closed days close at -1: nothing is inside them. A zero-length bar is one
+    # tick long: it must start at or after the open.
+    regular = ((time_of_day <= table.closes(tick)[rows])
+               & (time_of_day > OPEN.value // tick - max(bar, 1)))
+    return regular, day, table, rows
+
+class _Table:
+    """Dense per-day calendar from January 1st of `first_year` to December 31st of `last_year`."""
+
+    def __init__(self, first_year, last_year):
+        self.first = _day_number(pd.Timestamp(first_year, 1, 1))
+        last = _day_number(pd.Timestamp(last_year, 12, 31))
+        days = np.arange(self.first, last + 1)
+        closed = [_day_number(d) for year in range(first_year, last_year + 1) for d in holidays(year)]
+        early = [_day_number(d) for year in range(first_year, last_year + 1) for d in early_closes(year)]
+        self.trading = ((days + 3) % 7 < 5) & ~np.isin(days, closed)
+        self.early = np.isin(days, early)
+        self.month = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        # Close as ns after midnight; closed days keep -1 so no bar falls inside them
+        self.close = np.where(self.early, EARLY_CLOSE.value, CLOSE.value)
+        self.close[~self.trading] = -1
+        self._closes = {}
+
+    def closes(self, tick):
+        """`close` in ticks of `tick` ns (closed days stay -1)."""
+        if tick not in self._closes:
+            self._closes[tick] = np.where(self.close < 0, -1, self.close // tick)
+        return self._closes[tick]
+
+@functools.lru_cache(maxsize=16)
+def _table(first_year, last_year):
+    return _Table(first_year, last_year)
+
+def _table_for(days):
+    """The table covering the (int64) day numbers `days`."""
+    first = pd.Timestamp(int(days.min()) * _DAY).year
+    last = pd.Timestamp(int(days.max()) * _DAY).year
+    return _table(first, last)
+
+def _wall_ticks(index):
+    """
+    (New York wall-clock times of a DatetimeIndex as int64 ticks of its unit,
+    ns per tick). A naive index is taken as wall-clock already.
+    """
+    if index.tz is not None:
+        index = index.tz_convert(TZ).tz_localize(None)
+    return index.asi8, _DAY // (86_400 * _TICKS_PER_SECOND[index.unit])
+
+def _day_number(date):
+    return pd.Timestamp(date).value // _DAY
+
+def _nth_weekday(year, month, weekday, n):
+    """The n-th `weekday` (Monday = 0) of a month."""
+    first = pd.Timestamp(year, month, 1)
+    return first + pd.Timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+def _observed(day):
+    """A fixed-date holiday on a weekend is observed on the Friday before / Monday after."""
+    if day.weekday() == 5:
+        return day - pd.Timedelta(days=1)
+    if day.weekday() == 6:
+        return day + pd.Timedelta(days=1)
+    return day
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return pd.Timestamp(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
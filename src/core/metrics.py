@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# The headline numbers written to summary_log.csv, computed exactly the way
+# backtesting.py's compute_stats() does, for equity curves that didn't come out
+# of a single Backtest.run() (stitched walk-forward curves, vectorized runs, ...).
+
+_NS_PER_DAY = 86_400_000_000_000
+
+def _data_period(index):
+    """Median bar spacing of the last 100 bars."""
+    return pd.Timedelta(np.median(np.diff(index[-100:].as_unit('ns').asi8)))
+
+def _geometric_mean(returns):
+    returns = np.nan_to_num(returns) + 1
+    if np.any(returns <= 0):
+        return 0
+    return np.exp(np.log(returns).sum() / (len(returns) or np.nan)) - 1
+
+def period_layout(index):
+    """
+    (annual periods, period, last-bar-of-period mask or None) used by sharpe_ratio().
+    Only depends on the index, so callers scoring many curves on one frame compute it once.
+    """
+    annual_trading_days, freq = _periods(_data_period(index).days,
+                                         np.isin(index.dayofweek, (5, 6)).mean())
+
+    last_of_day = None
+    if freq == 'D' and index.tz is None:
+        # Same rows resample('D').last().dropna() picks, without resampling
+        day = index.as_unit('ns').asi8 // _NS_PER_DAY
+        last_of_day = np.r_[day[1:] != day[:-1], True]
+    return annual_trading_days, freq, last_of_day
+
+def _periods(freq_days, weekend_share):
+    """(annual periods, resample rule) for a bar spacing in days and the share of weekend bars."""
+    have_weekends = weekend_share > 2 / 7 * .6
+    annual_trading_days = (
+        52 if freq_days == 7 else
+        12 if freq_days == 31 else
+        1 if freq_days == 365 else
+        (365 if have_weekends else 252))
+    return annual_trading_days, {7: 'W', 31: 'ME', 365: 'YE'}.get(freq_days, 'D')
+
+def sharpe_ratio(equity, index, layout=None):
+    """Annualized Sharpe of an equity curve (backtesting.py convention: compounded daily returns)."""
+    equity = np.asarray(equity, dtype=float)
+    annual_trading_days, freq, last_of_day = layout or period_layout(index)
+
+    if last_of_day is not None:
+        values = equity[last_of_day]
+    else:
+        values = pd.Series(equity, index=index).resample(freq).last().dropna().to_numpy()
+    return _sharpe_of_period_values(values, annual_trading_days)
+
+def _sharpe_of_period_values(values, annual_trading_days):
+    """sharpe_ratio() from the equity at the last bar of each period."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        day_returns = values[1:] / values[:-1] - 1
+    day_returns = day_returns[~np.isnan(day_returns)]
+
+    gmean = _geometric_mean(day_returns)
+    variance = day_returns.var(ddof=1) if len(day_returns) > 1 else np.nan
+
+    annualized_return = (1 + gmean) ** annual_trading_days - 1
+    volatility = np.sqrt((variance + (1 + gmean) ** 2) ** annual_trading_days
+                         - (1 + gmean) ** (2 * annual_trading_days))
+    return (annualized_return * 100) / ((volatility * 100) or np.nan)
+
+def max_drawdown_pct(equity):
+    equity = np.asarray(equity, dtype=float)
+    dd = 1 - equity / np.maximum.accumulate(equity)
+    return -np.nan_to_num(dd.max()) * 100
+
+def summary_metrics(equity, index, trade_pnl=(), layout=None):
+    """
+    Return / Sharpe / Max DD / Win Rate / # Trades for an equity curve,
+    keyed like Backtest.run() stats. `layout`: optional period_layout(index).
+    """
+    equity = np.asarray(equity, dtype=float)
+    trade_pnl = np.asarray(trade_pnl, dtype=float)
+    n_trades = len(trade_pnl)
+
+    return {
+        'Return [%]': (equity[-1] - equity[0]) / equity[0] * 100,
+        'Sharpe Ratio': sharpe_ratio(equity, index, layout),
+        'Max. Drawdown [%]': max_drawdown_pct(equity),
+        'Win Rate [%]': np.nan if not n_trades else (trade_pnl > 0).mean() * 100,
+        '# Trades': n_trades,
+    }
+
+class RunningMetrics:
+    """
+    summary_metrics() of an equity curve that arrives in consecutive pieces
+    (core.chunked_backtest), without keeping the curve: only the first/last
+    values, the running peak and drawdown, the last value of each day and the
+    last 100 timestamps (for the bar spacing) are held. Results are identical
+    to summary_metrics() on the whole curve.
+    """
+
+    def __init__(self):
+        self.start = self.end = None
+        self.first = self.last = np.nan
+        self.peak = -np.inf
+        self.drawdown = 0.
+        self.bars = self.weekend_bars = 0
+        self.n_trades = self.wins = 0
+        self._tail = None           # last 100 timestamps
+        self._days = []             # (timestamp, equity) at the last bar of each finished day
+        self._open_day = None       # (day, timestamp, equity) of the last bar seen
+
+    def update(self, equity, index):
+        equity = np.asarray(equity, dtype=float)
+        if not len(equity):
+            return
+        if self.start is None:
+            self.start, self.first = index[0], equity[0]
+        self.end, self.last = index[-1], equity[-1]
+
+        peaks = np.maximum.accumulate(np.r_[self.peak, equity])[1:]
+        self.drawdown = np.max([self.drawdown, (1 - equity / peaks).max()])
+        self.peak = peaks[-1]
+
+        self.bars += len(index)
+        self.weekend_bars += int(np.isin(index.dayofweek, (5, 6)).sum())
+        self._tail = index[-100:] if self._tail is None else self._tail.append(index[-100:])[-100:]
+
+        # Calendar day in the index's own time zone, like resample('D')
+        wall = index.tz_localize(None) if index.tz is not None else index
+        day = wall.as_unit('ns').asi8 // _NS_PER_DAY
+        if self._open_day is not None and self._open_day[0] != day[0]:
+            self._days.append(self._open_day[1:])
+        last_of_day = np.flatnonzero(day[1:] != day[:-1])
+        self._days.extend(zip(index[last_of_day], equity[last_of_day]))
+        self._open_day = (day[-1], index[-1], equity[-1])
+
+    def add_trades(self, pnl):
+        pnl = np.asarray(pnl, dtype=float)
+        self.n_trades += len(pnl)
+        self.wins += int((pnl > 0).sum())
+
+    def result(self):
+        """Same keys and values as summary_metrics()."""
+        annual_trading_days, freq = _periods(_data_period(self._tail).days, self.weekend_bars / self.bars)
+        times, values = zip(*(self._days + [self._open_day[1:]]))
+        days = pd.Series(values, index=pd.DatetimeIndex(times), dtype=float)
+        if freq != 'D' or days.index.tz is not None:
+            days = days.resample(freq).last().dropna()
+
+        return {
+            'Return [%]': (self.last - self.first) / self.first * 100,
+            'Sharpe Ratio': _sharpe_of_period_values(days.to_numpy(), annual_trading_days),
+            'Max. Drawdown [%]': -np.nan_to_num(self.drawdown) * 100,
+            'Win Rate [%]': np.nan if not self.n_trades else self.wins / self.n_trades * 100,
+            '# Trades': self.n_trades,
+        }
@@ -0,0 +1,149 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Memory-mapped snapshots of one symbol/timeframe's bars, one per year
+# partition of the Parquet store: raw .npy arrays that np.load(mmap_mode='r')
+# opens without reading, so "loading" a symbol is a few file opens and a frame
+# within one year is a view of the page cache.
+#
+#   {root}/{symbol}/{timeframe}/{year}/{version}/index.npy   int64 epoch (UTC) ticks
+#                                                wall.npy    int64 New York wall-clock ticks
+#                                                block.npy   columns x rows, float64 or float32
+#                                                meta.json   columns, dtype, unit, tz, index name
+#
+# The Parquet store stays the source of truth. A year's version is a hash of
+# the fingerprint of its parts (ParquetStore.partitions) and of the dtype:
+# once new bars arrive, the next read rebuilds only the years whose parts
+# changed (usually the current one) and deletes their old versions. The
+# wall-clock index is stored too, so the tz-naive frame Backtest wants is as
+# free as the tz-aware one (no tz_localize(None) copy of the index). Both share
+# the column block, which maps 1:1 onto a single pandas block, like
+# core.shared_data. A range spanning several years is one concatenation of the
+# mapped slices (a copy from the page cache, nothing decoded). Frames are
+# read-only.
+#
+# float32 halves the columns (and the page cache they occupy); prices keep ~7
+# significant digits, volumes are exact up to 2**24 per bar.
+
+DTYPES = {"float64": np.float64, "float32": np.float32}
+
+class MmapStore:
+    def __init__(self, root, dtype="float64"):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown mmap dtype '{dtype}'. Options: {', '.join(DTYPES)}")
+        self.root = root
+        self.dtype = np.dtype(DTYPES[dtype])
+
+    def _dir(self, symbol, tf_tag):
+        return os.path.join(self.root, symbol, tf_tag)
+
+    def version(self, year, fingerprint):
+        """Snapshot name of `year` built from parts with `fingerprint` (ParquetStore.partitions)."""
+        return hashlib.sha1(f"{year}:{fingerprint}|{self.dtype.str}".encode()).hexdigest()[:16]
+
+    def read(self, symbol, tf_tag, partitions, start=None, end=None, build=None):
+        """
+        (tz-aware, tz-naive) frames of the bars in [start, end], mapped from
+        the snapshots of the years of `partitions` ([(year, fingerprint)]) that
+        overlap the range. A year without a snapshot of its fingerprint yet is
+        built from `build(year)`, that year's whole history. Empty frames if no
+        bars are in range.
+        """
+        base = self._dir(symbol, tf_tag)
+        years = [(year, fingerprint) for year, fingerprint in partitions
+                 if (start is None or year >= start.year) and (end is None or year <= end.year)]
+        pieces, built = [], False
+        for year, fingerprint in years:
+            folder = os.path.join(base, str(year), self.version(year, fingerprint))
+            if not os.path.exists(os.path.join(folder, "meta.json")):
+                self.write(folder, build(year))
+                built = True
+            piece = _map(folder, start, end)
+            if piece is not None:
+                pieces.append(piece)
+        if built:
+            self._drop_years(base, {year for year, _ in partitions})
+        if not pieces:
+            # Like ParquetStore.read()
+            return pd.DataFrame(), pd.DataFrame()
+        if len(pieces) == 1:
+            return _frames(*pieces[0])
+        meta = pieces[0][0]
+        return _frames(meta, *(np.concatenate(arrays, axis=-1) for arrays in list(zip(*pieces))[1:]))
+
+    def write(self, folder, df):
+        """Snapshots `df` (sorted, tz-aware index) in `folder`, then drops the other versions next to it."""
+        tmp_folder = folder + ".tmp"
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        os.makedirs(tmp_folder)
+
+        index = df.index
+        meta = {"columns": [str(c) for c in df.columns], "dtype": self.dtype.str,
+                "unit": index.unit if len(df) else "ns", "tz": str(index.tz) if len(df) else None,
+                "index_name": index.name}
+        np.save(os.path.join(tmp_folder, "index.npy"), index.asi8 if len(df) else np.empty(0, np.int64))
+        np.save(os.path.join(tmp_folder, "wall.npy"),
+                index.tz_localize(None).asi8 if len(df) else np.empty(0, np.int64))
+        block = np.empty((len(df.columns), len(df)), dtype=self.dtype)
+        for i, column in enumerate(df.columns):
+            block[i] = df[column].to_numpy(dtype=self.dtype)
+        np.save(os.path.join(tmp_folder, "block.npy"), block)
+        # meta.json last: a folder without one is never read
+        with open(os.path.join(tmp_folder, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        # Temp folder + rename: readers only ever see complete snapshots
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp_folder, folder)
+        parent = os.path.dirname(folder)
+        for name in os.listdir(parent):
+            if name != os.path.basename(folder):
+                # Mapped files outlive their unlink (POSIX); elsewhere they are retried next time
+                shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+    def _drop_years(self, base, years):
+        """Deletes snapshots of years no longer stored (and whole-history snapshots of older layouts)."""
+        for name in os.listdir(base) if os.path.isdir(base) else ():
+            if not (name.isdigit() and int(name) in years):
+                shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+    def discard(self, symbol, tf_tag=None):
+        """Deletes the snapshots of symbol/timeframe (tf_tag=None: every timeframe)."""
+        folder = os.path.join(self.root, symbol) if tf_tag is None else self._dir(symbol, tf_tag)
+        shutil.rmtree(folder, ignore_errors=True)
+
+def _map(folder, start, end):
+    """(meta, index, wall, block) slices of the snapshot in `folder` for [start, end], or None if none are in range."""
+    with open(os.path.join(folder, "meta.json")) as f:
+        meta = json.load(f)
+    index = np.load(os.path.join(folder, "index.npy"), mmap_mode="r")
+    wall = np.load(os.path.join(folder, "wall.npy"), mmap_mode="r")
+    block = np.load(os.path.join(folder, "block.npy"), mmap_mode="r")
+
+    unit = meta["unit"]
+    # Binary search on the mapped index: a few pages read, not the whole file
+    first = 0 if start is None else index.searchsorted(_ticks(start, unit), side="left")
+    stop = len(index) if end is None else index.searchsorted(_ticks(end, unit), side="right")
+    if first >= stop:
+        return None
+    return meta, index[first:stop], wall[first:stop], block[:, first:stop]
+
+def _frames(meta, index, wall, block):
+    unit, tz, columns = meta["unit"], meta["tz"], meta["columns"]
+    # int64 ticks with a tz dtype are taken as UTC epoch values as they are (no copy)
+    aware = pd.DatetimeIndex(np.asarray(index),
+                             dtype=pd.DatetimeTZDtype(unit, tz) if tz else f"datetime64[{unit}]",
+                             name=meta["index_name"], copy=False)
+    naive = pd.DatetimeIndex(np.asarray(wall), dtype=f"datetime64[{unit}]", name=meta["index_name"], copy=False)
+    # block[:, a:b].T is (rows x cols) F-ordered: pandas adopts it as its block without copying
+    values = np.asarray(block).T
+    return (pd.DataFrame(values, index=aware, columns=columns, copy=False),
+            pd.DataFrame(values, index=naive, columns=columns, copy=False))
+
+def _ticks(moment, unit):
+    """Epoch ticks of a tz-aware moment in the index's unit (Timestamp.value is always ns)."""
+    return pd.Timestamp(moment).as_unit(unit).asm8.astype(np.int64)
@@ -0,0 +1,109 @@
+import os
+import time
+import traceback
+import multiprocessing as mp
+from multiprocessing.connection import wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+@dataclass
+class TaskResult:
+    """Outcome of one isolated task. `value` is only meaningful when `ok` is True."""
+    key: Any
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+def resolve_workers(workers):
+    """None or <= 0 means 'use every core'."""
+    if not workers or workers <= 0:
+        return os.cpu_count() or 1
+    return int(workers)
+
+def _task_entry(conn, func, args):
+    """Child process body: run the task and ship the outcome back through the pipe."""
+    try:
+        conn.send((True, func(*args), None))
+    except BaseException as e:
+        conn.send((False, None, f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+    finally:
+        conn.close()
+
+def run_isolated(func: Callable, tasks: Iterable[tuple], workers=None, timeout=None) -> Iterator[TaskResult]:
+    """
+    Runs `func(*args)` for every `(key, args)` in `tasks`, one child process per task,
+    with at most `workers` children alive at a time.
+
+    - Isolation: a task that raises, segfaults or gets OOM-killed only fails itself.
+    - Timeouts: a task running longer than `timeout` seconds is terminated.
+    - Ordering: results are yielded in the same order as `tasks`, regardless of
+      which child finishes first, so callers can write logs deterministically.
+    - Laziness: `tasks` may be a generator; the next task is only pulled when a
+      worker slot frees up, so expensive task setup (e.g. loading data) is paced
+      by the pool.
+    """
+    task_iter = iter(tasks)
+    workers = resolve_workers(workers)
+    ctx = mp.get_context()
+
+    running = {}   # position -> (key, process, conn, started)
+    done = {}      # position -> TaskResult
+    submitted = 0
+    next_to_yield = 0
+    exhausted = False
+
+    def finish(pos, result):
+        _, proc, conn, _ = running.pop(pos)
+        conn.close()
+        proc.join(timeout=1)
+        done[pos] = result
+
+    try:
+        while not exhausted or running or done:
+            # Keep the pool topped up
+            while not exhausted and len(running) < workers:
+                try:
+                    key, args = next(task_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                parent_conn, child_conn = ctx.Pipe(duplex=False)
+                proc = ctx.Process(target=_task_entry, args=(child_conn, func, args), daemon=True)
+                proc.start()
+                child_conn.close()
+                running[submitted] = (key, proc, parent_conn, time.perf_counter())
+                submitted += 1
+
+            # Collect whatever finished
+            if running:
+                ready = wait([conn for _, _, conn, _ in running.values()], timeout=0.5)
+            else:
+                ready = []
+            now = time.perf_counter()
+            for pos in list(running):
+                key, proc, conn, started = running[pos]
+                elapsed = now - started
+
+                if conn in ready:
+                    try:
+                        ok, value, error = conn.recv()
+                    except EOFError:
+                        # Child died without reporting (crash, kill, os._exit)
+                        proc.join(timeout=1)
+                        ok, value, error = False, None, f"Worker exited with code {proc.exitcode}"
+                    finish(pos, TaskResult(key, ok, value, error, elapsed))
+
+                elif timeout and elapsed > timeout:
+                    proc.terminate()
+                    finish(pos, TaskResult(key, False, None, f"Timed out after {timeout}s", elapsed))
+
+            # Release results in submission order
+            while next_to_yield in done:
+                yield done.pop(next_to_yield)
+                next_to_yield += 1
+    finally:
+        # Generator closed early (or parent interrupted): don't leave orphans behind
+        for _, proc, conn, _ in running.values():
+            proc.terminate()
+            conn.close()
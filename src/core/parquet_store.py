@@ -0,0 +1,239 @@
+import os
+import hashlib
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+
+# Local bar store: one Parquet dataset per symbol and timeframe, partitioned by
+# (New York) calendar year:
+#
+#   {root}/{symbol}/{timeframe}/year=2024/part-00000.parquet
+#                                        /part-00001.parquet ...
+#
+# Rows are sorted by timestamp and written in row groups of ROW_GROUP_ROWS with
+# column statistics. A date-range read only opens the years it spans, and the
+# timestamp filter is pushed down to pyarrow, which skips every row group whose
+# min/max statistics fall outside the range instead of decoding it.
+#
+# Writes are append-only: new bars become a new part file (temp file + rename,
+# so a crash never leaves a half-written part), and a higher part number wins
+# when two parts hold the same timestamp. Once a year has more than
+# `compact_after` parts, a background thread merges them back into one.
+
+ROW_GROUP_ROWS = 16_384         # ~6 weeks of regular-hours minute bars
+CODECS = ("zstd", "snappy", "gzip", "lz4", "brotli", "none")
+
+class ParquetStore:
+    def __init__(self, root, compression="zstd", compact_after=8):
+        if compression not in CODECS:
+            raise ValueError(f"Unknown Parquet codec '{compression}'. Options: {', '.join(CODECS)}")
+        self.root = root
+        self.compression = compression
+        self.compact_after = compact_after
+        # Guards the set of part files: readers vs. a compaction swapping them
+        self._lock = threading.RLock()
+        self._compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parquet-compact")
+        self._pending = {}          # year folder -> Future of its scheduled compaction
+
+    def _dir(self, symbol, tf_tag):
+        return os.path.join(self.root, symbol, tf_tag)
+
+    def _years(self, symbol, tf_tag, start=None, end=None):
+        """[(year folder, part files by part number)] of the years overlapping [start, end], oldest first."""
+        base = self._dir(symbol, tf_tag)
+        if not os.path.isdir(base):
+            return []
+
+        years = []
+        for name in sorted(os.listdir(base)):
+            if not name.startswith("year="):
+                continue
+            year = int(name[len("year="):])
+            if (start is not None and year < start.year) or (end is not None and year > end.year):
+                continue
+            folder = os.path.join(base, name)
+            parts = _parts(folder)
+            if parts:
+                years.append((folder, parts))
+        return years
+
+    def coverage_path(self, symbol, tf_tag):
+        """Where the symbol/timeframe's coverage manifest (core.coverage) lives, next to its years."""
+        return os.path.join(self._dir(symbol, tf_tag), "coverage.json")
+
+    def partitions(self, symbol, tf_tag, start=None, end=None):
+        """
+        [(year, fingerprint)] of the stored years overlapping [start, end]. A
+        year's fingerprint changes whenever its part files do (append, compaction).
+        """
+        with self._lock:
+            partitions = []
+            for folder, parts in self._years(symbol, tf_tag, start, end):
+                stamp = "|".join(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+                                 for path in parts for stat in [os.stat(path)])
+                year = int(os.path.basename(folder)[len("year="):])
+                partitions.append((year, hashlib.sha1(stamp.encode()).hexdigest()))
+        return partitions
+
+    def exists(self, symbol, tf_tag):
+        return bool(self._years(symbol, tf_tag))
+
+    def stored_range(self, symbol, tf_tag):
+        """(first, last) stored timestamp, from row-group statistics only (None if nothing is stored)."""
+        with self._lock:
+            years = self._years(symbol, tf_tag)
+            if not years:
+                return None
+            firsts = []
+            for path in years[0][1]:
+                firsts.append(_timestamp_stats(pq.ParquetFile(path).metadata, 0)[0])
+            lasts = []
+            for path in years[-1][1]:
+                metadata = pq.ParquetFile(path).metadata
+                lasts.append(_timestamp_stats(metadata, metadata.num_row_groups - 1)[1])
+        return min(firsts), max(lasts)
+
+    def read(self, symbol, tf_tag, start=None, end=None):
+        """Bars in [start, end] (tz-aware bounds, None = open-ended); empty DataFrame if none."""
+        filters = _range_filter(start, end)
+        with self._lock:
+            frames = [_read_parts(parts, filters) for _, parts in self._years(symbol, tf_tag, start, end)]
+        frames = [df for df in frames if df is not None]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    def iter_batches(self, symbol, tf_tag, start=None, end=None, batch_rows=100_000):
+        """
+        read() as consecutive frames of at most `batch_rows` bars. A compacted
+        year streams only its overlapping row groups; a year still split in
+        several parts is merged in memory first (one year at most).
+        """
+        filters = _range_filter(start, end)
+        for folder, _ in self._years(symbol, tf_tag, start, end):
+            with self._lock:
+                parts = _parts(folder)
+                if len(parts) > 1:
+                    df = _read_parts(parts, filters)
+                else:
+                    # Open under the lock: the handle stays valid if a compaction swaps the file
+                    parquet = pq.ParquetFile(parts[0])
+            if len(parts) > 1:
+                for i in range(0, 0 if df is None else len(df), batch_rows):
+                    yield df.iloc[i:i + batch_rows]
+                continue
+
+            groups = [i for i in range(parquet.metadata.num_row_groups)
+                      if _overlaps(_timestamp_stats(parquet.metadata, i), start, end)]
+            if not groups:
+                continue
+            for batch in parquet.iter_batches(batch_size=batch_rows, row_groups=groups):
+                df = pa.Table.from_batches([batch]).to_pandas()
+                df = df.loc[start:end]
+                if not df.empty:
+                    yield df
+
+    def write(self, symbol, tf_tag, df):
+        """
+        Adds bars (newer values win on duplicate timestamps) as one new part per
+        year `df` touches; stored parts are never rewritten here. Years left with
+        more than `compact_after` parts get a background compaction.
+        """
+        if df.empty:
+            return
+        df = df.sort_index(kind='stable')
+        df = df[~df.index.duplicated(keep='last')]
+        for year, part in df.groupby(df.index.year):
+            folder = os.path.join(self._dir(symbol, tf_tag), f"year={year}")
+            os.makedirs(folder, exist_ok=True)
+            with self._lock:
+                parts = _parts(folder)
+                number = _part_number(parts[-1]) + 1 if parts else 0
+                self._write_file(os.path.join(folder, f"part-{number:05d}.parquet"), part)
+            if len(parts) + 1 > self.compact_after:
+                self._schedule_compaction(folder)
+
+    def compact(self, folder):
+        """
+        Merges a year's parts into one. The merged file replaces the newest part
+        it read, so parts added meanwhile keep precedence; then the others go.
+        """
+        with self._lock:
+            parts = _parts(folder)
+        if len(parts) < 2:
+            return
+        merged = _read_parts(parts, None)
+
+        # Not a part name, so readers ignore it until it is swapped in
+        merged_path = parts[-1] + ".compact"
+        self._write_file(merged_path, merged)
+        with self._lock:
+            os.replace(merged_path, parts[-1])
+            for path in parts[:-1]:
+                os.remove(path)
+
+    def wait(self):
+        """Blocks until scheduled compactions are done (call before exiting)."""
+        for future in list(self._pending.values()):
+            future.result()
+
+    def migrate(self, symbol, tf_tag, legacy_path):
+        """Moves a single-file cache ({symbol}_{tf}.parquet) into the dataset, once."""
+        if not os.path.exists(legacy_path) or self.exists(symbol, tf_tag):
+            return False
+        self.write(symbol, tf_tag, pd.read_parquet(legacy_path))
+        os.remove(legacy_path)
+        return True
+
+    def _schedule_compaction(self, folder):
+        with self._lock:
+            future = self._pending.get(folder)
+            if future is None or future.done():
+                self._pending[folder] = self._compactor.submit(self.compact, folder)
+
+    def _write_file(self, path, df):
+        tmp_path = path + ".tmp"
+        pq.write_table(pa.Table.from_pandas(df), tmp_path,
+                       compression=self.compression,
+                       row_group_size=ROW_GROUP_ROWS,
+                       write_statistics=True)
+        os.replace(tmp_path, path)
+
+def _part_number(path):
+    return int(os.path.basename(path)[len("part-"):-len(".parquet")])
+
+def _parts(folder):
+    """A year folder's part files, oldest (lowest part number) first."""
+    names = [name for name in os.listdir(folder) if name.startswith("part-") and name.endswith(".parquet")]
+    return sorted((os.path.join(folder, name) for name in names), key=_part_number)
+
+def _read_parts(parts, filters):
+    """One year's parts as a sorted frame; a later part wins on duplicate timestamps. None if empty."""
+    tables = [pq.read_table(path, filters=filters) for path in parts]
+    tables = [t for t in tables if t.num_rows]
+    if not tables:
+        return None
+    df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    if len(tables) > 1 and not (df.index.is_monotonic_increasing and df.index.is_unique):
+        df = df.sort_index(kind='stable')
+        df = df[~df.index.duplicated(keep='last')]
+    return df
+
+def _timestamp_stats(metadata, row_group):
+    """(min, max) timestamp of one row group."""
+    column = metadata.schema.to_arrow_schema().get_field_index("timestamp")
+    stats = metadata.row_group(row_group).column(column).statistics
+    return pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+
+def _overlaps(bounds, start, end):
+    return (start is None or bounds[1] >= start) and (end is None or bounds[0] <= end)
+
+def _range_filter(start, end):
+    filters = []
+    if start is not None:
+        filters.append(("timestamp", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("timestamp", "<=", pd.Timestamp(end)))
+    return filters or None
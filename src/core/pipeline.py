@@ -0,0 +1,192 @@
+import time
+import queue
+import threading
+import traceback
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# A staged pipeline of threads joined by bounded queues: each item flows
+# through every stage in order, and each stage works on its own item, so a
+# symbol's data loads (disk, network) while the previous one simulates and the
+# one before has its report written.
+#
+#   pipeline = Pipeline([Stage("load", load), Stage("backtest", run, backlog=2), Stage("report", write)],
+#                       max_bytes=2 * 2**30, sizeof=frame_bytes)
+#   for outcome in pipeline.run((symbol, symbol) for symbol in symbols):
+#       ...                                   # in input order
+#   print(pipeline.summary())                 # per-stage timing, bottleneck
+#
+# Backpressure: a stage blocks while `backlog` of its outputs wait for the next
+# stage, and the first stage's outputs (the loaded frames) also wait for room
+# in a byte budget that is freed when their item leaves the pipeline. A stage
+# function gets (key, value) and returns the value for the next stage; None
+# ends the item there (nothing to do), an exception fails it. Either way later
+# stages skip it. One thread per stage keeps items in order.
+
+_DONE = object()
+
+@dataclass
+class Stage:
+    name: str
+    func: Any                   # func(key, value) -> value for the next stage (None: stop here)
+    backlog: int = 1            # outputs of the previous stage allowed to wait for this one
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    failed: int = 0
+    busy: float = 0.0           # in the stage function
+    starved: float = 0.0        # waiting for an item
+    blocked: float = 0.0        # waiting for room downstream (queue or byte budget)
+
+@dataclass
+class Outcome:
+    """What became of one item. `value` is the last stage's output (None if a stage stopped it)."""
+    key: Any
+    value: Any = None
+    error: Optional[str] = None
+    stage: Optional[str] = None     # where it stopped or failed (None: went through every stage)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+class ByteBudget:
+    """Bytes held by items in flight. One item may always enter, even if it alone exceeds the budget."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used = self.peak = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size, stop):
+        with self._cond:
+            while self.used and self.used + size > self.max_bytes and not stop.is_set():
+                self._cond.wait(0.1)
+            self.used += size
+            self.peak = max(self.peak, self.used)
+
+    def release(self, size):
+        with self._cond:
+            self.used -= size
+            self._cond.notify_all()
+
+class _Item:
+    __slots__ = ("key", "value", "size", "error", "stage")
+
+    def __init__(self, key, value):
+        self.key, self.value = key, value
+        self.size = 0
+        self.error = self.stage = None
+
+class Pipeline:
+    def __init__(self, stages, max_bytes=None, sizeof=None):
+        self.stages = stages
+        self.budget = ByteBudget(max_bytes) if max_bytes else None
+        self.sizeof = sizeof            # sizeof(first stage output) -> bytes, for the budget
+        self.stats = [StageStats(stage.name) for stage in stages]
+        self.elapsed = 0.0
+
+    def run(self, items):
+        """Feeds the (key, value) `items` through the stages; yields an Outcome per item, in order."""
+        stop = threading.Event()
+        # queues[i] feeds stage i; the last one collects the results
+        queues = [queue.Queue(maxsize=stage.backlog) for stage in self.stages] + [queue.Queue()]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0], stop), daemon=True,
+                                    name="pipeline-feed")]
+        threads += [threading.Thread(target=self._work, args=(i, queues[i], queues[i + 1], stop), daemon=True,
+                                     name=f"pipeline-{stage.name}") for i, stage in enumerate(self.stages)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                if self.budget is not None:
+                    self.budget.release(item.size)
+                yield Outcome(item.key, item.value, item.error, item.stage)
+        finally:
+            # Also when the caller stops early: stages drop what they hold and exit
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.perf_counter() - start
+
+    def _feed(self, items, out, stop):
+        try:
+            for key, value in items:
+                if not _put(out, _Item(key, value), stop):
+                    return
+        finally:
+            _put(out, _DONE, stop)
+
+    def _work(self, position, inbox, out, stop):
+        stage, stats = self.stages[position], self.stats[position]
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            item = _get(inbox, stop)
+            stats.starved += time.perf_counter() - t0
+            if item is None:
+                return
+            if item is _DONE:
+                _put(out, _DONE, stop)
+                return
+
+            if item.error is None and item.stage is None:
+                t0 = time.perf_counter()
+                try:
+                    item.value = stage.func(item.key, item.value)
+                    if item.value is None:
+                        item.stage = stage.name
+                except Exception as e:
+                    item.value, item.stage = None, stage.name
+                    item.error = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+                    stats.failed += 1
+                stats.busy += time.perf_counter() - t0
+                stats.items += 1
+
+            t0 = time.perf_counter()
+            if position == 0 and self.budget is not None:
+                item.size = self.sizeof(item.value) if self.sizeof and item.value is not None else 0
+                self.budget.acquire(item.size, stop)
+            _put(out, item, stop)
+            stats.blocked += time.perf_counter() - t0
+
+    def summary(self):
+        """Per-stage timing of the last run and the stage that bounded it."""
+        if not self.stats or not self.elapsed:
+            return "Pipeline: not run"
+        sequential = sum(s.busy for s in self.stats)
+        lines = [f"Pipeline: {self.stats[0].items} items in {self.elapsed:.1f}s "
+                 f"(stages busy {sequential:.1f}s in total)"]
+        for s in self.stats:
+            failed = f", {s.failed} failed" if s.failed else ""
+            lines.append(f"   {s.name:<10} {s.items} items{failed} | busy {s.busy:6.1f}s | "
+                         f"waiting for input {s.starved:6.1f}s | blocked downstream {s.blocked:6.1f}s")
+        bottleneck = max(self.stats, key=lambda s: s.busy)
+        lines.append(f"   Bottleneck: {bottleneck.name} (busy {bottleneck.busy / self.elapsed:.0%} of the run)")
+        if self.budget is not None:
+            lines.append(f"   Peak in flight: {self.budget.peak / 2**20:.1f} MB of {self.budget.max_bytes / 2**20:.0f} MB")
+        return "\n".join(lines)
+
+def _put(q, item, stop):
+    """Blocking put that gives up once `stop` is set. False if it gave up."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q, stop):
+    """Blocking get that gives up (None) once `stop` is set."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
@@ -2,16 +2,21 @@ import os
 import pandas as pd
 import json
 import csv
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime 
 
 class ReportGenerator:
     @staticmethod
-    def save_report(backtest_instance, stats, symbol, timeframe, strategy_class=None, output_dir="output"):
+    def save_report(backtest_instance, stats, symbol, timeframe, strategy_class=None, output_dir="output", log=True):
         """
         Generates a Dashboard HTML report:
         - Top Left: Interactive Chart
         - Right: Performance Metrics
         - Bottom: Tabbed Panel (Strategy Info | Trade History)
+
+        Returns the summary_log.csv row for this run. With log=False the row is
+        only returned, so a parent process can write it (see parallel BATCH mode).
         """
         strat_instance = stats._strategy
         strat_name = strat_instance.__class__.__name__
@@ -34,7 +39,9 @@ class ReportGenerator:
         full_path = os.path.join(output_folder, filename)
         
         # 1. Generate the standard Bokeh plot to a temporary file
-        temp_file = "temp_plot.html"
+        # (unique per call, so parallel workers don't overwrite each other's plot)
+        fd, temp_file = tempfile.mkstemp(prefix="temp_plot_", suffix=".html", dir=output_folder)
+        os.close(fd)
         backtest_instance.plot(filename=temp_file, open_browser=False)
         
         # 2. Read the generated HTML content
@@ -42,7 +49,7 @@ class ReportGenerator:
             html_content = f.read()
 
         report_title = os.path.basename(filename)
-        html_content = html_content.replace("<title>temp_plot.html</title>", f"<title>{report_title}</title>")
+        html_content = html_content.replace(f"<title>{temp_file}</title>", f"<title>{report_title}</title>")
         
         # --- PROCESS METRICS ---
         metrics = stats[stats.apply(lambda x: not isinstance(x, (pd.DataFrame, pd.Series, list)))]
@@ -150,17 +157,35 @@ class ReportGenerator:
         if os.path.exists(temp_file):
             os.remove(temp_file)
 
-        log_file = os.path.join(output_dir, strat_name, "summary_log.csv")
-        ReportGenerator._append_to_log(log_file, stats, symbol, timeframe, full_path)
+        row = ReportGenerator._build_log_row(stats, symbol, timeframe, full_path)
+        if log:
+            log_file = os.path.join(output_dir, strat_name, "summary_log.csv")
+            ReportGenerator.append_log_row(log_file, row)
+        return row
+
+    LOG_FIELDS = [
+        'Run_Time', 'Symbol', 'Timeframe', 'Strategy',
+        'Start', 'End', 
+        'Return_Pct', 'Sharpe_Ratio', 'Max_DD', 'Win_Rate', '#_Trades',
+        'Parameters', 
+        'Report_Path'
+    ]
 
     @staticmethod
     def _append_to_log(filepath, stats, symbol, timeframe, html_path):
         """Appends a single row of metrics to a CSV file."""
-        file_exists = os.path.isfile(filepath)
+        row = ReportGenerator._build_log_row(stats, symbol, timeframe, html_path)
+        ReportGenerator.append_log_row(filepath, row)
 
-        strat_obj = stats._strategy
+    @staticmethod
+    def _build_log_row(stats, symbol, timeframe, html_path, strat_obj=None):
+        """
+        Flattens stats + strategy parameters into one summary_log.csv row.
+        Parameters are read from `strat_obj` (default: the run's strategy instance).
+        """
+        strat_obj = stats._strategy if strat_obj is None else strat_obj
         params = {}
-        strat_name = strat_obj.__class__.__name__
+        strat_name = strat_obj.__name__ if isinstance(strat_obj, type) else strat_obj.__class__.__name__
 
         BLACKLIST = {
             'broker', 'data', 'orders', 'position', 'trades', 'closed_trades', 
@@ -178,14 +203,6 @@ class ReportGenerator:
 
         param_str = " | ".join([f"{k}:{v}" for k,v in params.items()])
 
-        fieldnames = [
-            'Run_Time', 'Symbol', 'Timeframe', 'Strategy',
-            'Start', 'End', 
-            'Return_Pct', 'Sharpe_Ratio', 'Max_DD', 'Win_Rate', '#_Trades',
-            'Parameters', 
-            'Report_Path'
-        ]
-        
         def safe_round(val):
             try: return round(float(val), 2)
             except: return 0.0
@@ -205,16 +222,134 @@ class ReportGenerator:
             'Parameters': param_str,
             'Report_Path': html_path
         }
-        
+        return data
+
+    @staticmethod
+    def append_log_row(filepath, row):
+        """
+        Appends one row to summary_log.csv.
+        The write happens under an exclusive lock, so several engines/processes
+        can share the same log without interleaving or duplicating the header.
+        """
         try:
-            with open(filepath, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                if not file_exists: writer.writeheader()
-                writer.writerow(data)
+            os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+            with ReportGenerator._file_lock(filepath + ".lock"):
+                file_exists = os.path.isfile(filepath) and os.path.getsize(filepath) > 0
+                with open(filepath, 'a', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=ReportGenerator.LOG_FIELDS)
+                    if not file_exists: writer.writeheader()
+                    writer.writerow(row)
             print(f"Stats logged to: {filepath}")
         except Exception as e:
             print(f"CSV Log Error: {e}")
 
+    @staticmethod
+    @contextmanager
+    def _file_lock(lock_path):
+        """Cross-process exclusive lock on a sidecar file (flock on POSIX, msvcrt on Windows)."""
+        with open(lock_path, "a+") as lock_file:
+            if os.name == "nt":
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def chunked_paths(strat_name, symbol, timeframe, output_dir="output"):
+        """(equity_path, trades_path) CSV files a CHUNKED run writes to as it goes."""
+        output_folder = os.path.join(output_dir, strat_name, symbol)
+        os.makedirs(output_folder, exist_ok=True)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stem = f"{strat_name}_{symbol}_{timeframe.value}_{stamp}"
+        return (os.path.join(output_folder, f"{stem}_equity.csv"),
+                os.path.join(output_folder, f"{stem}_trades.csv"))
+
+    @staticmethod
+    def save_chunked(stats, strategy_class, params, symbol, timeframe, output_dir="output", log=True):
+        """
+        summary_log.csv row of a CHUNKED run (core.chunked_backtest). Its equity
+        curve and trades are already on disk, so there is no HTML report and
+        Report_Path is the equity CSV. Returns the row (log=False: only returns it).
+        """
+        strat_obj = type(strategy_class.__name__, (strategy_class,), dict(params))
+        row = ReportGenerator._build_log_row(stats, symbol, timeframe, stats['_equity_path'], strat_obj=strat_obj)
+        if log:
+            log_file = os.path.join(output_dir, strategy_class.__name__, "summary_log.csv")
+            ReportGenerator.append_log_row(log_file, row)
+        return row
+
+    @staticmethod
+    def save_sweep(results, strat_name, symbol, timeframe, top_n=20, output_dir="output", tag="grid"):
+        """
+        Persists an optimization sweep (already ranked best-first):
+        - {..}_grid.csv : every evaluated combination
+        - {..}_top.csv  : the best `top_n` rows
+        Returns (grid_path, top_path).
+        """
+        output_folder = os.path.join(output_dir, strat_name, "optimize")
+        os.makedirs(output_folder, exist_ok=True)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stem = f"{strat_name}_{symbol}_{timeframe.value}_{stamp}"
+        grid_path = os.path.join(output_folder, f"{stem}_{tag}.csv")
+        top_path = os.path.join(output_folder, f"{stem}_top.csv")
+
+        results.to_csv(grid_path, index=False)
+        results.head(top_n).to_csv(top_path, index=False)
+        return grid_path, top_path
+
+    @staticmethod
+    def save_walk_forward(folds, equity, strat_name, symbol, timeframe, output_dir="output"):
+        """
+        Persists a walk-forward run:
+        - {..}_folds.csv      : per-fold chosen parameters, train score and test stats
+        - {..}_oos_equity.csv : stitched out-of-sample equity curve
+        Returns (folds_path, equity_path).
+        """
+        output_folder = os.path.join(output_dir, strat_name, "walk_forward")
+        os.makedirs(output_folder, exist_ok=True)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stem = f"{strat_name}_{symbol}_{timeframe.value}_{stamp}"
+        folds_path = os.path.join(output_folder, f"{stem}_folds.csv")
+        equity_path = os.path.join(output_folder, f"{stem}_oos_equity.csv")
+
+        folds.to_csv(folds_path, index=False)
+        equity.rename("Equity").to_csv(equity_path, index_label="Time")
+        return folds_path, equity_path
+
+    @staticmethod
+    def save_cpcv(splits, summary, strat_name, symbol, timeframe, output_dir="output"):
+        """
+        Persists a CPCV run:
+        - {..}_splits.csv  : per-split in-sample winner, IS/OOS Sharpe, OOS rank and logit
+        - {..}_summary.csv : PBO and the OOS Sharpe distribution of the winners
+        Returns (splits_path, summary_path).
+        """
+        output_folder = os.path.join(output_dir, strat_name, "cpcv")
+        os.makedirs(output_folder, exist_ok=True)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stem = f"{strat_name}_{symbol}_{timeframe.value}_{stamp}"
+        splits_path = os.path.join(output_folder, f"{stem}_splits.csv")
+        summary_path = os.path.join(output_folder, f"{stem}_summary.csv")
+
+        splits.to_csv(splits_path, index=False)
+        pd.DataFrame([summary]).to_csv(summary_path, index=False)
+        return splits_path, summary_path
+
     @staticmethod
     def _get_css():
         return """
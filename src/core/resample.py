@@ -0,0 +1,133 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+
+from core.market_calendar import wall_session_mask
+
+# Bars of any coarser timeframe built from the stored minute bars, so switching
+# TIMEFRAME doesn't download (and store) another copy of the history.
+#
+# Conventions follow Alpaca's bars: a bar is labeled with its start, in New York
+# time; intraday bars are aligned to the clock from midnight (15Min: :00, :15,
+# ...; 1Hour: 10:00, 11:00, ...; 4Hour: 08:00, 12:00, 16:00), daily bars are
+# labeled at midnight, weekly ones at Monday midnight, monthly ones on the 1st.
+# Only session minutes (09:30-16:00 or the early close, no holidays: the download
+# filter, core.market_calendar) are aggregated, so the 09:00 hour bar holds
+# 09:30-09:59 and no pre-market volume.
+#
+# DerivedBars caches intraday and daily bars per year, tagged with the
+# fingerprint of the minute partition they came from: a year whose minute parts
+# changed (new bars, compaction) is rebuilt on its next read. Weekly and monthly
+# bars cross year boundaries, so they are aggregated from the cached daily bars.
+
+MINUTES = "1Min"
+TZ = "America/New_York"
+
+TICKS_PER_SECOND = {"s": 1, "ms": 10**3, "us": 10**6, "ns": 10**9}
+
+def bar_starts(wall, timeframe, resolution="ns"):
+    """Start of the `timeframe` bar of each wall-clock time (naive int64 ticks of `resolution`), same form."""
+    second = TICKS_PER_SECOND[resolution]
+    day_ticks = 86_400 * second
+    day = wall - wall % day_ticks
+    unit, amount = timeframe.unit, timeframe.amount
+
+    if unit in (TimeFrameUnit.Minute, TimeFrameUnit.Hour):
+        step = amount * (3600 if unit == TimeFrameUnit.Hour else 60) * second
+        return day + (wall - day) // step * step
+    if unit == TimeFrameUnit.Day and amount == 1:
+        return day
+    if unit == TimeFrameUnit.Week and amount == 1:
+        # 1970-01-01 was a Thursday: weekday = (days + 3) % 7, Monday = 0
+        return day - (day // day_ticks + 3) % 7 * day_ticks
+    if unit == TimeFrameUnit.Month:
+        months = wall.view(f"datetime64[{resolution}]").astype("datetime64[M]").astype(np.int64) + 1970 * 12
+        months = months // amount * amount - 1970 * 12
+        return months.astype("datetime64[M]").astype(f"datetime64[{resolution}]").view(np.int64)
+    raise ValueError(f"Can't derive {timeframe.value} bars (Alpaca only has 1Day and 1Week)")
+
+def resample_bars(df, timeframe, session=True):
+    """
+    Sorted OHLCV bars (tz-aware index) -> `timeframe` bars. session=True keeps
+    only minutes inside the trading session; pass False to aggregate daily bars.
+    """
+    if df.empty:
+        return df
+    # Wall-clock ticks in the index's own resolution (converting a long index costs more than the rest)
+    resolution = df.index.unit
+    wall = df.index.tz_localize(None).asi8
+    if session:
+        inside = wall_session_mask(wall, resolution)
+        if not inside.all():
+            df, wall = df[inside], wall[inside]
+        if df.empty:
+            return df
+    return aggregate(df, bar_starts(wall, timeframe, resolution), df.index.tz, resolution)
+
+def aggregate(df, labels, tz, resolution="ns"):
+    """OHLCV of each run of equal consecutive labels (wall-clock int64 ticks, df sorted by time)."""
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(labels)] - 1
+    # Bar starts sit in trading hours or at midnight, never in a DST transition
+    index = pd.DatetimeIndex(labels[starts].view(f"datetime64[{resolution}]")).tz_localize(tz)
+    out = pd.DataFrame({
+        "Open": df["Open"].to_numpy()[starts],
+        "High": np.maximum.reduceat(df["High"].to_numpy(), starts),
+        "Low": np.minimum.reduceat(df["Low"].to_numpy(), starts),
+        "Close": df["Close"].to_numpy()[ends],
+        "Volume": np.add.reduceat(df["Volume"].to_numpy(), starts),
+    }, index=index)
+    out.index.name = "timestamp"
+    return out
+
+class DerivedBars:
+    def __init__(self, store, root, compression="zstd"):
+        self.store = store          # ParquetStore holding the minute bars
+        self.root = root
+        self.compression = compression
+
+    def read(self, symbol, timeframe, start, end):
+        """`timeframe` bars labeled in [start, end] (tz-aware), built from the stored minutes."""
+        if timeframe.unit in (TimeFrameUnit.Week, TimeFrameUnit.Month):
+            # The last bar starting before `end` runs up to a month (x amount) past it
+            daily = self._read_cached(symbol, TimeFrame.Day, start, end + pd.DateOffset(months=timeframe.amount))
+            df = resample_bars(daily, timeframe, session=False)
+        else:
+            df = self._read_cached(symbol, timeframe, start, end)
+        return df[(df.index >= start) & (df.index <= end)] if not df.empty else df
+
+    def _read_cached(self, symbol, timeframe, start, end):
+        frames = []
+        for year, fingerprint in self.store.partitions(symbol, MINUTES, start, end):
+            path = os.path.join(self.root, symbol, timeframe.value, f"{year}.parquet")
+            df = self._load(path, fingerprint)
+            if df is None:
+                minutes = self.store.read(symbol, MINUTES, pd.Timestamp(year, 1, 1, tz=TZ),
+                                          pd.Timestamp(year, 12, 31, 23, 59, tz=TZ))
+                df = resample_bars(minutes, timeframe)
+                self._save(path, df, fingerprint)
+            frames.append(df)
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    def _load(self, path, fingerprint):
+        """The cached year, or None if missing or built from other minute parts."""
+        if not os.path.exists(path):
+            return None
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(b"minutes") != fingerprint.encode():
+            return None
+        return pd.read_parquet(path)
+
+    def _save(self, path, df, fingerprint):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.Table.from_pandas(df)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"minutes": fingerprint.encode()})
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, path)
@@ -0,0 +1,158 @@
+import sys
+import weakref
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+from multiprocessing import shared_memory
+
+OHLCV = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+@dataclass(frozen=True)
+class SharedFrameHandle:
+    """
+    Picklable description of a published frame. This (a few bytes) is what gets
+    sent to worker processes instead of the DataFrame itself.
+    """
+    shm_name: str
+    rows: int
+    columns: Tuple[str, ...]
+    dtype: str
+    index_unit: str
+    tz: Optional[str]
+    index_name: Optional[str]
+
+    @property
+    def nbytes(self):
+        return self.rows * 8 + self.rows * len(self.columns) * np.dtype(self.dtype).itemsize
+
+def _release(shm):
+    """Finalizer for the owning side: close and unlink, tolerating double calls."""
+    try:
+        shm.close()
+    except BufferError:
+        # Views are still alive somewhere; unlinking is still safe, the memory
+        # is freed by the OS once the last mapping goes away.
+        pass
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+class SharedFrame:
+    """
+    Publishes the OHLCV columns + DatetimeIndex of a DataFrame into one
+    multiprocessing.shared_memory segment.
+
+    Layout: [index int64 (rows)] [column block (n_cols x rows), C-order]
+    so every column is contiguous and the block maps 1:1 onto a pandas block.
+
+    The publisher owns the segment and is the only side that unlinks it:
+    - close() / leaving the `with` block unlinks it,
+    - a weakref finalizer unlinks it on garbage collection / interpreter exit,
+    - if the publishing process is killed, multiprocessing's resource tracker
+      unlinks it.
+    Workers only ever attach, so a crashing worker can't leak or destroy it.
+    """
+
+    def __init__(self, df, columns=OHLCV, dtype=np.float64):
+        columns = tuple(c for c in columns if c in df.columns)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise TypeError("SharedFrame expects a DataFrame with a DatetimeIndex.")
+
+        rows = len(df)
+        dtype = np.dtype(dtype)
+        index = df.index
+        tz = str(index.tz) if index.tz is not None else None
+
+        self.handle = SharedFrameHandle(shm_name="",
+                                        rows=rows,
+                                        columns=columns,
+                                        dtype=dtype.str,
+                                        index_unit=index.unit,
+                                        tz=tz,
+                                        index_name=index.name)
+
+        # SharedMemory refuses size=0
+        self._shm = shared_memory.SharedMemory(create=True, size=max(self.handle.nbytes, 1))
+        self.handle = replace(self.handle, shm_name=self._shm.name)
+        self._finalizer = weakref.finalize(self, _release, self._shm)
+
+        idx_view, block = _views(self._shm.buf, self.handle)
+        idx_view[:] = index.asi8
+        for i, col in enumerate(columns):
+            block[i, :] = df[col].to_numpy(dtype=dtype)
+
+        del idx_view, block
+
+    @property
+    def name(self):
+        return self.handle.shm_name
+
+    def close(self):
+        """Unlinks the segment. Safe to call more than once."""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _views(buf, handle):
+    idx_view = np.ndarray((handle.rows,), dtype=np.int64, buffer=buf, offset=0)
+    block = np.ndarray((len(handle.columns), handle.rows), dtype=np.dtype(handle.dtype),
+                       buffer=buf, offset=handle.rows * 8)
+    return idx_view, block
+
+class AttachedFrame:
+    """
+    Worker side of a SharedFrame: a zero-copy DataFrame over the segment.
+
+        with AttachedFrame(handle) as frame:
+            bt = Backtest(frame.df, Strategy, ...)
+
+    The DataFrame is read-only and only valid while the frame is attached.
+    Drop every reference to `frame.df` (and anything built on it) before close().
+    """
+
+    def __init__(self, handle: SharedFrameHandle, tz_naive=True):
+        self.handle = handle
+        if sys.version_info >= (3, 13):
+            self._shm = shared_memory.SharedMemory(name=handle.shm_name, track=False)
+        else:
+            # Registration with the (shared) resource tracker is idempotent, so
+            # attaching here never causes a premature unlink.
+            self._shm = shared_memory.SharedMemory(name=handle.shm_name)
+
+        idx_view, block = _views(self._shm.buf, handle)
+        idx_view.flags.writeable = False
+        block.flags.writeable = False
+
+        index = pd.DatetimeIndex(idx_view.view(f"M8[{handle.index_unit}]"), name=handle.index_name, copy=False)
+        if handle.tz and not tz_naive:
+            index = index.tz_localize("UTC").tz_convert(handle.tz)
+        elif handle.tz:
+            # Stored instants are UTC; Backtest wants local wall-clock time
+            index = index.tz_localize("UTC").tz_convert(handle.tz).tz_localize(None)
+
+        # block.T is (rows x cols) F-ordered: pandas adopts it as its block without copying
+        self.df = pd.DataFrame(block.T, index=index, columns=list(handle.columns), copy=False)
+
+    def close(self):
+        self.df = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Caller still holds views; the mapping is released when they're collected
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def attach_frame(handle, tz_naive=True):
+    """Convenience wrapper: returns an AttachedFrame for `handle`."""
+    return AttachedFrame(handle, tz_naive=tz_naive)
@@ -0,0 +1,265 @@
+import numpy as np
+import pandas as pd
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from backtesting import Strategy
+
+from core.metrics import summary_metrics, period_layout
+
+# Vectorized fast path for long-only, single-position strategies whose decisions
+# are a pure function of precomputed indicators (see BaseStrategy.signals).
+#
+# It reproduces backtesting.py's broker for that case exactly:
+# - a decision on bar i's close fills at bar i+1's Open (market orders)
+# - buy() sizes to the whole cash: int(cash * (1 - eps) // (price + commission per unit));
+#   if that's 0 shares the broker cancels the order
+# - commission = fixed + relative * |size| * price, charged on entry and on exit
+# - a stop-loss fills at min(Open, stop) on the first bar whose Low reaches it,
+#   the entry bar included; an exit order pending for that bar's Open goes first
+# - trading starts one bar after the slowest indicator's warm-up
+# - finalize_trades: trades still open are closed at the last bar's Open, and an
+#   order placed on the last bar is filled at that same Open
+# Instead of stepping through every bar, it jumps from one trade to the next.
+
+_FULL_EQUITY = Strategy._FULL_EQUITY
+
+@dataclass
+class Signals:
+    """
+    Decisions of a strategy, one value per bar (evaluated on that bar's close).
+    - entries   : buy (with the whole cash) if flat
+    - exits     : close the position if one is open
+    - sl        : stop-loss level attached to an entry on that bar (None = no stops)
+    - indicators: the non-scatter arrays the event-driven version registers with
+                  self.I(); they define the warm-up period
+    """
+    entries: np.ndarray
+    exits: np.ndarray
+    sl: np.ndarray = None
+    indicators: list = field(default_factory=list)
+
+    def warmup_bars(self):
+        """Same definition as BaseStrategy.warmup_bars()."""
+        return max((int(np.isnan(np.asarray(ind, dtype=float)).argmin(axis=-1).max())
+                    for ind in self.indicators), default=0)
+
+def crossovers(series1, series2):
+    """backtesting.lib.crossover() for every bar: series1[i-1] < series2[i-1] and series1[i] > series2[i]."""
+    a, b = np.asarray(series1, dtype=float), np.asarray(series2, dtype=float)
+    out = np.zeros(len(a), dtype=bool)
+    out[1:] = (a[:-1] < b[:-1]) & (a[1:] > b[1:])
+    return out
+
+def supports_fast_path(strategy_class):
+    return callable(getattr(strategy_class, 'signals', None))
+
+class VectorBacktest:
+    """
+    Stand-in for backtesting.Backtest for strategies that implement `signals()`:
+    same constructor arguments, and `run(**params)` returns a stats Series with
+    the summary_log.csv metrics, '_equity_curve', '_trades' and '_strategy'
+    (the Signals, which has warmup_bars()).
+
+    Only the defaults of spread/margin/trade_on_close/hedging/exclusive_orders
+    are supported; anything else raises instead of silently diverging.
+    """
+
+    _DEFAULTS_ONLY = dict(spread=0., margin=1., trade_on_close=False, hedging=False, exclusive_orders=False)
+
+    def __init__(self, data, strategy, *, cash=10_000, commission=.0, finalize_trades=False, **kwargs):
+        for name, value in kwargs.items():
+            if name not in self._DEFAULTS_ONLY:
+                raise TypeError(f"Unexpected argument '{name}'")
+            if value != self._DEFAULTS_ONLY[name]:
+                raise ValueError(f"VectorBacktest only supports {name}={self._DEFAULTS_ONLY[name]!r}")
+        if not supports_fast_path(strategy):
+            raise ValueError(f"{strategy.__name__} doesn't implement signals()")
+
+        try:
+            self._commission_fixed, self._commission_relative = commission
+        except TypeError:
+            self._commission_fixed, self._commission_relative = 0, commission
+
+        self._data = data
+        self._strategy = strategy
+        self._cash = cash
+        self._finalize_trades = finalize_trades
+
+        self._open = data['Open'].to_numpy(dtype=float).tolist()   # scalar reads in the trade loop
+        self._low = data['Low'].to_numpy(dtype=float)
+        self._close = data['Close'].to_numpy(dtype=float)
+        self._layout = period_layout(data.index)
+
+    def _commission(self, size, price):
+        return self._commission_fixed + abs(size) * price * self._commission_relative
+
+    def run(self, **params):
+        signals = self._strategy.signals(self._data, **params)
+        equity, trades = self._simulate(signals)
+
+        index = self._data.index
+        columns = ['Size', 'EntryBar', 'ExitBar', 'EntryPrice', 'ExitPrice', 'SL', 'PnL', 'Commission']
+        trades = dict(zip(columns, map(list, zip(*trades)))) if trades else {c: [] for c in columns}
+        trades['EntryTime'] = index[trades['EntryBar']]
+        trades['ExitTime'] = index[trades['ExitBar']]
+        trades = pd.DataFrame(trades)
+
+        stats = {
+            'Start': index[0],
+            'End': index[-1],
+            'Duration': index[-1] - index[0],
+            'Equity Final [$]': equity[-1],
+            'Equity Peak [$]': equity.max(),
+            **summary_metrics(equity, index, trades['PnL'], self._layout),
+            '_strategy': signals,
+            '_equity_curve': pd.DataFrame({'Equity': equity}, index=index),
+            '_trades': trades,
+        }
+        return pd.Series(stats, dtype=object)
+
+    def _simulate(self, signals, book=None):
+        """
+        Returns (equity per bar, closed trades as (size, entry_bar, exit_bar, entry, exit, sl, pnl, commission)).
+
+        With a `book` (see _Book) the run resumes from, and leaves behind, the
+        broker state of a previous frame: equity covers the bars from book.first
+        on, trade bars are offset by book.offset, and unless book.final a trade
+        or order still open at the last bar is carried over instead of finalized.
+        """
+        o, low = self._open, self._low
+        n = len(o)
+        if book is None:
+            book = _Book(cash=float(self._cash))
+        first, offset, final = book.first, book.offset, book.final
+        start = 1 + signals.warmup_bars() if book.t is None else max(book.t - offset, first)
+
+        entries = np.flatnonzero(signals.entries)
+        entries = entries[entries >= start].tolist()
+        exits = np.flatnonzero(signals.exits).tolist()
+        sl_levels = signals.sl
+
+        trades = []
+        segments = []       # (first bar, stop bar, cash, shares, entry price) of each equity step
+        cash = book.cash
+        flat_since = first
+        t = start           # first bar whose close may open a trade
+        carried, pending = book.position, book.pending
+        book.position = book.pending = None
+        while True:
+            if carried is not None:
+                # Trade opened on an earlier frame; its stop was checked up to the previous bar
+                size, f, price, sl, commission_open = carried
+                f -= offset
+                stop_from = first
+                x = first - 1 if pending is not None else None
+                j = bisect_left(exits, first)
+                if x is None and j < len(exits):
+                    x = exits[j]
+                last_pass = carried = pending = None
+            else:
+                if pending is not None:
+                    # Entry decided on the previous frame's last bar
+                    e, (sl,) = first - 1, pending
+                    pending = None
+                else:
+                    k = bisect_left(entries, t)
+                    if k == len(entries):
+                        break
+                    e = entries[k]
+                    sl = float(sl_levels[e]) if sl_levels is not None else None
+                    sl = sl if sl and sl == sl else None
+                # An order placed on the last bar only fills in finalize_trades' extra pass
+                # (or on the next frame's first bar)
+                last_pass = e == n - 1
+                if last_pass and not final:
+                    book.pending = (sl,)
+                    break
+                if last_pass and not self._finalize_trades:
+                    break
+                f = min(e + 1, n - 1)
+
+                price = o[f]
+                size = int((cash * 1. * _FULL_EQUITY) //
+                           (price + self._commission(_FULL_EQUITY, price) / _FULL_EQUITY))
+                if not size:
+                    if last_pass:
+                        break
+                    t = f
+                    continue
+
+                segments.append((flat_since, f, cash, 0, 0.))
+                commission_open = self._commission(size, price)
+                cash -= commission_open
+                stop_from = f
+
+                # First exit decision while in the trade (no decisions after the last pass)
+                j = bisect_left(exits, f)
+                x = exits[j] if j < len(exits) and not last_pass else None
+
+            # A stop is checked on every bar up to (and including) the exit decision bar
+            exit_bar = exit_price = None
+            if sl is not None:
+                hit = np.flatnonzero(low[stop_from:(n if x is None else x + 1)] <= sl)
+                if len(hit):
+                    exit_bar = stop_from + int(hit[0])
+                    exit_price = min(o[exit_bar], sl)
+
+            if exit_bar is None:
+                if x is not None and x + 1 < n:
+                    exit_bar = x + 1
+                elif not final:
+                    # Carried into the next frame (with the exit order, if decided on the last bar)
+                    segments.append((max(f, first), n, cash, size, price))
+                    book.position = (size, f + offset, price, sl, commission_open)
+                    book.pending = () if x is not None else None
+                    book.cash, book.t = cash, n + offset
+                    return self._equity_curve(segments, first), trades
+                elif self._finalize_trades and not last_pass:
+                    exit_bar = n - 1
+                    last_pass = True
+                else:
+                    # Still open at the end: marked to market, not a closed trade
+                    segments.append((max(f, first), n, cash, size, price))
+                    return self._equity_curve(segments, first), trades
+                exit_price = o[exit_bar]
+
+            segments.append((max(f, first), exit_bar, cash, size, price))
+            commission_close = self._commission(size, exit_price)
+            cash += size * (exit_price - price) - commission_close
+            trades.append((size, f + offset, exit_bar + offset, price, exit_price, sl,
+                           size * (exit_price - price) - (commission_close + commission_open),
+                           commission_close + commission_open))
+            flat_since = t = exit_bar
+            if last_pass:
+                break
+
+        segments.append((flat_since, n, cash, 0, 0.))
+        book.cash, book.t = cash, max(t, n) + offset
+        return self._equity_curve(segments, first), trades
+
+    def _equity_curve(self, segments, first=0):
+        """Cash + unrealized P/L at Close (position size * close - size * entry price), per bar from `first`."""
+        lengths = [stop - start for start, stop, _, _, _ in segments]
+        _, _, cash, size, entry = (np.repeat(column, lengths) for column in zip(*segments))
+        return cash + (self._close[first:] * size - size * entry)
+
+@dataclass
+class _Book:
+    """
+    Broker state VectorBacktest._simulate() resumes from and leaves behind, so a
+    history can be simulated one frame at a time (core.chunked_backtest).
+    Bars are numbered across the whole history; `offset` is the history index of
+    the current frame's bar 0 and `first` the first frame bar not simulated yet
+    (earlier ones are warm-up overlap).
+    - t        : first bar whose close may open a trade (None = after the warm-up)
+    - position : open trade (size, entry bar, entry price, sl, opening commission)
+    - pending  : order decided on the previous frame's last bar, filling at
+                 `first`: (sl,) an entry, () the exit of `position`
+    """
+    cash: float
+    t: int = None
+    offset: int = 0
+    first: int = 0
+    final: bool = True
+    position: tuple = None
+    pending: tuple = None
@@ -0,0 +1,122 @@
+import functools
+import numpy as np
+import pandas as pd
+from alpaca.data.timeframe import TimeFrameUnit
+from backtesting import Backtest
+from backtesting._stats import compute_stats
+
+from core.market_calendar import sessions
+from indicators import cache as indicator_cache
+
+# Warm-up history for runs that trade from their first requested bar.
+#
+# A strategy's lookback is the number of bars before every indicator has a
+# value (BaseStrategy.warmup_bars()); backtesting.py doesn't call next() before
+# them. With only START_DATE..END_DATE loaded, those bars are the first days or
+# weeks of the range, so results depend on where it starts. Instead:
+#
+#   bars = lookback_bars(strategy_class, params)        # declared or measured
+#   df   = get_data(symbol, warmup_start(START_DATE, bars, timeframe), END_DATE)
+#   df   = with_warmup(df, START_DATE, bars)             # exactly bars + 1 before START_DATE
+#   stats = trim_warmup(Backtest(df, ...).run(), df, START_DATE)
+#
+# so next() first runs on the START_DATE bar and the stats cover START_DATE on.
+# warmup_start() counts trading sessions (core.market_calendar) back from the
+# start with a lower bound of bars per session, so it fetches a little more
+# than needed, never less; with_warmup() cuts the surplus.
+
+PROBE_BARS = 1_024
+MAX_PROBE_BARS = 2**18
+
+def lookback_bars(strategy_class, params):
+    """The strategy's max_lookback(params) if it declares one, else measured on synthetic bars."""
+    declared = strategy_class.max_lookback(params) if hasattr(strategy_class, "max_lookback") else None
+    if declared is not None:
+        return int(declared)
+    return measure_lookback(strategy_class, tuple(sorted(params.items())))
+
+@functools.lru_cache(maxsize=64)
+def measure_lookback(strategy_class, params):
+    """
+    warmup_bars() of a run on a synthetic random walk (`params` as sorted
+    (name, value) pairs). The walk grows until every indicator has a value.
+    """
+    n = PROBE_BARS
+    while True:
+        # Probe data is seen once: keep it out of the indicator cache
+        with indicator_cache.disabled():
+            strategy = Backtest(_probe_bars(n), strategy_class, cash=10**9, finalize_trades=True).run(**dict(params))._strategy
+        indicators = [np.atleast_2d(ind.astype(float)) for ind in strategy._indicators if not ind._opts['scatter']]
+        if n >= MAX_PROBE_BARS or all((~np.isnan(ind)).any(axis=-1).all() for ind in indicators):
+            return strategy.warmup_bars()
+        n *= 4
+
+def _probe_bars(n):
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = close * rng.uniform(0.001, 0.01, n)
+    return pd.DataFrame({"Open": np.r_[close[0], close[:-1]], "High": close + spread, "Low": close - spread,
+                         "Close": close, "Volume": rng.integers(1_000, 100_000, n).astype(float)},
+                        index=pd.date_range("2000-01-03", periods=n, freq="h"))
+
+def warmup_start(start, bars, timeframe):
+    """A start (naive New York datetime) early enough that at least `bars` + 1 `timeframe` bars precede `start`."""
+    if bars <= 0:
+        return start
+    start = pd.Timestamp(start)
+    unit, amount = timeframe.unit, timeframe.amount
+    needed = bars + 1
+    if unit == TimeFrameUnit.Week:
+        return (start - pd.DateOffset(weeks=(needed + 1) * amount)).to_pydatetime()
+    if unit == TimeFrameUnit.Month:
+        return (start - pd.DateOffset(months=(needed + 1) * amount)).to_pydatetime()
+
+    if unit == TimeFrameUnit.Day:
+        minutes = None
+    else:
+        minutes = amount * (60 if unit == TimeFrameUnit.Hour else 1)
+    # Trading days back from the day before `start`, widened until they hold enough bars
+    days = needed // (1 if minutes is None else max(1, 390 // minutes)) + 5
+    while True:
+        table = sessions(start - pd.Timedelta(days=days * 7 // 5 + 7), start - pd.Timedelta(days=1))
+        if minutes is None:
+            per_session = np.ones(len(table), dtype=np.int64)
+        else:
+            # Clock-aligned bars from the one holding the open to the one holding the
+            # last minute before the close (a bar of the closing print alone may be one more)
+            open_minute = (table["open"] - table.index.tz_localize(table["open"].dt.tz)).dt.total_seconds() // 60
+            close_minute = (table["close"] - table.index.tz_localize(table["close"].dt.tz)).dt.total_seconds() // 60
+            per_session = ((close_minute.to_numpy(np.int64) - 1) // minutes
+                           - open_minute.to_numpy(np.int64) // minutes + 1)
+        total = np.cumsum(per_session[::-1])
+        if len(total) and total[-1] >= needed:
+            return table.index[len(table) - 1 - int(np.searchsorted(total, needed))].to_pydatetime()
+        days *= 2
+
+def with_warmup(df, start, bars):
+    """`df` from `bars` + 1 bars before `start` on (fewer if it has fewer). A slice, not a copy."""
+    first = int(df.index.searchsorted(pd.Timestamp(start)))
+    return df.iloc[max(0, first - bars - 1):]
+
+def trim_warmup(stats, data, start):
+    """
+    Stats of a run on `data` as if it had started at `start`: the bars before
+    it where next() never ran are dropped from the equity curve, the trades
+    renumbered and every metric recomputed. Bars where next() ran are always
+    kept, so nothing a strategy did is hidden. Unchanged if there are none.
+    """
+    strategy = stats._strategy
+    offset = min(int(data.index.searchsorted(pd.Timestamp(start))), 1 + strategy.warmup_bars())
+    if offset <= 0:
+        return stats
+
+    trades = stats._trades.copy()
+    trades[["EntryBar", "ExitBar"]] -= offset
+    equity = stats._equity_curve["Equity"].to_numpy()[offset:]
+    # No strategy: Buy & Hold is measured from the first bar, which is now `start`
+    trimmed = compute_stats(trades=trades, equity=equity, ohlc_data=data.iloc[offset:],
+                            strategy_instance=None, risk_free_rate=0.0)
+    trimmed["_strategy"] = strategy
+    # Same keys in the same order (Commissions [$] is only computed from live trades)
+    return pd.Series({key: trimmed[key] if key in trimmed.index else stats[key] for key in stats.index},
+                     dtype=object)
@@ -1,6 +1,24 @@
 from .technical import (
+    sma,
+    sma_batch,
+    bollinger_bands_batch,
+    ema_batch,
     rsi,
     bollinger_bands,
     macd,
-    parabolic_sar
+    parabolic_sar,
+    parabolic_sar_batch,
+)
+from .regression import (
+    rolling_lrc,
+    rolling_percentile_rank,
+)
+from .incremental import (
+    EMA,
+    RSI,
+    MACD,
+    SMA,
+    BollingerBands,
+    ParabolicSAR,
+    LinearRegressionChannel,
 )
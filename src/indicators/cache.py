@@ -0,0 +1,310 @@
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+import functools
+import types
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Content-addressed memo for indicator functions.
+#
+# A result is keyed by the function (module, name, its code and the code of the
+# project functions it calls, the versions of the libraries it uses) and a hash
+# of every argument - array/Series contents included - so two strategy runs on
+# the same data with the same indicator settings share one computation,
+# whatever else (stop-loss %, thresholds, ...) differs between them.
+#
+# Tier 1: in-memory LRU bounded by bytes. Tier 2 (optional): one pickle per key
+# in a directory, shared by processes and kept across sessions.
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+class Uncacheable(Exception):
+    """An argument the cache can't fingerprint (the call is simply not cached)."""
+
+def _array_digest(h, arr):
+    arr = np.ascontiguousarray(arr)
+    h.update(f"nd|{arr.dtype.str}|{arr.shape}|".encode())
+    h.update(arr.reshape(-1).view(np.uint8))
+
+def _index_digest(h, index):
+    if isinstance(index, pd.RangeIndex):
+        h.update(f"range|{index.start}|{index.stop}|{index.step}|".encode())
+    elif isinstance(index, pd.DatetimeIndex):
+        h.update(f"dt|{index.unit}|{index.tz}|".encode())
+        _array_digest(h, index.asi8)
+    else:
+        _array_digest(h, index.to_numpy())
+
+def _digest(h, value):
+    """Feeds a stable fingerprint of `value` into the hash `h`."""
+    if value is None or isinstance(value, (bool, int, float, str, np.number, np.bool_)):
+        h.update(f"{type(value).__name__}|{value!r}|".encode())
+    elif isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise Uncacheable(value.dtype)
+        _array_digest(h, value)
+    elif isinstance(value, pd.Series):
+        h.update(b"series|")
+        _digest(h, value.to_numpy())
+        _index_digest(h, value.index)
+    elif isinstance(value, pd.DataFrame):
+        h.update(f"frame|{list(value.columns)}|".encode())
+        for col in value.columns:
+            _digest(h, value[col].to_numpy())
+        _index_digest(h, value.index)
+    elif isinstance(value, (tuple, list)):
+        h.update(f"{type(value).__name__}|{len(value)}|".encode())
+        for item in value:
+            _digest(h, item)
+    elif isinstance(value, dict):
+        h.update(f"dict|{len(value)}|".encode())
+        for k in sorted(value):
+            _digest(h, k)
+            _digest(h, value[k])
+    else:
+        raise Uncacheable(type(value))
+
+def is_cacheable_function(func):
+    """Plain module-level functions only: lambdas and closures hide their inputs."""
+    return (isinstance(func, types.FunctionType)
+            and func.__name__ != "<lambda>"
+            and func.__closure__ is None
+            and "<locals>" not in func.__qualname__)
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return int(np.sum(value.memory_usage(index=True, deep=False)))
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 64
+
+def _freeze(value):
+    """Read-only arrays, so a caller writing into a shared result fails loudly."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, pd.Series):
+        # The array behind .values (Series.values itself may be a read-only view of it)
+        np.asarray(value.array).setflags(write=False)
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    return value
+
+def _is_project(path):
+    return bool(path) and os.path.abspath(path).startswith(_SRC_DIR)
+
+def _code_objects(code):
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_objects(const)
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(func):
+    """
+    Digest of `func`'s code (nested functions included) and, transitively, of
+    every project function it reaches through a global name or a project
+    module's attribute. Library modules and classes it uses add their
+    package version instead. Editing a helper an indicator calls, or upgrading
+    the library computing it, gives new keys.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"py{sys.version_info[0]}.{sys.version_info[1]}|np{np.__version__}|pd{pd.__version__}|".encode())
+    _code_digest(h, func, set())
+    return h.digest()
+
+def _code_digest(h, func, seen):
+    if func in seen:
+        return
+    seen.add(func)
+    h.update(f"{func.__module__}.{func.__qualname__}|".encode())
+    for code in _code_objects(func.__code__):
+        consts = tuple(c for c in code.co_consts if not isinstance(c, types.CodeType))
+        h.update(code.co_code + repr(consts).encode())
+        for name in code.co_names:
+            _reference_digest(h, func.__globals__.get(name), code.co_names, seen)
+
+def _reference_digest(h, ref, names, seen):
+    if isinstance(ref, types.FunctionType):
+        if _is_project(ref.__code__.co_filename):
+            _code_digest(h, ref, seen)
+        elif ref.__module__:
+            _version_digest(h, ref.__module__)
+    elif isinstance(ref, types.ModuleType):
+        if _is_project(getattr(ref, "__file__", None)):
+            # technical.sma(...): the attribute names are in co_names too
+            for name in names:
+                attr = getattr(ref, name, None)
+                if isinstance(attr, types.FunctionType) and _is_project(attr.__code__.co_filename):
+                    _code_digest(h, attr, seen)
+        else:
+            _version_digest(h, ref.__name__)
+    elif isinstance(getattr(ref, "__module__", None), str) and not isinstance(ref, (str, int, float, bool)):
+        module = sys.modules.get(ref.__module__)
+        if not _is_project(getattr(module, "__file__", None)):
+            _version_digest(h, ref.__module__)
+
+def _version_digest(h, module_name):
+    package = sys.modules.get(module_name.partition(".")[0])
+    h.update(f"{module_name.partition('.')[0]}={getattr(package, '__version__', '')}|".encode())
+
+class IndicatorCache:
+    """
+        cache = IndicatorCache(max_bytes=512 * 2**20, disk_dir="data/indicator_cache")
+        upper, mid, lower = cache.call(bollinger_bands, close, 20, 2)
+        cache.stats()   # {'hits': ..., 'misses': ..., 'disk_hits': ..., ...}
+    """
+
+    def __init__(self, max_bytes=512 * 2**20, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self._bytes = 0
+        self.hits = self.misses = self.disk_hits = self.evictions = self.bypassed = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def key(self, func, args, kwargs):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{func.__module__}.{func.__qualname__}|".encode())
+        # Editing the function or a helper it calls invalidates its disk entries
+        h.update(code_fingerprint(func))
+        _digest(h, args)
+        _digest(h, kwargs)
+        return h.hexdigest()
+
+    def call(self, func, *args, **kwargs):
+        """func(*args, **kwargs), served from the cache when possible."""
+        if not is_cacheable_function(func):
+            self.bypassed += 1
+            return func(*args, **kwargs)
+        try:
+            key = self.key(func, args, kwargs)
+        except Uncacheable:
+            self.bypassed += 1
+            return func(*args, **kwargs)
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        value = self._load(key)
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = _freeze(func(*args, **kwargs))
+            self._dump(key, value)
+        self._remember(key, value)
+        return value
+
+    def wrap(self, func):
+        """`func` with calls going through the cache (keeps its name for plot labels)."""
+        @functools.wraps(func)
+        def cached(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return cached
+
+    def _remember(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def _load(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return _freeze(pickle.load(f))
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _dump(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first: concurrent workers never see half a pickle
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"Indicator cache: {s['hits']} hits, {s['disk_hits']} disk hits, {s['misses']} misses "
+                f"({s['hit_rate']:.0%}) | {s['entries']} entries, {s['bytes'] / 2**20:.1f} MB")
+
+# --- PROCESS-WIDE CACHE ---
+# Strategies reach the cache through BaseStrategy.I() and cached(); the engine
+# (and every sweep worker) configures it once per process.
+_ACTIVE = None
+_CONFIG = None
+
+def configure(enabled=True, max_bytes=512 * 2**20, disk_dir=None):
+    """(Re)creates the process-wide cache; enabled=False turns caching off."""
+    global _ACTIVE, _CONFIG
+    _CONFIG = dict(enabled=enabled, max_bytes=max_bytes, disk_dir=disk_dir)
+    _ACTIVE = IndicatorCache(max_bytes=max_bytes, disk_dir=disk_dir) if enabled else None
+    return _ACTIVE
+
+def current_config():
+    """The last configure() arguments (to replay in worker processes), or None."""
+    return _CONFIG
+
+def active():
+    return _ACTIVE
+
+@contextmanager
+def disabled():
+    """No caching inside the block (e.g. data that is only seen once); the cache is kept as it was."""
+    global _ACTIVE
+    saved, _ACTIVE = _ACTIVE, None
+    try:
+        yield
+    finally:
+        _ACTIVE = saved
+
+def cached(func, *args, **kwargs):
+    """func(*args, **kwargs) through the process-wide cache, if one is configured."""
+    if _ACTIVE is None:
+        return func(*args, **kwargs)
+    return _ACTIVE.call(func, *args, **kwargs)
@@ -0,0 +1,387 @@
+import copy
+import math
+import numpy as np
+from collections import deque
+from sortedcontainers import SortedList
+
+from . import technical, regression
+
+# Online counterparts of the batch indicators: each update() takes ONE new bar
+# and returns the indicator value(s) for it in O(1) (amortised: the windowed
+# ones redo O(window) work once per block of bars, like their batch kernels).
+#
+# Every class repeats its batch function's floating-point operations in the
+# same order, so a series extended bar by bar is bit-identical to recomputing
+# the whole history:
+#   EMA            <- pd.Series.ewm(span= / alpha=, adjust=False).mean()
+#   RSI            <- technical.rsi
+#   MACD           <- technical.macd
+#   SMA            <- technical.sma / sma_batch
+#   BollingerBands <- technical.bollinger_bands_batch
+#   ParabolicSAR   <- technical.parabolic_sar
+#   LinearRegressionChannel <- regression.rolling_lrc
+#
+#   rsi = RSI(14)
+#   history = rsi.update_many(df["Close"])      # same as technical.rsi(df["Close"])
+#   state = rsi.snapshot()                      # e.g. pickled next to the cached data
+#   ...
+#   rsi = RSI(14).restore(state)
+#   latest = rsi.update(new_close)
+
+def _div(a, b):
+    """a / b with NumPy's float semantics (x/0 -> +-inf or NaN instead of raising)."""
+    if b == 0:
+        if a == 0 or a != a:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+def _sqrt(x):
+    return math.sqrt(x) if x >= 0 else math.nan
+
+class IncrementalIndicator:
+    """
+    update(*bar) -> value(s) for that bar; update_many(*columns) does it for
+    whole arrays; snapshot()/restore() save and reload the running state.
+    """
+
+    n_outputs = 1
+
+    def update(self, *bar):
+        raise NotImplementedError
+
+    def update_many(self, *columns):
+        """update() for each bar of the given columns; one array per output."""
+        bars = zip(*(np.asarray(col, dtype=float).tolist() for col in columns))
+        results = [self.update(*bar) for bar in bars]
+        if self.n_outputs == 1:
+            return np.array(results, dtype=float)
+        if not results:
+            return tuple(np.array([], dtype=float) for _ in range(self.n_outputs))
+        return tuple(np.array(out, dtype=float) for out in zip(*results))
+
+    def snapshot(self):
+        """A deep copy of the running state (picklable)."""
+        return copy.deepcopy(self.__dict__)
+
+    def restore(self, state):
+        self.__dict__.update(copy.deepcopy(state))
+        return self
+
+class EMA(IncrementalIndicator):
+    """ewm(span=... or alpha=..., adjust=False).mean(), NaNs handled like pandas (ignore_na=False)."""
+
+    def __init__(self, span=None, alpha=None):
+        if (span is None) == (alpha is None):
+            raise ValueError("Pass exactly one of span / alpha")
+        # pandas goes through the center of mass
+        com = (span - 1) / 2 if span is not None else 1 / alpha - 1
+        self.alpha = 1. / (1. + com)
+        self.weighted = math.nan
+        self.old_wt = 1.
+
+    def update(self, value):
+        value = float(value)
+        if self.weighted == self.weighted:
+            self.old_wt *= 1. - self.alpha
+            if value == value:
+                # pandas skips the update on an unchanged value (constant series)
+                if self.weighted != value:
+                    self.weighted = self.old_wt * self.weighted + self.alpha * value
+                    self.weighted /= self.old_wt + self.alpha
+                self.old_wt = 1.
+        elif value == value:
+            self.weighted = value
+        return self.weighted
+
+class RSI(IncrementalIndicator):
+    """technical.rsi: Wilder-smoothed average gain / loss of close-to-close changes."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.avg_gain = EMA(alpha=1/period)
+        self.avg_loss = EMA(alpha=1/period)
+        self.prev = math.nan
+
+    def update(self, close):
+        close = float(close)
+        delta = close - self.prev
+        self.prev = close
+        # delta.where(delta > 0, 0) and -delta.where(delta < 0, 0) (a NaN delta counts as 0)
+        gain = self.avg_gain.update(delta if delta > 0 else 0.0)
+        loss = self.avg_loss.update(-(delta if delta < 0 else 0.0))
+        rs = _div(gain, loss)
+        return 100 - _div(100, 1 + rs)
+
+class MACD(IncrementalIndicator):
+    """technical.macd -> (MACD line, signal line, histogram)."""
+
+    n_outputs = 3
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.ema_fast = EMA(span=fast)
+        self.ema_slow = EMA(span=slow)
+        self.ema_signal = EMA(span=signal)
+
+    def update(self, close):
+        macd_line = self.ema_fast.update(close) - self.ema_slow.update(close)
+        signal_line = self.ema_signal.update(macd_line)
+        return macd_line, signal_line, macd_line - signal_line
+
+class _RollingMoments:
+    """
+    Window sum and sum of squares exactly as technical._window_moments: values
+    shifted by a per-block reference, forward sums inside the block and
+    backward sums over the bars before it.
+    """
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError(f"Window lengths must be >= 1, got {window}")
+        self.window = int(window)
+        self.t = 0                                  # index of the next bar
+        self.recent = deque(maxlen=self.window)     # raw values (NaN kept) of the last bars
+        self.nan_flags = deque(maxlen=self.window)
+        self.nans = 0                               # NaNs among recent
+        self.ref = None
+        self.s_ahead = deque([0.0], maxlen=self.window + 1)
+        self.ss_ahead = deque([0.0], maxlen=self.window + 1)
+        self.s_behind = [0.0]
+        self.ss_behind = [0.0]
+        self._before_block = []
+
+    def _start_reference(self, ref):
+        """First finite value of the block: its bars before it were NaN (summed as 0)."""
+        self.ref = ref
+        behind = [(v - ref if v == v else 0.0) for v in reversed(self._before_block)]
+        self.s_behind, self.ss_behind = [0.0], [0.0]
+        for v in behind:
+            self.s_behind.append(self.s_behind[-1] + v)
+            self.ss_behind.append(self.ss_behind[-1] + v * v)
+
+    def update(self, value):
+        """Adds one bar; returns (mean, variance) of the window ending at it (NaN if incomplete)."""
+        w = self.window
+        local = self.t % technical._BLOCK
+        if local == 0:
+            # New block: the w - 1 bars before it feed the backward sums
+            self._before_block = list(self.recent)[-(w - 1):] if w > 1 else []
+            self.ref = None
+            self.s_ahead = deque([0.0], maxlen=w + 1)
+            self.ss_ahead = deque([0.0], maxlen=w + 1)
+        missing = value != value
+        if self.ref is None and not missing:
+            self._start_reference(value)
+
+        shifted = 0.0 if missing or self.ref is None else value - self.ref
+        self.s_ahead.append(self.s_ahead[-1] + shifted)
+        self.ss_ahead.append(self.ss_ahead[-1] + shifted * shifted)
+
+        if len(self.nan_flags) == w and self.nan_flags[0]:
+            self.nans -= 1
+        self.nan_flags.append(missing)
+        self.nans += missing
+        self.recent.append(value)
+        self.t += 1
+
+        if self.t < w or self.nans:
+            return math.nan, math.nan
+
+        if local < w - 1:
+            # Window reaches back before the block
+            s = self.s_ahead[-1] + self.s_behind[w - 1 - local]
+            ss = self.ss_ahead[-1] + self.ss_behind[w - 1 - local]
+        else:
+            s = self.s_ahead[-1] - self.s_ahead[0]
+            ss = self.ss_ahead[-1] - self.ss_ahead[0]
+        var = _div(max(ss - s * s / w, 0.0), w - 1)
+        return s / w + self.ref, var
+
+class SMA(IncrementalIndicator):
+    """technical.sma / sma_batch for one window."""
+
+    def __init__(self, period=20):
+        self.moments = _RollingMoments(period)
+
+    def update(self, close):
+        return self.moments.update(float(close))[0]
+
+class BollingerBands(IncrementalIndicator):
+    """technical.bollinger_bands_batch for one window -> (upper, middle, lower)."""
+
+    n_outputs = 3
+
+    def __init__(self, period=20, std_dev=2):
+        self.moments = _RollingMoments(period)
+        self.std_dev = std_dev
+
+    def update(self, close):
+        middle, variance = self.moments.update(float(close))
+        std = _sqrt(variance)
+        return middle + (std * self.std_dev), middle, middle - (std * self.std_dev)
+
+class ParabolicSAR(IncrementalIndicator):
+    """technical.parabolic_sar; update(high, low)."""
+
+    def __init__(self, af_step=0.02, max_af=0.2):
+        self.af_step = af_step
+        self.max_af = max_af
+        self.i = 0
+        self.sar = self.ep = self.af = None
+        self.is_uptrend = True
+        self.lows = deque(maxlen=2)     # previous 2 bars, most recent last
+        self.highs = deque(maxlen=2)
+
+    def update(self, high, low):
+        high, low = float(high), float(low)
+        if self.i == 0:
+            self.ep, self.sar, self.af = high, low, self.af_step
+        else:
+            prev_sar, af, ep = self.sar, self.af, self.ep
+            if self.is_uptrend:
+                sar = prev_sar + af * (ep - prev_sar)
+                if low < sar:
+                    self.is_uptrend = False
+                    sar, ep, af = ep, low, self.af_step
+                else:
+                    if high > ep:
+                        ep = high
+                        af = min(af + self.af_step, self.max_af)
+                    sar = min(sar, self.lows[-1])
+                    if self.i > 1:
+                        sar = min(sar, self.lows[-2])
+            else:
+                sar = prev_sar - af * (prev_sar - ep)
+                if high > sar:
+                    self.is_uptrend = True
+                    sar, ep, af = ep, high, self.af_step
+                else:
+                    if low < ep:
+                        ep = low
+                        af = min(af + self.af_step, self.max_af)
+                    sar = max(sar, self.highs[-1])
+                    if self.i > 1:
+                        sar = max(sar, self.highs[-2])
+            self.sar, self.af, self.ep = sar, af, ep
+        self.lows.append(low)
+        self.highs.append(high)
+        self.i += 1
+        return self.sar
+
+class RollingPercentileRank(IncrementalIndicator):
+    """regression.rolling_percentile_rank: rank of each value within the last `window` values."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.sorted = SortedList()
+        self.nans = 0
+
+    def update(self, value):
+        value = float(value)
+        self.values.append(value)
+        self.nans += value != value
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.sorted.remove(old)
+            else:
+                self.nans -= 1
+        if value != value:
+            return math.nan
+        rank = math.nan
+        if len(self.values) == self.window and not self.nans:
+            lo, hi = self.sorted.bisect_left(value), self.sorted.bisect_right(value)
+            rank = (lo + (hi - lo + 2) / 2) / self.window
+        self.sorted.add(value)
+        return rank
+
+class LinearRegressionChannel(IncrementalIndicator):
+    """
+    regression.rolling_lrc -> (center_line, upper, lower, slope_pct, r_squared, width_rank).
+    Window sums follow its blocks (aligned at bar window - 1, shifted by the
+    value window - 1 bars before the block start).
+    """
+
+    n_outputs = 6
+
+    def __init__(self, window=10, num_std=2, days_per_year=252, rank_window=200):
+        self.window = int(window)
+        self.num_std = num_std
+        self.days_per_year = days_per_year
+        self.rank = RollingPercentileRank(rank_window)
+        self.t = 0
+        self.recent = deque(maxlen=self.window)     # NaN -> 0 values, as the kernel sums them
+        self.nan_flags = deque(maxlen=self.window)
+        self.nans = 0
+        self.cs = None                              # cumulative sums of the current block segment
+
+    def _start_block(self):
+        """Segment = the window - 1 bars before the block + the block, shifted by its first value."""
+        seg = list(self.recent)
+        self.ref = seg[0]
+        self.j = 0
+        self.cs = {name: deque([0.0], maxlen=self.window + 1) for name in ("y", "yy", "jy")}
+        for v in seg:
+            self._accumulate(v)
+
+    def _accumulate(self, v):
+        v = v - self.ref
+        j = float(self.j)
+        for name, term in (("y", v), ("yy", v * v), ("jy", j * v)):
+            self.cs[name].append(self.cs[name][-1] + term)
+        self.j += 1
+
+    def update(self, close):
+        close = float(close)
+        w = self.window
+        missing = close != close
+        if len(self.nan_flags) == w and self.nan_flags[0]:
+            self.nans -= 1
+        self.nan_flags.append(missing)
+        self.nans += missing
+
+        nan = math.nan
+        if w < 3:
+            self.t += 1
+            return (nan,) * 5 + (self.rank.update(nan),)
+
+        block_start = self.t >= w - 1 and (self.t - (w - 1)) % regression._BLOCK == 0
+        if block_start:
+            self.recent.append(0.0 if missing else close)
+            self._start_block()
+        else:
+            self.recent.append(0.0 if missing else close)
+            if self.cs is not None:
+                self._accumulate(self.recent[-1])
+        self.t += 1
+
+        if self.t < w or self.nans:
+            return (nan,) * 5 + (self.rank.update(nan),)
+
+        # Window sums as _window_sums(): x is the position inside the window
+        q = self.j - w                              # window's first position in the segment
+        s_y = self.cs["y"][-1] - self.cs["y"][0]
+        s_yy = self.cs["yy"][-1] - self.cs["yy"][0]
+        s_xy = (self.cs["jy"][-1] - self.cs["jy"][0]) - float(q) * s_y
+
+        wf = float(w)
+        s_x = wf * (wf - 1) / 2
+        ss_x = wf * (wf * wf - 1) / 12
+        ss_xy = s_xy - s_x * s_y / wf
+        ss_y = max(s_yy - s_y * s_y / wf, 0.0)
+
+        slope = ss_xy / ss_x
+        mean_y = s_y / wf + self.ref
+        center_line = mean_y + slope * (wf - 1) / 2
+
+        r_squared = _div(ss_xy * ss_xy, ss_x * ss_y)
+        std_y = _sqrt(ss_y / (wf - 1))
+        see = std_y * _sqrt(1 - r_squared) * math.sqrt((wf - 1) / (wf - 2))
+
+        upper = center_line + (self.num_std * see)
+        lower = center_line - (self.num_std * see)
+        slope_pct = _div(slope, center_line) * self.days_per_year * 100
+        width_pct = _div(upper - lower, center_line)
+
+        return center_line, upper, lower, slope_pct, r_squared, self.rank.update(width_pct)
@@ -0,0 +1,134 @@
+import numpy as np
+from sortedcontainers import SortedList
+
+# Rolling linear-regression channel in O(n).
+#
+# Every window statistic comes from running window sums of y, y^2 and x*y.
+# x is the position inside the window (0..w-1), so sum(x) and sum(x^2) are
+# constants, and slope/correlation don't depend on where the window sits.
+# The sums are taken over blocks of _BLOCK bars, and y is shifted by the block's
+# first value, so cumulative-sum rounding stays at the scale of one block rather
+# than the whole history.
+
+_BLOCK = 4096
+
+def _window_sums(y, window):
+    """
+    Sums of y, y^2 and x*y (x = 0..window-1 inside the window) for the windows
+    ending at each bar, and the reference level y was shifted by in each block.
+    Entries before the first full window are left at 0.
+    """
+    n = len(y)
+    s_y, s_yy, s_xy, shift = np.zeros(n), np.zeros(n), np.zeros(n), np.zeros(n)
+
+    for start in range(window - 1, n, _BLOCK):
+        stop = min(start + _BLOCK, n)
+        first = start - (window - 1)
+        seg = y[first:stop]
+        ref = seg[0]
+        seg = seg - ref
+        j = np.arange(len(seg), dtype=float)
+
+        def sums(values):
+            cs = np.concatenate(([0.0], np.cumsum(values)))
+            return cs[window:] - cs[:-window]
+
+        sy = sums(seg)
+        # sum(j * y) over the window minus (first j of the window) * sum(y)
+        s_xy[start:stop] = sums(j * seg) - j[:len(sy)] * sy
+        s_y[start:stop] = sy
+        s_yy[start:stop] = sums(seg * seg)
+        shift[start:stop] = ref
+    return s_y, s_yy, s_xy, shift
+
+def rolling_percentile_rank(values, window):
+    """
+    Percentile rank of each value within the trailing `window` values, the same
+    as `rolling(window).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1])`:
+    average rank for ties, NaN until a full window without NaNs is available.
+
+    The window is kept in a SortedList, so each step is an O(log w) removal,
+    two binary searches and an O(log w) insertion instead of ranking (or
+    shifting) the whole window.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if window < 1 or n < window:
+        return np.full(n, np.nan)
+
+    # Bars whose trailing window is full and has no NaN
+    nans = np.concatenate(([0], np.cumsum(np.isnan(values))))
+    rankable = np.zeros(n, dtype=bool)
+    rankable[window - 1:] = nans[window:] == nans[:-window]
+
+    ranks = [np.nan] * n
+    window_sorted = SortedList()
+    values = values.tolist()
+    for i, (v, rank_it) in enumerate(zip(values, rankable.tolist())):
+        if i >= window:
+            old = values[i - window]
+            if old == old:
+                window_sorted.remove(old)
+        if v != v:
+            continue
+        if rank_it:
+            lo = window_sorted.bisect_left(v)
+            hi = window_sorted.bisect_right(v)
+            # Average 1-based rank of v among its ties (hi - lo earlier equal values)
+            ranks[i] = (lo + (hi - lo + 2) / 2) / window
+        window_sorted.add(v)
+    return np.asarray(ranks)
+
+def rolling_lrc(close, window=10, num_std=2, days_per_year=252, rank_window=200):
+    """
+    Rolling linear-regression channel over `window` bars.
+
+    Returns (center_line, upper, lower, slope_pct, r_squared, width_rank) as
+    float arrays, where
+    - center_line : regression line value at the window's last bar
+    - upper/lower : center_line +/- num_std * standard error of estimate
+    - slope_pct   : slope as annualised % of center_line
+    - r_squared   : squared correlation of price and time
+    - width_rank  : percentile rank of the channel width (as % of center_line)
+                    within the last `rank_window` bars
+    Bars without a full window (or with a NaN in it) are NaN.
+    """
+    y = np.asarray(close, dtype=float)
+    n = len(y)
+    nan = np.full(n, np.nan)
+    if window < 3 or n < window:
+        return nan, nan.copy(), nan.copy(), nan.copy(), nan.copy(), nan.copy()
+
+    missing = np.isnan(y)
+    s_y, s_yy, s_xy, shift = _window_sums(np.where(missing, 0.0, y), window)
+
+    w = float(window)
+    s_x = w * (w - 1) / 2
+    ss_x = w * (w * w - 1) / 12             # sum((x - mean_x)^2)
+
+    ss_xy = s_xy - s_x * s_y / w            # sum((x - mean_x) * (y - mean_y))
+    ss_y = np.maximum(s_yy - s_y * s_y / w, 0.0)
+
+    slope = ss_xy / ss_x
+    mean_y = s_y / w + shift
+    center_line = mean_y + slope * (w - 1) / 2
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r_squared = ss_xy * ss_xy / (ss_x * ss_y)
+        std_y = np.sqrt(ss_y / (w - 1))
+        see = std_y * np.sqrt(1 - r_squared) * np.sqrt((w - 1) / (w - 2))
+
+        upper = center_line + (num_std * see)
+        lower = center_line - (num_std * see)
+        slope_pct = (slope / center_line) * days_per_year * 100
+        width_pct = (upper - lower) / center_line
+
+    # No full window yet, or a NaN inside the window
+    counts = np.concatenate(([0], np.cumsum(missing)))
+    incomplete = np.ones(n, dtype=bool)
+    incomplete[window - 1:] = counts[window:] != counts[:-window]
+    for arr in (center_line, upper, lower, slope_pct, r_squared, width_pct):
+        arr[incomplete] = np.nan
+
+    width_rank = rolling_percentile_rank(width_pct, rank_window)
+    return center_line, upper, lower, slope_pct, r_squared, width_rank
@@ -1,8 +1,147 @@
 import pandas as pd
 import numpy as np
 
+# --- BATCHED ROLLING WINDOWS ---
+# One pass serves a whole sweep of window lengths: cumulative sums are taken
+# once per block of _BLOCK bars and every window's sums are differences of them.
+# Values are shifted by the block's first value before summing (numerically
+# stable variance, and rounding stays at the scale of one block). A window's
+# row only depends on the data, not on which other windows are requested, so
+# sma_batch(close, [10, 20])[0] == sma_batch(close, 10) exactly.
+
+_BLOCK = 1024
+
+def _window_moments(values, windows):
+    """
+    Rolling mean and sample variance (ddof=1) for each window: two (len(windows), n) arrays.
+    A window containing a NaN (or not yet full) gives NaN, as pandas' rolling().
+    """
+    x = np.asarray(values, dtype=float)
+    windows = [int(w) for w in windows]
+    n = len(x)
+    means = np.full((len(windows), n), np.nan)
+    variances = np.full((len(windows), n), np.nan)
+    if n == 0 or not windows:
+        return means, variances
+    if min(windows) < 1:
+        raise ValueError(f"Window lengths must be >= 1, got {min(windows)}")
+
+    missing = np.isnan(x)
+    nans = np.concatenate(([0], np.cumsum(missing)))
+    longest = max(windows)
+
+    for start in range(0, n, _BLOCK):
+        stop = min(start + _BLOCK, n)
+        size = stop - start
+        block = x[start:stop]
+        finite = block[~missing[start:stop]]
+        ref = finite[0] if len(finite) else 0.0
+
+        # Forward sums over the block, backward sums over the bars before it
+        ahead = np.where(missing[start:stop], 0.0, block - ref)
+        behind = x[max(start - longest + 1, 0):start][::-1]
+        behind = np.where(np.isnan(behind), 0.0, behind - ref)
+        s_ahead = np.concatenate(([0.0], np.cumsum(ahead)))
+        ss_ahead = np.concatenate(([0.0], np.cumsum(ahead * ahead)))
+        s_behind = np.concatenate(([0.0], np.cumsum(behind)))
+        ss_behind = np.concatenate(([0.0], np.cumsum(behind * behind)))
+
+        def window_sums(ahead_sums, behind_sums, w, lo):
+            # Block-local bars lo.. whose window starts before the block, then the rest
+            split = min(max(w - 1, lo), size)
+            reaching_back = ahead_sums[lo + 1:split + 1] + behind_sums[w - split:w - lo][::-1]
+            inside = ahead_sums[split + 1:] - ahead_sums[split + 1 - w:size + 1 - w]
+            return np.concatenate((reaching_back, inside))
+
+        for row, w in enumerate(windows):
+            first = max(start, w - 1)
+            if first >= stop:
+                continue
+            s = window_sums(s_ahead, s_behind, w, first - start)
+            ss = window_sums(ss_ahead, ss_behind, w, first - start)
+
+            full = nans[first + 1:stop + 1] == nans[first + 1 - w:stop + 1 - w]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                var = np.maximum(ss - s * s / w, 0.0) / (w - 1)
+            means[row, first:stop] = np.where(full, s / w + ref, np.nan)
+            variances[row, first:stop] = np.where(full, var, np.nan)
+    return means, variances
+
+def _rows(batch, windows):
+    """A single window (int) gets 1-D arrays, a list of windows (windows x bars) matrices."""
+    if np.ndim(windows) == 0:
+        return tuple(b[0] for b in batch) if isinstance(batch, tuple) else batch[0]
+    return batch
+
+def sma_batch(series, windows):
+    """
+    Simple moving averages for every window length in `windows` from one pass.
+    Returns: np.ndarray (len(windows), n_bars), or (n_bars,) for a single int window.
+    """
+    means, _ = _window_moments(series, np.atleast_1d(windows))
+    return _rows(means, windows)
+
+def bollinger_bands_batch(series, windows, std_dev=2):
+    """
+    bollinger_bands() (sample std) for every window length in `windows` from one pass.
+    Returns: (Upper, Middle, Lower), each (len(windows), n_bars), or (n_bars,) for an int window.
+    """
+    middle, variance = _window_moments(series, np.atleast_1d(windows))
+    std = np.sqrt(variance)
+    return _rows((middle + (std * std_dev), middle, middle - (std * std_dev)), windows)
+
+def ema_batch(series, spans):
+    """
+    Exponential moving averages, ewm(span=s, adjust=False).mean(), for every span
+    in `spans`: a block of bars at a time for all spans together (closed form of
+    the recursion). Leading NaNs are skipped; the rest of the series must be NaN-free.
+    Returns: np.ndarray (len(spans), n_bars), or (n_bars,) for a single span.
+    """
+    x = np.asarray(series, dtype=float)
+    span_list = np.atleast_1d(np.asarray(spans, dtype=float))
+    if (span_list < 1).any():
+        raise ValueError("EMA spans must be >= 1")
+    n = len(x)
+    out = np.full((len(span_list), n), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if not len(valid) or not len(span_list):
+        return _rows(out, spans)
+
+    alpha = 2 / (span_list + 1)
+    decay = (1 - alpha)[:, None]
+    # y[j] = decay^j * (decay * y_prev + alpha * cumsum(x[k] / decay^k)):
+    # blocks are kept short enough for decay^-k to stay far from overflow
+    fastest = decay[(decay > 0) & (decay < 1)]
+    block = int(min(256, max(8, 150 * np.log(10) / -np.log(fastest.min())))) if len(fastest) else 256
+    k = np.arange(block)
+    with np.errstate(divide='ignore', over='ignore'):
+        grow = np.where(decay > 0, decay ** -k, 0.0)
+    shrink = decay ** k
+
+    first = valid[0]
+    prev = np.full(len(span_list), x[first])
+    for start in range(first, n, block):
+        chunk = x[start:start + block]
+        m = len(chunk)
+        acc = np.cumsum(chunk * grow[:, :m], axis=1)
+        y = shrink[:, :m] * (decay * prev[:, None] + alpha[:, None] * acc)
+        # decay = 0 (span 1) is just the series itself
+        y = np.where(decay > 0, y, chunk)
+        out[:, start:start + m] = y
+        prev = y[:, -1]
+    return _rows(out, spans)
+
 def sma(series, period=20):
-    return series.Close.rolling(14).mean()
+    """
+    Simple Moving Average (single-window case of sma_batch).
+    Returns: pd.Series for a Series (or a DataFrame's Close), np.ndarray otherwise.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = series.Close
+    values = sma_batch(series, int(period))
+    if isinstance(series, pd.Series):
+        return pd.Series(values, index=series.index)
+    return values
 
 def rsi(series, period=14):
     """
@@ -98,6 +237,65 @@ def parabolic_sar(high, low, af_step=0.02, max_af=0.2):
                     
     return pd.Series(sar, index=high.index)
 
+def parabolic_sar_batch(high, low, af_step=0.02, max_af=0.2):
+    """
+    Parabolic SAR for many (af_step, max_af) combinations in one pass over the bars.
+    af_step / max_af: scalars or 1-D sequences, broadcast against each other.
+    Returns: np.ndarray (n_combinations, n_bars); for NaN-free high/low, row k
+    is identical to parabolic_sar(high, low, af_step[k], max_af[k]).
+    """
+    high_arr = np.asarray(high, dtype=float)
+    low_arr = np.asarray(low, dtype=float)
+    af_step, max_af = np.broadcast_arrays(np.atleast_1d(np.asarray(af_step, dtype=float)),
+                                          np.atleast_1d(np.asarray(max_af, dtype=float)))
+    length = len(high_arr)
+
+    # One row per bar while filling (contiguous writes), transposed at the end
+    sar = np.zeros((length, len(af_step)))
+    if length == 0:
+        return sar.T
+
+    # Per-combination state, same start as parabolic_sar(): uptrend, EP = first high
+    is_uptrend = np.ones(len(af_step), dtype=bool)
+    ep = np.full(len(af_step), high_arr[0])
+    sar[0] = low_arr[0]
+    af = af_step.copy()
+
+    # Previous 2 lows / highs each bar's SAR can't cross (only the previous one on bar 1)
+    low_bound = np.minimum(low_arr, np.r_[low_arr[:1], low_arr[:-1]])
+    high_bound = np.maximum(high_arr, np.r_[high_arr[:1], high_arr[:-1]])
+
+    for i in range(1, length):
+        prev_sar = sar[i-1]
+        high_i, low_i = high_arr[i], low_arr[i]
+
+        # 1. New SAR from yesterday's data. prev + af * (ep - prev) is bit-identical
+        #    to the downtrend form prev - af * (prev - ep) (negation is exact)
+        new_sar = prev_sar + af * (ep - prev_sar)
+
+        # 2. Reversal when the bar breaks through the SAR
+        reverse = np.where(is_uptrend, low_i < new_sar, high_i > new_sar)
+        hold = ~reverse
+        extreme = hold & np.where(is_uptrend, high_i > ep, low_i < ep)
+
+        # Reversal: SAR becomes the previous EP. Otherwise it can't cross the
+        # previous 2 lows (uptrend) / highs (downtrend)
+        new_sar = np.where(hold,
+                           np.where(is_uptrend,
+                                    np.minimum(new_sar, low_bound[i-1]),
+                                    np.maximum(new_sar, high_bound[i-1])),
+                           ep)
+
+        # EP resets to this bar's extreme on a reversal, else follows a new extreme (AF accelerates)
+        af = np.where(reverse, af_step, np.where(extreme, np.minimum(af + af_step, max_af), af))
+        ep = np.where(reverse, np.where(is_uptrend, low_i, high_i),
+                      np.where(extreme, np.where(is_uptrend, high_i, low_i), ep))
+
+        is_uptrend ^= reverse
+        sar[i] = new_sar
+
+    return sar.T
+
 def macd(series, fast=12, slow=26, signal=9):
     """
     Computes MACD (Moving Average Convergence Divergence).
@@ -9,6 +9,14 @@ import backtest_settings as settings
 
 from core.data_manager import DataManager
 from core.report_manager import ReportGenerator
+from core.parallel import run_isolated, resolve_workers
+from core.pipeline import Pipeline, Stage
+from core.warmup import lookback_bars, warmup_start, with_warmup, trim_warmup
+from core.shared_data import SharedFrame, AttachedFrame
+from core.chunked_backtest import ChunkedBacktest
+from core.vector_backtest import supports_fast_path
+from indicators import cache as indicator_cache
+from optimization import SweepPool, build_grid, rank_results, best_params, successive_halving, walk_forward, cpcv
 
 class BacktestEngine:
     def __init__(self, strategy_class):
@@ -17,7 +25,15 @@ class BacktestEngine:
 
         # Check for API key 
         if config.API_KEY:
-            self.dm = DataManager(config.API_KEY, config.SECRET_KEY)
+            self.dm = DataManager(config.API_KEY, config.SECRET_KEY,
+                                  compression=settings.PARQUET_COMPRESSION,
+                                  csv_backup=settings.CSV_BACKUP,
+                                  frame_cache_bytes=settings.FRAME_CACHE_MB * 2**20,
+                                  download_workers=settings.DOWNLOAD_WORKERS,
+                                  symbols_per_request=settings.SYMBOLS_PER_REQUEST,
+                                  requests_per_minute=settings.API_RATE_LIMIT,
+                                  derive_bars=settings.DERIVE_BARS,
+                                  mmap_frames=settings.MMAP_FRAMES)
         else:
             raise ValueError("API_KEY missing in config.py")
         
@@ -25,88 +41,448 @@ class BacktestEngine:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
+        indicator_cache.configure(enabled=settings.INDICATOR_CACHE,
+                                  max_bytes=settings.INDICATOR_CACHE_MB * 2**20,
+                                  disk_dir=config.INDICATOR_CACHE_DIR if settings.INDICATOR_CACHE_DISK else None)
+
     def run(self):
         mode = settings.RUN_MODE.upper()
         print(f"Engine Started | Mode: {mode} | Strategy: {self.strategy_class.__name__}")
+        if settings.CHUNKED and not self._chunked():
+            print(f"CHUNKED ignored: {self.strategy_class.__name__} has no signals(), data is loaded whole.")
 
         match mode:
             case "SINGLE":
                 self._run_single()
             case "BATCH":
                 self._run_batch()
+            case "OPTIMIZE":
+                self._run_optimize()
+            case "WALK_FORWARD":
+                self._run_walk_forward()
+            case "CPCV":
+                self._run_cpcv()
             case _:
                 print(f"Unknown Mode: '{mode}'. Check backtest_settings.py")
 
+        cache = indicator_cache.active()
+        if cache is not None and cache.hits + cache.disk_hits + cache.misses:
+            print(cache.summary())
+        frames = self.dm.frames
+        if frames is not None and frames.hits + frames.misses > 1:
+            print(frames.summary())
+        self.dm.close()
+
     def _run_single(self):
         symbol = settings.SINGLE_SYMBOL
+        self._print_warmup()
         self._process_symbol(symbol)
 
     def _run_batch(self):
         symbol_list = settings.BATCH_SYMBOLS 
         total = len(symbol_list)
-        print(f"Batch Queue: {total} symbols")
+        workers = resolve_workers(settings.BATCH_WORKERS)
+        print(f"Batch Queue: {total} symbols | Workers: {workers}")
+        # Resolved here once: a measured lookback runs a probe backtest, not in the loader thread
+        self._print_warmup()
+        # One grouped download for the whole batch (warm-up included) instead of one per symbol
+        self.dm.backfill(symbol_list, warmup_start(settings.START_DATE, self._lookback(), settings.TIMEFRAME),
+                         settings.END_DATE, timeframe=settings.TIMEFRAME)
 
-        success_count = 0
-        for symbol in symbol_list:
-            if self._process_symbol(symbol):
-                success_count += 1
+        if workers > 1:
+            success_count = self._run_batch_parallel(symbol_list, workers)
+        elif settings.BATCH_PREFETCH and not self._chunked():
+            success_count = self._run_batch_pipelined(symbol_list)
+        else:
+            success_count = 0
+            for symbol in symbol_list:
+                if self._process_symbol(symbol):
+                    success_count += 1
         
         print("-" * 30)
         print(f"Batch Complete: {success_count}/{total} successful.")
-        print(f"Log: {os.path.join(self.output_dir, self.strategy_class.__name__, 'summary_log.csv')}")
+        print(f"Log: {self._log_path()}")
+
+    def _run_batch_parallel(self, symbol_list, workers):
+        """
+            Runs each symbol end to end in its own worker process.
+            Workers don't touch summary_log.csv; they hand their row back and the
+            parent appends rows in BATCH_SYMBOLS order as they become available.
+
+            With SHARED_DATA the parent loads each frame and publishes it to shared
+            memory; workers attach to it instead of fetching (or unpickling) data.
+        """
+        published = []
+        log_file = self._log_path()
+
+        def tasks():
+            for symbol in symbol_list:
+                handle = None
+                if settings.SHARED_DATA and not self._chunked():
+                    # A symbol that can't be loaded is skipped here: it must not end the batch
+                    try:
+                        df = self._load_frame(symbol, warmup=True)
+                        if df.empty:
+                            print(f"   [{symbol}] Skipped (no data)")
+                            continue
+                        frame = SharedFrame(df)
+                    except Exception as e:
+                        print(f"   [{symbol}] Failed to load: {type(e).__name__}: {e}")
+                        continue
+                    published.append(frame)
+                    handle = frame.handle
+                yield symbol, (self.strategy_class, symbol, handle)
+
+        success_count = 0
+        try:
+            for result in run_isolated(_batch_worker, tasks(), workers=workers, timeout=settings.SYMBOL_TIMEOUT):
+                # Results arrive in submission order (skipped symbols were never
+                # submitted), so the oldest segment is this symbol's
+                if published:
+                    published.pop(0).close()
+
+                if result.ok and result.value:
+                    ReportGenerator.append_log_row(log_file, result.value)
+                    success_count += 1
+                    print(f"   [{result.key}] Done in {result.elapsed:.1f}s")
+                elif result.ok:
+                    print(f"   [{result.key}] Skipped (no data or backtest error)")
+                else:
+                    print(f"   [{result.key}] Failed: {result.error}")
+        finally:
+            for frame in published:
+                frame.close()
+        return success_count
+
+    def _run_batch_pipelined(self, symbol_list):
+        """
+            Sequential BATCH as a pipeline of threads (core.pipeline): a loader keeps
+            the next BATCH_PREFETCH symbols' frames ready while the current one is
+            backtested, and a report writer saves the HTML and log row behind it,
+            in BATCH_SYMBOLS order. Prints where the time went at the end.
+        """
+        def load(symbol, _):
+            df = self._load_frame(symbol, warmup=True)
+            return None if df.empty else df
+
+        pipeline = Pipeline([Stage("load", load),
+                             Stage("backtest", lambda symbol, df: self._backtest(symbol, df),
+                                   backlog=settings.BATCH_PREFETCH),
+                             Stage("report", lambda symbol, result: self._report(symbol, *result))],
+                            max_bytes=settings.PREFETCH_MB * 2**20,
+                            sizeof=lambda df: int(df.memory_usage(index=True).sum()))
+
+        success_count = 0
+        for outcome in pipeline.run((symbol, None) for symbol in symbol_list):
+            if outcome.ok and outcome.value:
+                success_count += 1
+                print(f"   [{outcome.key}] Done.")
+            elif outcome.ok:
+                print(f"   [{outcome.key}] No data found. Skipping.")
+            else:
+                print(f"   [{outcome.key}] Error in {outcome.stage}: {outcome.error}")
+        print(pipeline.summary())
+        return success_count
+
+    def _run_optimize(self):
+        """
+            Sweeps the strategy's declared param_space on SINGLE_SYMBOL across
+            OPTIMIZE_WORKERS processes, persists the full grid + best-N, and
+            writes the regular report for the best combination.
+        """
+        symbol = settings.SINGLE_SYMBOL
+        space = self.strategy_class.param_space
+        metric = settings.OPTIMIZE_METRIC
+
+        df = self._load_frame(symbol)
+        if df.empty:
+            print(f"No data found for {symbol}. Nothing to optimize.")
+            return
+
+        grid = build_grid(self.strategy_class, max_tries=settings.OPTIMIZE_MAX_TRIES)
+        fixed = {k: v for k, v in settings.STRATEGY_PARAMS.items() if k not in space}
+        param_sets = [{**fixed, **params} for params in grid]
+
+        method = settings.OPTIMIZE_METHOD.upper()
+        workers = resolve_workers(settings.OPTIMIZE_WORKERS)
+        print(f"Optimize ({method}): {len(grid)} combinations x {len(df)} bars on {symbol} | Workers: {workers}")
+
+        with SweepPool(df, self.strategy_class, self._bt_kwargs(), workers=workers,
+                       fast=settings.FAST_PATH) as pool:
+            print(f"Engine: {pool.engine.__name__}")
+            if method == "HALVING":
+                all_rungs, report = successive_halving(pool, param_sets, metric,
+                                                       eta=settings.HALVING_ETA,
+                                                       min_bars=settings.HALVING_MIN_BARS)
+                print(report.summary())
+                results = all_rungs[all_rungs['Rung'] == all_rungs['Rung'].max()]
+                # Configs that survived longer rank first; within a rung, by metric
+                ranked = all_rungs.sort_values(['Rung', metric], ascending=False, na_position='last', kind='stable') \
+                    if metric in all_rungs else all_rungs
+            else:
+                results = pool.evaluate(param_sets)
+                ranked = None
+            if pool.workers > 1 and pool.cache_stats:
+                print(f"Indicator cache (workers): {pool.cache_stats['hits']} hits, "
+                      f"{pool.cache_stats['misses']} misses")
+
+        if metric not in results or results[metric].isna().all():
+            print(f"No successful runs to rank by '{metric}'.")
+            return
+
+        grid_path, top_path = ReportGenerator.save_sweep(results=rank_results(results, metric) if ranked is None else ranked,
+                                                         strat_name=self.strategy_class.__name__,
+                                                         symbol=symbol,
+                                                         timeframe=settings.TIMEFRAME,
+                                                         top_n=settings.OPTIMIZE_TOP_N,
+                                                         output_dir=self.output_dir,
+                                                         tag=method.lower())
+        print(f"Grid: {grid_path}")
+        print(f"Top {settings.OPTIMIZE_TOP_N}: {top_path}")
+
+        best = {**fixed, **best_params(results, metric, list(space))}
+        print(f"Best ({metric}): {best}")
+        self._process_symbol(symbol, df=df, params=best)
+
+    def _run_walk_forward(self):
+        """
+            Rolling (or anchored) walk-forward on SINGLE_SYMBOL: optimize on each
+            train window, trade the winner on the next test window, and stitch the
+            test windows into one out-of-sample equity curve.
+        """
+        symbol = settings.SINGLE_SYMBOL
+        metric = settings.OPTIMIZE_METRIC
+
+        df = self._load_frame(symbol)
+        if df.empty:
+            print(f"No data found for {symbol}. Nothing to test.")
+            return
+
+        grid = build_grid(self.strategy_class, max_tries=settings.OPTIMIZE_MAX_TRIES)
+        fixed = {k: v for k, v in settings.STRATEGY_PARAMS.items() if k not in self.strategy_class.param_space}
+        param_sets = [{**fixed, **params} for params in grid]
+
+        with SweepPool(df, self.strategy_class, self._bt_kwargs(), workers=settings.OPTIMIZE_WORKERS,
+                       fast=settings.FAST_PATH) as pool:
+            folds, equity, oos = walk_forward(pool, param_sets, metric,
+                                              train_bars=settings.WF_TRAIN_BARS,
+                                              test_bars=settings.WF_TEST_BARS,
+                                              anchored=settings.WF_ANCHORED,
+                                              initial_cash=settings.INITIAL_CASH)
 
-    def _process_symbol(self, symbol):
+        folds_path, equity_path = ReportGenerator.save_walk_forward(folds=folds,
+                                                                    equity=equity,
+                                                                    strat_name=self.strategy_class.__name__,
+                                                                    symbol=symbol,
+                                                                    timeframe=settings.TIMEFRAME,
+                                                                    output_dir=self.output_dir)
+        print("-" * 30)
+        for k, v in oos.items():
+            print(f"   OOS {k}: {v:.2f}")
+        print(f"Folds: {folds_path}")
+        print(f"OOS Equity: {equity_path}")
+
+    def _run_cpcv(self):
+        """
+            Combinatorial purged cross-validation on SINGLE_SYMBOL: every parameter
+            set runs once on the full history, then each train/test split picks its
+            in-sample winner and scores it out of sample. Prints the probability of
+            backtest overfitting (PBO) and persists the per-split table.
+        """
+        symbol = settings.SINGLE_SYMBOL
+
+        df = self._load_frame(symbol)
+        if df.empty:
+            print(f"No data found for {symbol}. Nothing to test.")
+            return
+
+        grid = build_grid(self.strategy_class, max_tries=settings.OPTIMIZE_MAX_TRIES)
+        fixed = {k: v for k, v in settings.STRATEGY_PARAMS.items() if k not in self.strategy_class.param_space}
+        param_sets = [{**fixed, **params} for params in grid]
+
+        with SweepPool(df, self.strategy_class, self._bt_kwargs(), workers=settings.OPTIMIZE_WORKERS,
+                       fast=settings.FAST_PATH) as pool:
+            splits, summary = cpcv(pool, param_sets,
+                                   n_groups=settings.CPCV_GROUPS,
+                                   test_groups=settings.CPCV_TEST_GROUPS,
+                                   purge=settings.CPCV_PURGE_BARS,
+                                   embargo=settings.CPCV_EMBARGO_BARS)
+
+        if splits.empty:
+            print("No split produced a usable in-sample winner.")
+            return
+
+        splits_path, summary_path = ReportGenerator.save_cpcv(splits=splits,
+                                                              summary=summary,
+                                                              strat_name=self.strategy_class.__name__,
+                                                              symbol=symbol,
+                                                              timeframe=settings.TIMEFRAME,
+                                                              output_dir=self.output_dir)
+        print("-" * 30)
+        for k, v in summary.items():
+            print(f"   {k}: {v:.2f}")
+        print(f"Splits: {splits_path}")
+        print(f"Summary: {summary_path}")
+
+    def _bt_kwargs(self):
+        """Backtest() settings shared by every run mode."""
+        return dict(cash=settings.INITIAL_CASH, 
+                    commission=settings.COMMISSION,
+                    finalize_trades=True)
+
+    def _log_path(self):
+        return os.path.join(self.output_dir, self.strategy_class.__name__, 'summary_log.csv')
+
+    def _load_frame(self, symbol, warmup=False):
+        """
+            Fetches the configured range for `symbol`, with the tz-naive index Backtest expects.
+            warmup=True (and WARMUP on): preceded by the strategy's lookback, so
+            the first trading decision falls on START_DATE (core.warmup).
+        """
+        bars = self._lookback() if warmup else 0
+        df = self.dm.get_data(symbol, 
+                              warmup_start(settings.START_DATE, bars, settings.TIMEFRAME), 
+                              settings.END_DATE, 
+                              timeframe=settings.TIMEFRAME,
+                              tz_naive=True)
+        return with_warmup(df, settings.START_DATE, bars) if bars and not df.empty else df
+
+    def _lookback(self):
+        """Bars of history the strategy needs before START_DATE (0 with WARMUP off)."""
+        if not settings.WARMUP:
+            return 0
+        return lookback_bars(self.strategy_class, settings.STRATEGY_PARAMS)
+
+    def _print_warmup(self):
+        if settings.WARMUP:
+            print(f"Warm-up: {self._lookback()} bars before {settings.START_DATE:%Y-%m-%d} "
+                  f"({self.strategy_class.__name__} lookback)")
+
+    def _chunked(self):
+        """CHUNKED runs apply to strategies with a vectorized signals() only."""
+        return settings.CHUNKED and supports_fast_path(self.strategy_class)
+
+    def _iter_frames(self, symbol):
+        """The configured range for `symbol` as consecutive CHUNK_BARS frames (tz-naive index)."""
+        for df in self.dm.iter_data(symbol,
+                                    settings.START_DATE,
+                                    settings.END_DATE,
+                                    timeframe=settings.TIMEFRAME,
+                                    chunk_rows=settings.CHUNK_BARS):
+            if df.index.tz is not None:
+                df.index = df.index.tz_localize(None)
+            yield df
+
+    def _process_symbol_chunked(self, symbol, log=True, params=None):
+        """
+            _process_symbol() for CHUNKED runs: streams the history through
+            ChunkedBacktest, which writes the equity curve and trades to CSV as it
+            goes, then logs the summary row (no HTML chart).
+        """
+        try:
+            print(f"   Processing {symbol} (chunked)...", end=" ")
+            params = settings.STRATEGY_PARAMS if params is None else params
+            equity_path, trades_path = ReportGenerator.chunked_paths(strat_name=self.strategy_class.__name__,
+                                                                     symbol=symbol,
+                                                                     timeframe=settings.TIMEFRAME,
+                                                                     output_dir=self.output_dir)
+
+            bt = ChunkedBacktest(self._iter_frames(symbol), self.strategy_class,
+                                 warmup_bars=settings.CHUNK_WARMUP_BARS,
+                                 equity_path=equity_path,
+                                 trades_path=trades_path,
+                                 **self._bt_kwargs())
+            stats = bt.run(**params)
+
+            row = ReportGenerator.save_chunked(stats=stats,
+                                               strategy_class=self.strategy_class,
+                                               params=params,
+                                               symbol=symbol,
+                                               timeframe=settings.TIMEFRAME,
+                                               output_dir=self.output_dir,
+                                               log=log)
+            print(f"Done ({stats['Chunks']} chunks).")
+            return row
+
+        except Exception as e:
+            print(f"Error processing {symbol}: {e}")
+            import traceback; traceback.print_exc()
+            return None
+
+    def _process_symbol(self, symbol, log=True, df=None, params=None):
         """
             The Core Worker: 
-            1. Fetches Data 
-            2. Runs Backtest 
+            1. Fetches Data (unless a preloaded `df` is given)
+            2. Runs Backtest (with `params`, default: STRATEGY_PARAMS)
             3. Saves Report
+
+            Returns the summary log row on success (None on failure).
+            With log=False the row is not written, only returned.
         """
+        if df is None and self._chunked():
+            return self._process_symbol_chunked(symbol, log=log, params=params)
+
         try:
             print(f"   Processing {symbol}...", end=" ")
             
             # Get Data
-            df = self.dm.get_data(symbol, 
-                                  settings.START_DATE, 
-                                  settings.END_DATE, 
-                                  timeframe=settings.TIMEFRAME)
+            if df is None:
+                df = self._load_frame(symbol, warmup=True)
             
             if df.empty:
                 print(f"No data found for {symbol}. Skipping.")
-                return False
-            
-            # Remove timezone for backtest
-            if df.index.tz is not None:
-                df.index = df.index.tz_localize(None)
+                return None
 
             # Run Backtest
-            bt = Backtest(df, 
-                          self.strategy_class, 
-                          cash=settings.INITIAL_CASH, 
-                          commission=settings.COMMISSION,
-                          finalize_trades=True)
-            
-            # Run with parameter overrides from settings
-            stats = bt.run(**settings.STRATEGY_PARAMS)
-            
-            s_sym = pd.Series([symbol], index=['Symbol'])
-            stats = pd.concat([s_sym, stats])
+            bt, stats = self._backtest(symbol, df, params)
             
             # Save
-            ReportGenerator.save_report(backtest_instance=bt, 
-                                        stats=stats, 
-                                        symbol=symbol, 
-                                        timeframe=settings.TIMEFRAME, 
-                                        strategy_class=stats._strategy, 
-                                        output_dir=self.output_dir)
+            row = self._report(symbol, bt, stats, log=log)
             print("Done.")
-            return True
+            return row
         
         except Exception as e:
             print(f"Error processing {symbol}: {e}")
             # Uncomment the next line to see full error tracebacks during debugging
             import traceback; traceback.print_exc()
-            return False
+            return None
+
+    def _backtest(self, symbol, df, params=None):
+        """
+            Runs the strategy on `df` (with `params`, default: STRATEGY_PARAMS). Returns (bt, stats),
+            the stats from START_DATE on if `df` holds warm-up bars before it.
+        """
+        bt = Backtest(df, self.strategy_class, **self._bt_kwargs())
+        
+        # Run with parameter overrides from settings
+        stats = trim_warmup(bt.run(**(settings.STRATEGY_PARAMS if params is None else params)),
+                            df, settings.START_DATE)
+        
+        s_sym = pd.Series([symbol], index=['Symbol'])
+        return bt, pd.concat([s_sym, stats])
+
+    def _report(self, symbol, bt, stats, log=True):
+        """Saves the HTML report of a run; returns its summary log row (appended to the log if `log`)."""
+        return ReportGenerator.save_report(backtest_instance=bt, 
+                                           stats=stats, 
+                                           symbol=symbol, 
+                                           timeframe=settings.TIMEFRAME, 
+                                           strategy_class=stats._strategy, 
+                                           output_dir=self.output_dir,
+                                           log=log)
+
+def _batch_worker(strategy_class, symbol, handle=None):
+    """Entry point of a parallel BATCH worker process: one engine, one symbol."""
+    engine = BacktestEngine(strategy_class)
+    try:
+        if handle is None:
+            return engine._process_symbol(symbol, log=False)
+
+        with AttachedFrame(handle) as frame:
+            return engine._process_symbol(symbol, log=False, df=frame.df)
+    finally:
+        # Worker processes exit without joining threads: finish compactions first
+        engine.dm.close()
     
 def main():
     bt_engine = BacktestEngine(strategy_class = settings.ACTIVE_STRATEGY)
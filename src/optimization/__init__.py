@@ -0,0 +1,33 @@
+import importlib
+
+from .param_space import (
+    IntRange,
+    FloatRange,
+    Choice,
+    build_grid,
+    space_size,
+)
+
+# The runners import the engine stack (core -> data_manager -> config, which
+# wants API keys). Strategies only need param_space, so the rest is imported
+# on first use.
+_LAZY = {
+    "SweepPool": ".sweep",
+    "rank_results": ".sweep",
+    "best_params": ".sweep",
+    "successive_halving": ".halving",
+    "rung_schedule": ".halving",
+    "walk_forward": ".walk_forward",
+    "make_folds": ".walk_forward",
+    "cpcv": ".cpcv",
+    "group_layout": ".cpcv",
+    "split_masks": ".cpcv",
+}
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    # Bind it here: importing .walk_forward / .cpcv just set the same name to the submodule
+    globals()[name] = value
+    return value
@@ -0,0 +1,142 @@
+import itertools
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Tuple
+
+from .sweep import _get_backtest
+
+# Combinatorial purged cross-validation (Lopez de Prado, AFML ch. 12) and the
+# probability of backtest overfitting (Bailey et al., CSCV).
+#
+# Every parameter set is backtested ONCE over the full history (indicators are
+# computed once per parameter set). Its per-bar returns are then summarised per
+# group so every one of the C(N, k) train/test splits can be scored from a few
+# sums, instead of re-running (and re-initialising) the strategy per fold.
+
+HEAD, BODY, TAIL = 0, 1, 2
+
+@dataclass(frozen=True)
+class GroupLayout:
+    """Bar ranges of the N groups, each cut into head (embargo) / body / tail (purge)."""
+    bounds: Tuple[Tuple[int, int], ...]
+    purge: int
+    embargo: int
+
+    def segments(self, g):
+        start, stop = self.bounds[g]
+        head_end = min(start + self.embargo, stop)
+        tail_start = max(stop - self.purge, head_end)
+        return (start, head_end), (head_end, tail_start), (tail_start, stop)
+
+def group_layout(n_bars, n_groups, purge=0, embargo=0):
+    edges = np.linspace(0, n_bars, n_groups + 1).round().astype(int)
+    return GroupLayout(tuple(zip(edges[:-1].tolist(), edges[1:].tolist())), int(purge), int(embargo))
+
+def _group_sums(task):
+    """
+    Worker: one full-history backtest for `params`; returns an (N groups x 3 segments x 3)
+    array of [count, sum, sum of squares] of per-bar returns (all NaN if the run fails).
+    """
+    params, layout = task
+    sums = np.zeros((len(layout.bounds), 3, 3))
+    try:
+        stats = _get_backtest(None).run(**params)
+    except Exception:
+        return sums * np.nan
+    equity = stats._equity_curve['Equity'].values
+    returns = np.r_[0.0, equity[1:] / equity[:-1] - 1]
+
+
+    for g in range(len(layout.bounds)):
+        for seg, (a, b) in enumerate(layout.segments(g)):
+            r = returns[a:b]
+            sums[g, seg] = (len(r), r.sum(), (r * r).sum())
+    return sums
+
+def split_masks(n_groups, test_groups):
+    """
+    Segment masks (N x 3) of one split. Train bars within `purge` bars before a
+    test group and `embargo` bars after one are dropped (their group's tail/head).
+    """
+    test = np.zeros((n_groups, 3), dtype=bool)
+    test[list(test_groups), :] = True
+
+    train = ~test
+    for g in test_groups:
+        if g - 1 >= 0 and g - 1 not in test_groups:
+            train[g - 1, TAIL] = False      # purge
+        if g + 1 < n_groups and g + 1 not in test_groups:
+            train[g + 1, HEAD] = False      # embargo
+    return train, test
+
+def _sharpe(sums, mask):
+    """Per-bar Sharpe of every parameter set over the masked segments. sums: (P, N, 3, 3)"""
+    agg = sums[:, mask].sum(axis=1)
+    n, s, ss = agg[:, 0], agg[:, 1], agg[:, 2]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s / n
+        var = (ss - s * s / n) / (n - 1)
+        return mean / np.sqrt(np.where(var > 0, var, np.nan))
+
+def cpcv(pool, param_sets, n_groups=10, test_groups=2, purge=0, embargo=0):
+    """
+    Runs CPCV over a SweepPool.
+
+    Returns (splits, summary):
+    - splits : one row per C(n_groups, test_groups) split - the in-sample best
+               parameter set, its IS/OOS Sharpe, OOS relative rank and logit
+    - summary: PBO (share of splits where the IS winner lands at or below the
+               OOS median), plus the OOS Sharpe distribution of the IS winners
+    Sharpe ratios are annualised with the frame's bars per year.
+    """
+    if len(param_sets) < 2:
+        raise ValueError("CPCV needs at least 2 parameter sets to estimate overfitting.")
+
+    df = pool.df
+    layout = group_layout(len(df), n_groups, purge=purge, embargo=embargo)
+    combos = list(itertools.combinations(range(n_groups), test_groups))
+    print(f"CPCV: {len(param_sets)} parameter sets x {len(combos)} splits "
+          f"(N={n_groups}, k={test_groups}, purge={purge}, embargo={embargo})")
+
+    sums = np.stack(pool.map(_group_sums, [(p, layout) for p in param_sets]))
+
+    years = (df.index[-1] - df.index[0]).days / 365.25
+    annualize = np.sqrt(len(df) / years) if years > 0 else 1.0
+
+    rows = []
+    n_params = len(param_sets)
+    for split, groups in enumerate(combos):
+        train, test = split_masks(n_groups, groups)
+        is_sharpe = _sharpe(sums, train)
+        oos_sharpe = _sharpe(sums, test)
+        if np.isnan(is_sharpe).all():
+            continue
+
+        best = int(np.nanargmax(is_sharpe))
+        # Relative OOS rank of the IS winner in (0, 1); NaN (no trades) ranks last
+        ranks = pd.Series(np.nan_to_num(oos_sharpe, nan=-np.inf)).rank(method='average').values
+        omega = ranks[best] / (n_params + 1)
+        rows.append({
+            'Split': split,
+            'Test_Groups': "-".join(map(str, groups)),
+            'Best_Index': best,
+            **param_sets[best],
+            'IS Sharpe': is_sharpe[best] * annualize,
+            'OOS Sharpe': oos_sharpe[best] * annualize,
+            'OOS Rank': omega,
+            'Logit': np.log(omega / (1 - omega)),
+        })
+
+    splits = pd.DataFrame(rows)
+    if splits.empty:
+        return splits, {}
+
+    summary = {
+        'Splits': len(splits),
+        'PBO': float((splits['Logit'] <= 0).mean()),
+        'Mean OOS Sharpe': float(splits['OOS Sharpe'].mean()),
+        'Median OOS Sharpe': float(splits['OOS Sharpe'].median()),
+        'P(OOS Sharpe < 0)': float((splits['OOS Sharpe'] < 0).mean()),
+    }
+    return splits, summary
@@ -0,0 +1,92 @@
+import math
+import pandas as pd
+from dataclasses import dataclass
+from typing import List
+
+from .sweep import rank_results
+
+@dataclass
+class HalvingRung:
+    rung: int
+    bars: int
+    configs: int
+    survivors: int
+    bars_simulated: int
+
+@dataclass
+class HalvingReport:
+    rungs: List[HalvingRung]
+    bars_simulated: int
+    bars_exhaustive: int
+
+    @property
+    def pruned_pct(self):
+        return 100 * (1 - self.bars_simulated / self.bars_exhaustive) if self.bars_exhaustive else 0.0
+
+    def summary(self):
+        lines = [f"   Rung {r.rung}: {r.configs:>6} configs x {r.bars:>8} bars -> keep {r.survivors}"
+                 for r in self.rungs]
+        lines.append(f"   Simulated {self.bars_simulated:,} bars vs {self.bars_exhaustive:,} exhaustive "
+                     f"({self.pruned_pct:.1f}% pruned, {self.bars_exhaustive / max(self.bars_simulated, 1):.1f}x less)")
+        return "\n".join(lines)
+
+def rung_schedule(n_configs, total_bars, eta=3, min_bars=1000):
+    """
+    Prefix lengths for each rung, shortest first, ending with the full history.
+
+    There is one rung per factor of `eta` in the number of configs. Prefixes grow
+    by `eta` per rung when the history is long enough; otherwise they're spread
+    geometrically between `min_bars` (indicator warm-up + a few trades) and the
+    full length, so pruning stays aggressive on short histories too.
+    """
+    # Integer powers: math.log(1000, 10) is 2.9999999999999996
+    n_rungs = 1
+    while eta ** n_rungs <= n_configs:
+        n_rungs += 1
+    if n_rungs == 1 or total_bars <= min_bars:
+        return [total_bars]
+
+    growth = eta
+    if total_bars / eta ** (n_rungs - 1) < min_bars:
+        growth = (total_bars / min_bars) ** (1 / (n_rungs - 1))
+
+    bars = [int(round(total_bars / growth ** (n_rungs - 1 - r))) for r in range(n_rungs)]
+    bars[-1] = total_bars
+    return bars
+
+def successive_halving(pool, param_sets, metric, eta=3, min_bars=1000):
+    """
+    Successive halving over a SweepPool:
+    every config runs on the shortest prefix, the best 1/eta advance to a prefix
+    `eta` times longer, and so on until the survivors run on the full history.
+
+    Returns (results, report): `results` has one row per (config, rung) with
+    'Rung' and 'Bars' columns; the last rung's rows are the final ranking.
+    """
+    total_bars = len(pool.df)
+    schedule = rung_schedule(len(param_sets), total_bars, eta=eta, min_bars=min_bars)
+
+    survivors = list(param_sets)
+    rungs, frames = [], []
+    for r, bars in enumerate(schedule):
+        is_last = r == len(schedule) - 1
+        print(f"Rung {r}: {len(survivors)} configs on the first {bars} bars")
+        results = pool.evaluate(survivors, window=(0, bars))
+        results.insert(0, 'Rung', r)
+        results.insert(1, 'Bars', bars)
+        frames.append(results)
+
+        keep = len(survivors) if is_last else max(1, math.ceil(len(survivors) / eta))
+        rungs.append(HalvingRung(r, bars, len(survivors), keep, bars * len(survivors)))
+
+        if not is_last:
+            if metric not in results:
+                # Every run failed; nothing to rank, nothing to promote
+                break
+            ranked = rank_results(results, metric).head(keep)
+            survivors = [survivors[i] for i in ranked.index]
+
+    report = HalvingReport(rungs=rungs,
+                           bars_simulated=sum(r.bars_simulated for r in rungs),
+                           bars_exhaustive=len(param_sets) * total_bars)
+    return pd.concat(frames, ignore_index=True), report
@@ -0,0 +1,65 @@
+import itertools
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Sequence
+
+@dataclass(frozen=True)
+class IntRange:
+    """Inclusive integer range: IntRange(10, 50, 10) -> 10, 20, 30, 40, 50"""
+    low: int
+    high: int
+    step: int = 1
+
+    def values(self) -> List[int]:
+        return list(range(int(self.low), int(self.high) + 1, int(self.step)))
+
+@dataclass(frozen=True)
+class FloatRange:
+    """Inclusive float range: FloatRange(0.02, 0.06, 0.02) -> 0.02, 0.04, 0.06"""
+    low: float
+    high: float
+    step: float
+
+    def values(self) -> List[float]:
+        n = int(round((self.high - self.low) / self.step))
+        # Rounded so 0.1 + 2 * 0.1 comes out as 0.3 (clean CSVs, stable cache keys)
+        return [round(self.low + i * self.step, 10) for i in range(n + 1)]
+
+@dataclass(frozen=True)
+class Choice:
+    """Explicit set of values: Choice((1.5, 2, 2.5))"""
+    options: Sequence[Any]
+
+    def values(self) -> List[Any]:
+        return list(self.options)
+
+def space_size(space: Dict[str, Any]) -> int:
+    size = 1
+    for dim in space.values():
+        size *= len(dim.values())
+    return size
+
+def iter_grid(space: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Cartesian product of every dimension, in declaration order."""
+    names = list(space)
+    for combo in itertools.product(*(space[name].values() for name in names)):
+        yield dict(zip(names, combo))
+
+def build_grid(strategy_class, space=None, max_tries=None, seed=0) -> List[Dict[str, Any]]:
+    """
+    Expands a strategy's `param_space` into a list of parameter dicts.
+
+    - Combinations rejected by `strategy_class.param_constraint` are dropped.
+    - If `max_tries` is set and the grid is larger, a reproducible random
+      subset of that size is returned (same `seed` -> same subset).
+    """
+    space = strategy_class.param_space if space is None else space
+    if not space:
+        raise ValueError(f"{strategy_class.__name__} does not declare a param_space.")
+
+    grid = [p for p in iter_grid(space) if strategy_class.param_constraint(p)]
+
+    if max_tries and len(grid) > max_tries:
+        keep = sorted(random.Random(seed).sample(range(len(grid)), int(max_tries)))
+        grid = [grid[i] for i in keep]
+    return grid
@@ -0,0 +1,187 @@
+import os
+import math
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from backtesting import Backtest
+
+from core.parallel import resolve_workers
+from core.shared_data import SharedFrame, AttachedFrame
+from core.vector_backtest import VectorBacktest, supports_fast_path
+from indicators import cache as indicator_cache
+
+# Stats recorded for every evaluated parameter set (same names as Backtest.run output)
+METRICS = ['Return [%]', 'Sharpe Ratio', 'Max. Drawdown [%]', 'Win Rate [%]', '# Trades']
+
+# --- WORKER SIDE ---
+# One state per process: the attached frame, and a few Backtest objects built on
+# slices of it (keyed by (start, stop) bar window) so repeated calls reuse them.
+_STATE = {}
+_MAX_BACKTESTS = 8
+
+def _init_state(strategy_class, bt_kwargs, handle=None, df=None, engine=Backtest, cache_config=None):
+    warnings.filterwarnings("ignore")  # Broker "insufficient margin" noise, x10k runs
+    if cache_config is not None:
+        indicator_cache.configure(**cache_config)
+    frame = AttachedFrame(handle) if handle is not None else None
+    _STATE.clear()
+    _STATE.update(frame=frame,
+                  df=frame.df if frame else df,
+                  strategy_class=strategy_class,
+                  bt_kwargs=bt_kwargs,
+                  engine=engine,
+                  backtests={})
+
+def _get_backtest(window):
+    backtests = _STATE['backtests']
+    if window not in backtests:
+        df = _STATE['df']
+        if window is not None:
+            # iloc on a single-block frame is a view, not a copy
+            df = df.iloc[window[0]:window[1]]
+        if len(backtests) >= _MAX_BACKTESTS:
+            backtests.pop(next(iter(backtests)))
+        backtests[window] = _STATE['engine'](df, _STATE['strategy_class'], **_STATE['bt_kwargs'])
+    return backtests[window]
+
+def _run_chunk(chunk, window=None):
+    """
+    Evaluates [(position, params), ...] on the given bar window of the shared frame.
+    Also returns (pid, indicator cache stats) so the parent can report them.
+    """
+    bt = _get_backtest(window)
+    rows = [(pos, run_params(bt, params)) for pos, params in chunk]
+    cache = indicator_cache.active()
+    return rows, (os.getpid(), cache.stats() if cache is not None else None)
+
+def backtest_metrics(stats):
+    return {m: stats[m] for m in METRICS}
+
+def run_params(bt, params):
+    """Runs one parameter set; failures become an 'Error' entry instead of killing the sweep."""
+    try:
+        return backtest_metrics(bt.run(**params))
+    except Exception as e:
+        return {'Error': f"{type(e).__name__}: {e}"}
+
+# --- PARENT SIDE ---
+class SweepPool:
+    """
+    Evaluates many parameter sets of one strategy on one frame across processes.
+
+    The frame is published once to shared memory (see core.shared_data); each
+    worker attaches to it when it starts and keeps its Backtest objects between
+    calls, so nothing but parameter dicts and metric rows crosses processes.
+
+        with SweepPool(df, LrcReversion, bt_kwargs, workers=None) as pool:
+            results = pool.evaluate(param_sets)                 # full history
+            results = pool.evaluate(param_sets, window=(0, 5000))  # first 5000 bars
+
+    workers=1 runs everything in-process (handy for debugging).
+    fast=True runs strategies that implement signals() on core.vector_backtest
+    (same results, no per-bar next() loop); others always use Backtest.
+    """
+
+    def __init__(self, df, strategy_class, bt_kwargs, workers=None, chunks_per_worker=4, fast=False):
+        self.df = df
+        self.strategy_class = strategy_class
+        self.bt_kwargs = bt_kwargs
+        self.workers = resolve_workers(workers)
+        self.chunks_per_worker = chunks_per_worker
+        self.engine = VectorBacktest if fast and supports_fast_path(strategy_class) else Backtest
+        self.bars_simulated = 0
+        self._worker_cache_stats = {}
+        self._frame = None
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._frame = SharedFrame(self.df)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 initializer=_init_state,
+                                                 initargs=(self.strategy_class, self.bt_kwargs, self._frame.handle,
+                                                           None, self.engine, indicator_cache.current_config()))
+        else:
+            _init_state(self.strategy_class, self.bt_kwargs, df=self.df, engine=self.engine)
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._frame is not None:
+            self._frame.close()
+            self._frame = None
+
+    def map(self, func, items):
+        """
+        Runs `func(item)` for each item inside the pool's workers (results in order).
+        `func` must be a module-level function; it can use this module's worker
+        state, e.g. `_get_backtest(window)`, to reach the shared frame.
+        """
+        if self._executor is not None:
+            return list(self._executor.map(func, items))
+        return [func(item) for item in items]
+
+    def evaluate(self, param_sets, window=None, progress=True):
+        """
+        Returns one row per parameter set, in input order: the parameters followed
+        by METRICS (and an 'Error' column if any run failed).
+        `window` is an optional (start, stop) bar slice of the frame.
+        """
+        param_sets = list(param_sets)
+        if not param_sets:
+            return pd.DataFrame()
+
+        indexed = list(enumerate(param_sets))
+        n_chunks = max(1, min(len(indexed), self.workers * self.chunks_per_worker))
+        size = math.ceil(len(indexed) / n_chunks)
+        chunks = [indexed[i:i + size] for i in range(0, len(indexed), size)]
+
+        if self._executor is not None:
+            batches = self._executor.map(_run_chunk, chunks, [window] * len(chunks))
+        else:
+            batches = (_run_chunk(chunk, window) for chunk in chunks)
+
+        rows = [None] * len(param_sets)
+        started = time.perf_counter()
+        done, next_report = 0, 0.1
+        for batch, (pid, cache_stats) in batches:
+            if cache_stats is not None:
+                self._worker_cache_stats[pid] = cache_stats
+            for pos, metrics in batch:
+                rows[pos] = {**param_sets[pos], **metrics}
+            done += len(batch)
+            if progress and done / len(param_sets) >= next_report:
+                print(f"   {done}/{len(param_sets)} evaluated ({time.perf_counter() - started:.1f}s)")
+                next_report = math.floor(done / len(param_sets) * 10 + 1) / 10
+
+        start, stop, _ = slice(*(window or (None, None))).indices(len(self.df))
+        self.bars_simulated += (stop - start) * len(param_sets)
+        return pd.DataFrame(rows)
+
+    @property
+    def cache_stats(self):
+        """Indicator cache counters summed over the workers (latest report of each), or {}."""
+        totals = {}
+        for stats in self._worker_cache_stats.values():
+            for k in ('hits', 'disk_hits', 'misses', 'bypassed', 'evictions'):
+                totals[k] = totals.get(k, 0) + stats[k]
+        return totals
+
+def rank_results(results, metric, top_n=None):
+    """Sorts sweep results best-first by `metric` (NaN/failed runs last)."""
+    ranked = results.sort_values(metric, ascending=False, na_position='last', kind='stable')
+    return ranked.head(top_n) if top_n else ranked
+
+def best_params(results, metric, param_names):
+    """Parameter dict of the best row, with numpy scalars turned back into Python types."""
+    # Read per column (a row Series would upcast ints to float)
+    row = rank_results(results, metric, top_n=1).index[0]
+    values = {name: results.at[row, name] for name in param_names}
+    return {name: v.item() if isinstance(v, np.generic) else v for name, v in values.items()}
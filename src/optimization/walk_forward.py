@@ -0,0 +1,106 @@
+import pandas as pd
+from dataclasses import dataclass
+from typing import Tuple
+
+from core.metrics import summary_metrics
+from core.warmup import lookback_bars
+from .sweep import _STATE, _get_backtest, run_params, rank_results, best_params
+
+@dataclass(frozen=True)
+class Fold:
+    fold: int
+    train: Tuple[int, int]   # (start, stop) bar positions, stop exclusive
+    test: Tuple[int, int]
+
+def make_folds(n_bars, train_bars, test_bars, anchored=False):
+    """
+    Consecutive train/test splits over `n_bars` bars.
+    - rolling : every train window is `train_bars` long and slides by `test_bars`
+    - anchored: every train window starts at bar 0 and grows by `test_bars`
+    Test windows never overlap and together cover everything after the first train window.
+    A tail shorter than `test_bars` joins the last full test window instead of
+    making a fold of its own.
+    """
+    if train_bars + 1 > n_bars:
+        raise ValueError(f"Need more than {train_bars} bars for a single fold, have {n_bars}.")
+
+    folds = []
+    test_start = train_bars
+    while test_start < n_bars:
+        test_stop = test_start + test_bars
+        if n_bars - test_stop < test_bars:
+            test_stop = n_bars
+        train_start = 0 if anchored else test_start - train_bars
+        folds.append(Fold(len(folds), (train_start, test_start), (test_start, test_stop)))
+        test_start = test_stop
+    return folds
+
+def _run_fold(task):
+    """
+    Worker: optimize on the fold's train window, then run the winner on its test window.
+
+    The test backtest is started lookback + 1 bars before the test window (the
+    strategy's indicator lookback for the chosen params, see core.warmup) so
+    that the first trading decision happens exactly on the first test bar.
+    A fold that fails comes back as a row with an 'Error' entry.
+    """
+    fold, param_sets, metric = task
+    row = {'Fold': fold.fold, 'Train_Bars': fold.train[1] - fold.train[0], 'Test_Bars': fold.test[1] - fold.test[0]}
+    try:
+        train_bt = _get_backtest(fold.train)
+        train = pd.DataFrame([{**p, **run_params(train_bt, p)} for p in param_sets])
+        if metric not in train or train[metric].isna().all():
+            return {**row, 'Error': 'No successful train run'}, None, []
+
+        best = best_params(train, metric, list(param_sets[0]))
+        row.update(best)
+        row[f'Train {metric}'] = rank_results(train, metric).iloc[0][metric]
+
+        test_start = max(0, fold.test[0] - lookback_bars(_STATE['strategy_class'], best) - 1)
+        stats = _get_backtest((test_start, fold.test[1])).run(**best)
+
+        offset = fold.test[0] - test_start
+        equity = stats._equity_curve['Equity'].iloc[offset:]
+        trades = stats._trades[stats._trades['EntryBar'] >= offset]
+
+        row.update({f'Test {k}': v for k, v in summary_metrics(equity.values, equity.index, trades['PnL']).items()})
+        row['Test_Start'] = equity.index[0]
+        row['Test_End'] = equity.index[-1]
+        return row, equity, list(trades['PnL'])
+    except Exception as e:
+        return {**row, 'Error': f"{type(e).__name__}: {e}"}, None, []
+
+def stitch_equity(curves, initial_cash):
+    """Chains per-fold equity curves into one out-of-sample curve (each fold compounds on the last)."""
+    stitched, level = [], initial_cash
+    for curve in curves:
+        scaled = curve / curve.iloc[0] * level
+        stitched.append(scaled)
+        level = scaled.iloc[-1]
+    return pd.concat(stitched)
+
+def walk_forward(pool, param_sets, metric, train_bars, test_bars, anchored=False, initial_cash=10_000):
+    """
+    Walk-forward analysis over a SweepPool: folds run in parallel, each one in a
+    single worker that slices the shared frame (no per-fold copies).
+
+    Returns (folds, equity, oos):
+    - folds : one row per fold (chosen params, train score, test stats)
+    - equity: stitched out-of-sample equity curve
+    - oos   : summary metrics of that curve
+    """
+    folds = make_folds(len(pool.df), train_bars, test_bars, anchored=anchored)
+    print(f"Walk-forward: {len(folds)} {'anchored' if anchored else 'rolling'} folds "
+          f"({train_bars} train / {test_bars} test bars) x {len(param_sets)} combinations")
+
+    outcomes = pool.map(_run_fold, [(fold, param_sets, metric) for fold in folds])
+
+    rows = [row for row, _, _ in outcomes]
+    curves = [curve for _, curve, _ in outcomes if curve is not None]
+    pnl = [p for _, _, fold_pnl in outcomes for p in fold_pnl]
+    if not curves:
+        return pd.DataFrame(rows), pd.Series(dtype=float), {}
+
+    equity = stitch_equity(curves, initial_cash)
+    oos = summary_metrics(equity.values, equity.index, pnl)
+    return pd.DataFrame(rows), equity, oos
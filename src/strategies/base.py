@@ -1,16 +1,132 @@
 # src/strategies/base.py
+import numpy as np
+import pandas as pd
 from backtesting import Strategy
+from indicators import cache as indicator_cache
 
 class BaseStrategy(Strategy):
     """
     Parent class for all strategies.
     Handles global checks or logging.
     """
+
+    # Optimizer search space: {class_attribute: IntRange / FloatRange / Choice}
+    # (see optimization.param_space). Empty = strategy can't be optimized.
+    param_space = {}
+
+    # Strategies whose decisions are a pure function of their indicators can also
+    # define `signals(cls, data, **params)` returning core.vector_backtest.Signals;
+    # sweeps then run them on the vectorized fast path instead of next().
+
+    @classmethod
+    def param_constraint(cls, params):
+        """Override to reject invalid combinations (e.g. fast window >= slow window)."""
+        return True
+
+    @classmethod
+    def max_lookback(cls, params):
+        """
+        Override to declare warmup_bars() for `params` (bars before every
+        indicator has a value), so runs fetch exactly that much history before
+        START_DATE. None (default): measured on synthetic bars (core.warmup).
+        """
+        return None
     
+    @classmethod
+    def resolve_params(cls, params):
+        """
+        Class defaults overridden by `params`, readable as attributes (p.n1, ...),
+        for classmethods such as signals(). Unknown names raise like Backtest.run().
+        """
+        for name in params:
+            if not hasattr(cls, name):
+                raise AttributeError(f"Strategy '{cls.__name__}' is missing parameter '{name}'.")
+        return _Params(cls, params)
+
+    @classmethod
+    def sweep_values(cls, params, *names):
+        """
+        Sorted values of the `names` parameters to compute a batched indicator for
+        (e.g. sma_batch over n1 and n2): this run's values plus, while the
+        indicator cache is on, every value param_space can give them, so one
+        cached batch serves all runs of a sweep. `params` as from resolve_params().
+        """
+        values = {getattr(params, name) for name in names}
+        if indicator_cache.active() is not None:
+            for name in names:
+                if name in cls.param_space:
+                    values.update(cls.param_space[name].values())
+        return tuple(sorted(values))
+
     def init(self):
         # You can initialize shared indicators here if needed
         pass
 
+    def I(self, func, *args, **kwargs):
+        """
+        Strategy.I() backed by the indicator cache (indicators.cache): a named
+        module-level `func` called with the same data and arguments as in an
+        earlier run is not recomputed. Lambdas are always computed.
+        """
+        cache = indicator_cache.active()
+        if cache is not None and indicator_cache.is_cacheable_function(func):
+            func = cache.wrap(func)
+        return super().I(func, *args, **kwargs)
+
+    def I_multi(self, func, *args, outputs, plot=True, overlay=None, scatter=False, **kwargs):
+        """
+        One call of a multi-output indicator, each output registered as its own
+        self.I() series (own name, colour, plot pane):
+
+            self.upper, self.middle, self.lower = self.I_multi(
+                bollinger_bands, close, 20, 2,
+                outputs=[dict(name="UpperBB", color="purple"), "MidBB", "LowerBB"],
+                overlay=True)
+
+        `func` returns a tuple/list of arrays (or a DataFrame, one output per
+        column); `outputs` has one entry per output, a name or a dict of I()
+        options overriding the shared plot/overlay/scatter. A 2-D output becomes
+        one multi-line indicator (give it a list of names).
+        """
+        values = indicator_cache.cached(func, *args, **kwargs)
+        if isinstance(values, pd.DataFrame):
+            values = [values[col] for col in values.columns]
+        if len(values) != len(outputs):
+            raise ValueError(f"{func.__name__} returned {len(values)} outputs, "
+                             f"but {len(outputs)} were declared.")
+
+        series = []
+        for i, (value, spec) in enumerate(zip(values, outputs)):
+            opts = dict(name=f"{func.__name__}[{i}]", plot=plot, overlay=overlay, scatter=scatter)
+            opts.update(spec if isinstance(spec, dict) else dict(name=spec))
+            # Already computed: register the values as they are (no second cache lookup)
+            series.append(super().I(_output, value, **opts))
+        return tuple(series)
+
+    def warmup_bars(self):
+        """
+        Bars before every (non-scatter) indicator has a value. backtesting.py only
+        starts calling next() after these, so this is the real lookback of a run.
+        """
+        return max((int(np.isnan(ind.astype(float)).argmin(axis=-1).max())
+                    for ind in self._indicators if not ind._opts['scatter']), default=0)
+
     def log(self, message):
         """Helper to print with timestamp"""
         print(f"[{self.data.index[-1]}] {message}")
+
+def _output(value):
+    """Identity: lets I_multi() register an already computed output with Strategy.I()."""
+    return value
+
+class _Params:
+    """Attribute view of a strategy class's parameters with some overridden."""
+
+    def __init__(self, strategy_class, overrides):
+        self._strategy_class = strategy_class
+        self._overrides = overrides
+
+    def __getattr__(self, name):
+        if name in self._overrides:
+            return self._overrides[name]
+        return getattr(self._strategy_class, name)
@@ -1,6 +1,9 @@
 import pandas as pd
 from strategies.base import BaseStrategy
-from indicators.technical import rsi, bollinger_bands # Assuming you moved your math here
+from optimization.param_space import IntRange, FloatRange
+from indicators.technical import rsi, bollinger_bands_batch # Assuming you moved your math here
+from core.vector_backtest import Signals
+from indicators.cache import cached
 
 class BollingerReversion(BaseStrategy):
     """
@@ -44,6 +47,35 @@ class BollingerReversion(BaseStrategy):
     bb_std = 2.0
     oversold = 30
     overbought = 80
+
+    param_space = {
+        "rsi_period": IntRange(7, 21, 7),
+        "bb_period": IntRange(20, 60, 10),
+        "bb_std": FloatRange(1.5, 3.0, 0.5),
+        "oversold": IntRange(20, 40, 5),
+        "overbought": IntRange(60, 85, 5),
+    }
+
+    @classmethod
+    def max_lookback(cls, params):
+        # RSI has a value from the second bar
+        return max(cls.resolve_params(params).bb_period - 1, 1)
+
+    @classmethod
+    def signals(cls, data, **params):
+        p = cls.resolve_params(params)
+        close = pd.Series(data['Close'].to_numpy())
+        price = close.values
+
+        rsi_values = cached(rsi, close, p.rsi_period).values
+        # Bands for every bb_period of the sweep in one batch (shared via the cache)
+        windows = cls.sweep_values(p, "bb_period")
+        row = windows.index(p.bb_period)
+        upper, middle, lower = (band[row] for band in cached(bollinger_bands_batch, price, windows, p.bb_std))
+
+        return Signals(entries=(price < lower) & (rsi_values < p.oversold),
+                       exits=(rsi_values > p.overbought) | (price > (middle + upper) / 2),
+                       indicators=[rsi_values, upper, middle, lower])
     
     def init(self):
         super().init()
@@ -57,15 +89,16 @@ class BollingerReversion(BaseStrategy):
             name=f"RSI({self.rsi_period})"
         )
 
-        # Bollinger Bands
-        self.upper = self.I(lambda: bollinger_bands(pd.Series(self.data.Close), self.bb_period, self.bb_std)[0], 
-                            name="UpperBB", overlay=True, color="purple")
-        
-        self.middle = self.I(lambda: bollinger_bands(pd.Series(self.data.Close), self.bb_period, self.bb_std)[1], 
-                             name="MidBB", overlay=True, color="pink")
-        
-        self.lower = self.I(lambda: bollinger_bands(pd.Series(self.data.Close), self.bb_period, self.bb_std)[2], 
-                            name="LowerBB", overlay=True, color="yellow")
+        # Bollinger Bands (one computation, three plotted bands)
+        self.upper, self.middle, self.lower = self.I_multi(
+            bollinger_bands_batch,
+            self.data.Close,
+            self.bb_period,
+            self.bb_std,
+            outputs=[dict(name="UpperBB", color="purple"),
+                     dict(name="MidBB", color="pink"),
+                     dict(name="LowerBB", color="yellow")],
+            overlay=True)
 
     def next(self):
         price = self.data.Close[-1]
@@ -1,46 +1,9 @@
-import numpy as np
-import pandas as pd
 from strategies.base import BaseStrategy
+from optimization.param_space import IntRange, FloatRange
 from backtesting.lib import crossover
-
-def rolling_lrc_metrics(close, window=10, num_std=2, days_per_year=252):
-    y = pd.Series(close)
-    x = pd.Series(np.arange(len(y)))
-
-    rolling_y = y.rolling(window=window)
-
-    cov_xy = y.rolling(window=window).cov(x)
-    var_x = x.rolling(window=window).var()
-    slope = cov_xy / var_x
-
-    mean_y = rolling_y.mean()
-    mean_x = x.rolling(window=window).mean()
-    intercept = mean_y - (slope * mean_x)
-
-    center_line = (slope * x) + intercept 
-
-    corr_xy = rolling_y.corr(x)
-    r_squared = corr_xy ** 2
-    std_y = rolling_y.std()
-
-    n = window
-    see = std_y * np.sqrt(1 - r_squared) * np.sqrt((n-1) / (n-2))
-
-    upper = center_line + (num_std * see)
-    lower = center_line - (num_std * see)
-
-    slope_pct = (slope / center_line) * days_per_year * 100 
-
-    width_pct = (upper - lower) / center_line
-
-    width_rank = width_pct.rolling(200).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1], raw=True)
-
-    return (center_line.values,
-            upper.values,
-            lower.values,
-            slope_pct.values,
-            r_squared.values,
-            width_rank.values)
+from core.vector_backtest import Signals
+from indicators.cache import cached
+from indicators.regression import rolling_lrc
 
 class LrcReversion(BaseStrategy):
     """
@@ -93,44 +56,63 @@ class LrcReversion(BaseStrategy):
     r2_threshold = 0.4
     squeeze_percentile = 0.2
     stop_loss_pct = 0.05
+
+    param_space = {
+        "lrc_window": IntRange(20, 100, 10),
+        "n_std": FloatRange(1.5, 3.0, 0.5),
+        "slope_threshold": IntRange(5, 25, 5),
+        "r2_threshold": FloatRange(0.2, 0.6, 0.1),
+        "squeeze_percentile": FloatRange(0.1, 0.3, 0.1),
+        "stop_loss_pct": FloatRange(0.02, 0.08, 0.02),
+    }
+
+    @classmethod
+    def max_lookback(cls, params):
+        # width_rank ranks the last 200 channel widths (rolling_lrc's rank_window)
+        return cls.resolve_params(params).lrc_window - 1 + 200 - 1
+
+    @classmethod
+    def signals(cls, data, **params):
+        p = cls.resolve_params(params)
+        price = data['Close'].to_numpy()
+
+        metrics = cached(rolling_lrc,
+                         close=price,
+                         window=p.lrc_window,
+                         num_std=p.n_std,
+                         days_per_year=252)
+        center, upper, lower, slope_pct, r2, width_rank = metrics
+
+        # next() returns early during squeezes, which blocks exits as well
+        active = ~(width_rank < p.squeeze_percentile)
+        knife = (slope_pct < -p.slope_threshold) & (r2 > p.r2_threshold)
+
+        return Signals(entries=active & (price < lower) & ~knife,
+                       exits=active & (price >= (center + upper) / 2),
+                       sl=price * (1 - p.stop_loss_pct),
+                       indicators=list(metrics))
     
     def init(self):
         super().init()
 
-        metrics = rolling_lrc_metrics(close=self.data.Close, 
-                                      window=self.lrc_window,
-                                      num_std=self.n_std,
-                                      days_per_year=252)
-        
-        self.center = self.I(lambda: metrics[0], 
-                             name="LRC_Center",
-                             overlay=True,
-                             color="pink")
-        
-        self.upper = self.I(lambda: metrics[1],
-                            name="LRC_Upper",
-                            overlay=True,
-                            color="purple")
-        
-        self.lower = self.I(lambda: metrics[2],
-                            name="LRC_Lower",
-                            overlay=True,
-                            color="yellow")
-        
-        self.slope_pct = self.I(lambda: metrics[3],
-                                name="Slope%",
-                                overlay=False,
-                                color="orange")
-        
-        self.r2= self.I(lambda: metrics[4],
-                        name="R2",
-                        overlay=False,
-                        color="blue")
-        
-        self.width_rank = self.I(lambda: metrics[5],
-                                 name="Width_Rank",
-                                 overlay=False,
-                                 color="purple")
+        # Only lrc_window / n_std change the channel: sweeps over the other
+        # parameters reuse it from the indicator cache
+        (self.center,
+         self.upper,
+         self.lower,
+         self.slope_pct,
+         self.r2,
+         self.width_rank) = self.I_multi(rolling_lrc,
+                                         close=self.data.Close,
+                                         window=self.lrc_window,
+                                         num_std=self.n_std,
+                                         days_per_year=252,
+                                         outputs=[dict(name="LRC_Center", overlay=True, color="pink"),
+                                                  dict(name="LRC_Upper", overlay=True, color="purple"),
+                                                  dict(name="LRC_Lower", overlay=True, color="yellow"),
+                                                  dict(name="Slope%", overlay=False, color="orange"),
+                                                  dict(name="R2", overlay=False, color="blue"),
+                                                  dict(name="Width_Rank", overlay=False, color="purple")])
         
     def next(self):
         price = self.data.Close[-1]
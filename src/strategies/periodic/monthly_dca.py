@@ -1,6 +1,7 @@
 import math
 import pandas as pd
 from strategies.base import BaseStrategy
+from core.market_calendar import session_masks
 
 class MonthlyDCA(BaseStrategy):
     """
@@ -21,7 +22,8 @@ class MonthlyDCA(BaseStrategy):
     LOGIC
     -----
     1. ENTRY (Monthly): 
-       - Detects the first trading day of a new month (Current Month != Previous Month).
+       - Detects the first bar of a new month (first regular-session bar of the
+         month, precomputed from core.market_calendar for the whole index).
        - Calculates size = floor(monthly_contribution / Current Price).
        - Buys that quantity if sufficient cash is available in the account.
        
@@ -42,20 +44,22 @@ class MonthlyDCA(BaseStrategy):
             self.force_close_date = all_dates[-2]
         else:
             self.force_close_date = None # Data too short to backtest
+
+        # One lookup per bar in next() instead of comparing dates
+        self.month_starts = session_masks(all_dates).first_of_month
     
     def next(self):
         if len(self.data) < 2:
             return 
         
         current_date = pd.to_datetime(self.data.index[-1])
-        previous_date = pd.to_datetime(self.data.index[-2])
 
         if self.force_close_date and current_date == self.force_close_date:
             print(f"Force closing all positions on {current_date}")
             self.position.close()
             return # Don't buy on the same day we are trying to exit
 
-        if current_date.month != previous_date.month:
+        if self.month_starts[len(self.data) - 1]:
             self.buy_signal()
         
     def buy_signal(self):
@@ -2,17 +2,19 @@ import pandas as pd
 import pandas_ta as ta 
 import numpy as np
 from strategies.base import BaseStrategy
+from optimization.param_space import IntRange
 from backtesting.lib import crossover
+from core.vector_backtest import Signals, crossovers
+from indicators.cache import cached
 
-def get_macd(close, fast, slow, signal, hist=False):
+def get_macd(close, fast, slow, signal):
     macd_df = ta.macd(close=close,
                     fast=fast,
                     slow=slow,
                     signal=signal,
                     )
-    if not hist:
-        return macd_df.iloc[:,0].values, macd_df.iloc[:,2].values # MACD, MACD_signal
-    return macd_df.iloc[:,1].values # MACD_hist
+    lines = np.vstack([macd_df.iloc[:,0].values, macd_df.iloc[:,2].values]) # MACD, MACD_signal
+    return lines, macd_df.iloc[:,1].values # MACD_hist
 
 class MacdCross(BaseStrategy):
     """
@@ -49,28 +51,38 @@ class MacdCross(BaseStrategy):
     macd_slow = 26
     macd_signal = 9
 
+    param_space = {
+        "macd_fast": IntRange(6, 16, 2),
+        "macd_slow": IntRange(20, 40, 4),
+        "macd_signal": IntRange(5, 13, 2),
+    }
+
+    @classmethod
+    def param_constraint(cls, params):
+        return params["macd_fast"] < params["macd_slow"]
+
+    @classmethod
+    def signals(cls, data, **params):
+        p = cls.resolve_params(params)
+        close = pd.Series(data['Close'].to_numpy())
+
+        (macd, signal), hist = cached(get_macd, close, p.macd_fast, p.macd_slow, p.macd_signal)
+
+        return Signals(entries=crossovers(macd, signal),
+                       exits=crossovers(signal, macd),
+                       indicators=[macd, signal, hist])
+
     def init(self):
         super().init()
 
-        # Define Indicators
-        
-        self.macd_bundle = self.I(get_macd,
-                                  pd.Series(self.data.Close),
-                                  self.macd_fast,
-                                  self.macd_slow,
-                                  self.macd_signal,
-                                  False,
-                                  name=["MACD","MACD_signal"],
-                                  overlay=False)
-        
-        self.macd_hist = self.I(get_macd,
-                                pd.Series(self.data.Close),
-                                self.macd_fast,
-                                self.macd_slow,
-                                self.macd_signal,
-                                True,
-                                name="MACD_hist",
-                                overlay=False)
+        # Define Indicators (a single MACD computation for both panes)
+        self.macd_bundle, self.macd_hist = self.I_multi(get_macd,
+                                                        pd.Series(self.data.Close),
+                                                        self.macd_fast,
+                                                        self.macd_slow,
+                                                        self.macd_signal,
+                                                        outputs=[["MACD", "MACD_signal"], "MACD_hist"],
+                                                        overlay=False)
     
     def next(self):
         current_macd = self.macd_bundle[0]
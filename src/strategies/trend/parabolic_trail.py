@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 import pandas_ta as ta
 from strategies.base import BaseStrategy 
+from optimization.param_space import IntRange, FloatRange
 from backtesting.lib import crossover
 
 def get_psar_ta(high, low, close, af0, af, max_af):
@@ -15,17 +16,11 @@ def get_psar_ta(high, low, close, af0, af, max_af):
 
     return combined.values
 
-def get_sma_ta(close, window):
-    c = pd.Series(close)
-    df = ta.sma(close=c, length=window)
-
-    return df.values
-
-def get_bbands_lower_ta(close, length, lower_std=2, upper_std=2):
+def get_bbands_ta(close, length, lower_std=2, upper_std=2):
     c = pd.Series(close)
     df = ta.bbands(close=c, length=length, lower_std=lower_std, upper_std=upper_std)
 
-    return df.iloc[:,0].values
+    return df.iloc[:,1].values, df.iloc[:,0].values # Middle band (the SMA), lower band
 
 class ParabolicTrail(BaseStrategy):
     """
@@ -77,6 +72,13 @@ class ParabolicTrail(BaseStrategy):
     sl_sma_window = 20
     sl_std_lower = 1
 
+    param_space = {
+        "af0": FloatRange(0.01, 0.04, 0.01),
+        "af": FloatRange(0.01, 0.04, 0.01),
+        "max_af": FloatRange(0.1, 0.3, 0.05),
+        "sl_sma_window": IntRange(10, 40, 10),
+    }
+
     def init(self):
         super().init()
 
@@ -96,21 +98,13 @@ class ParabolicTrail(BaseStrategy):
                            name="SAR",
                            )
         
-        # SMA
-        self.sma = self.I(get_sma_ta, 
-                          self.data.Close,
-                          self.sl_sma_window,
-                          overlay=True,
-                          name="SMA"
-                          )
-        
-        self.bb_lower = self.I(get_bbands_lower_ta,
-                                 self.data.Close,
-                                 self.sl_sma_window,
-                                 self.sl_std_lower,
-                                 overlay=True,
-                                 name="BB_Lower"
-                                 )
+        # SMA and lower band: the Bollinger middle band is the SMA of the same window
+        self.sma, self.bb_lower = self.I_multi(get_bbands_ta,
+                                               self.data.Close,
+                                               self.sl_sma_window,
+                                               self.sl_std_lower,
+                                               outputs=["SMA", "BB_Lower"],
+                                               overlay=True)
     
     def next(self):
         current_price = self.data.Close[-1]
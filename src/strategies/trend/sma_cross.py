@@ -2,7 +2,10 @@ import pandas as pd
 import numpy as np
 from strategies.base import BaseStrategy
 from backtesting.lib import crossover
-from backtesting.test import SMA
+from optimization.param_space import IntRange
+from core.vector_backtest import Signals, crossovers
+from indicators.cache import cached
+from indicators.technical import sma, sma_batch
 
 class SmaCross(BaseStrategy):
     """
@@ -34,10 +37,38 @@ class SmaCross(BaseStrategy):
     n1 = 10
     n2 = 20
 
+    param_space = {
+        "n1": IntRange(5, 30, 5),
+        "n2": IntRange(10, 100, 10),
+    }
+
+    @classmethod
+    def param_constraint(cls, params):
+        return params["n1"] < params["n2"]
+
+    @classmethod
+    def max_lookback(cls, params):
+        p = cls.resolve_params(params)
+        return max(p.n1, p.n2) - 1
+
+    @classmethod
+    def signals(cls, data, **params):
+        p = cls.resolve_params(params)
+        close = data['Close'].to_numpy()
+
+        # Every window of the sweep in one batch (shared by all runs via the cache)
+        windows = cls.sweep_values(p, "n1", "n2")
+        smas = cached(sma_batch, close, windows)
+        sma1, sma2 = smas[windows.index(p.n1)], smas[windows.index(p.n2)]
+
+        return Signals(entries=crossovers(sma1, sma2),
+                       exits=crossovers(sma2, sma1),
+                       indicators=[sma1, sma2])
+
     def init(self):
         # Calculate moving averages
-        self.sma1 = self.I(SMA, self.data.Close, self.n1)
-        self.sma2 = self.I(SMA, self.data.Close, self.n2)
+        self.sma1 = self.I(sma, self.data.Close, self.n1, name=f"SMA(C,{self.n1})")
+        self.sma2 = self.I(sma, self.data.Close, self.n2, name=f"SMA(C,{self.n2})")
 
     def next(self):
         # Buy if SMA1 crosses above SMA2
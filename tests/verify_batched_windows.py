@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from indicators.technical import sma, sma_batch, bollinger_bands, bollinger_bands_batch, ema_batch
+
+# Batched SMA / Bollinger / EMA against one pandas call per window: same NaN
+# positions, values within floating-point tolerance, and a row that doesn't
+# depend on which other windows were requested (exact).
+
+WINDOWS = [2, 5, 10, 20, 50, 100, 200, 4097, 9000]
+
+
+def synthetic_close(n_bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, n_bars)))
+    close[n_bars // 3: n_bars // 3 + 4] = np.nan
+    return close
+
+
+def max_rel_diff(a, b):
+    valid = ~np.isnan(a)
+    return np.abs(a[valid] - b[valid]).max() / np.abs(a[valid]).max() if valid.any() else 0.0
+
+
+def check(label, expected, actual, tol):
+    same_nans = np.array_equal(np.isnan(expected), np.isnan(actual))
+    diff = max_rel_diff(expected, actual) if same_nans else np.inf
+    ok = same_nans and diff <= tol
+    print(f"   {label:<28} max rel diff {diff:.2e} {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def verify_batched_windows(n_bars=50_000):
+    close = synthetic_close(n_bars, 0)
+    series = pd.Series(close)
+    ok = True
+
+    smas = sma_batch(close, WINDOWS)
+    upper, middle, lower = bollinger_bands_batch(close, WINDOWS, 2.0)
+    for i, w in enumerate(WINDOWS):
+        ok &= check(f"sma_batch w={w}", series.rolling(w).mean().values, smas[i], 1e-12)
+        ref_upper, _, ref_lower = bollinger_bands(series, w, 2.0)
+        ok &= check(f"bollinger upper w={w}", ref_upper.values, upper[i], 1e-9)
+        ok &= check(f"bollinger lower w={w}", ref_lower.values, lower[i], 1e-9)
+
+        # A window's row is the same alone or within any batch
+        ok &= np.array_equal(smas[i], sma_batch(close, w), equal_nan=True)
+        ok &= np.array_equal(lower[i], bollinger_bands_batch(close, [w, 7], 2.0)[2][0], equal_nan=True)
+
+    no_gaps = close.copy()
+    no_gaps[:10] = np.nan                                   # leading NaNs only
+    no_gaps[10:] = np.where(np.isnan(no_gaps[10:]), 100.0, no_gaps[10:])
+    spans = [1, 2, 9, 12, 26, 200]
+    emas = ema_batch(no_gaps, spans)
+    for i, span in enumerate(spans):
+        ok &= check(f"ema_batch span={span}", pd.Series(no_gaps).ewm(span=span, adjust=False).mean().values,
+                    emas[i], 1e-12)
+
+    # sma() is the single-window case (it used to ignore `period`)
+    frame = pd.DataFrame({"Close": close})
+    ok &= np.array_equal(sma(frame, 30).values, sma_batch(close, 30), equal_nan=True)
+    ok &= np.array_equal(sma(series, 30).values, sma_batch(close, 30), equal_nan=True)
+    return ok
+
+
+def benchmark(n_bars=500_000):
+    close = synthetic_close(n_bars, 1)
+    series = pd.Series(close)
+    windows = list(range(10, 210, 10))
+
+    start = time.perf_counter()
+    bollinger_bands_batch(close, windows, 2.0)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for w in windows:
+        bollinger_bands(series, w, 2.0)
+    per_window = time.perf_counter() - start
+    print(f"\nBollinger, {n_bars:,} bars x {len(windows)} windows: batch {batch:.2f}s | "
+          f"one pandas pass per window {per_window:.2f}s")
+
+
+if __name__ == "__main__":
+    ok = verify_batched_windows()
+    benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,133 @@
+import sys
+import os
+import tempfile
+import tracemalloc
+import warnings
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+sys.path.append(TESTS_DIR)
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+import strategies
+from core.vector_backtest import VectorBacktest
+from core.chunked_backtest import ChunkedBacktest
+from optimization import build_grid
+from verify_fast_path import synthetic_ohlc
+
+# Out-of-core runs against the in-memory fast path: for any chunk size the
+# spilled equity curve and trades, and the summary metrics, must be identical
+# (exact float equality). Then peak memory for a 4x longer history.
+
+METRICS = ['Start', 'End', 'Return [%]', 'Sharpe Ratio', 'Max. Drawdown [%]', 'Win Rate [%]',
+           '# Trades', 'Equity Final [$]', 'Equity Peak [$]']
+TRADE_COLUMNS = ['Size', 'EntryBar', 'ExitBar', 'EntryPrice', 'ExitPrice', 'PnL']
+
+# Overlap for strategies with recursive indicators (RSI, MACD); windowed ones need none
+WARMUP = {strategies.BollingerReversion: 500, strategies.MacdCross: 500}
+CHUNK_SIZES = [13, 250, 1000]
+
+
+def same(a, b):
+    return a == b or (pd.isna(a) and pd.isna(b))
+
+
+def compare(full, chunked, equity_path, trades_path):
+    diffs = [m for m in METRICS if not same(full[m], chunked[m])]
+
+    equity = pd.read_csv(equity_path, float_precision='round_trip')['Equity'].to_numpy()
+    if not np.array_equal(equity, full._equity_curve['Equity'].to_numpy()):
+        diffs.append("equity curve")
+
+    trades = (pd.read_csv(trades_path, float_precision='round_trip') if os.path.exists(trades_path)
+              else pd.DataFrame(columns=TRADE_COLUMNS + ['EntryTime', 'ExitTime']))
+    t1 = full._trades[TRADE_COLUMNS].to_numpy(dtype=float)
+    t2 = trades[TRADE_COLUMNS].to_numpy(dtype=float)
+    if t1.shape != t2.shape or not np.array_equal(t1, t2):
+        diffs.append(f"trades ({len(t1)} vs {len(t2)})")
+    elif len(trades) and not (pd.to_datetime(trades['EntryTime']).tolist() == full._trades['EntryTime'].tolist()
+                              and pd.to_datetime(trades['ExitTime']).tolist() == full._trades['ExitTime'].tolist()):
+        diffs.append("trade times")
+    return diffs
+
+
+def verify_chunked(max_tries=6):
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        equity_path, trades_path = os.path.join(tmp, "equity.csv"), os.path.join(tmp, "trades.csv")
+
+        for strategy in [strategies.SmaCross, strategies.BollingerReversion,
+                         strategies.LrcReversion, strategies.MacdCross]:
+            runs = mismatches = 0
+            for seed, (n_bars, cash, commission) in enumerate([(3000, 50_000, (0.35, 0.001)),
+                                                               (1500, 300, (2.0, 0.002))]):
+                df = synthetic_ohlc(n_bars, seed)
+                kwargs = dict(cash=cash, commission=commission, finalize_trades=True)
+
+                for params in build_grid(strategy, max_tries=max_tries):
+                    full = VectorBacktest(df, strategy, **kwargs).run(**params)
+                    for size in CHUNK_SIZES:
+                        chunks = (df.iloc[i:i + size] for i in range(0, n_bars, size))
+                        chunked = ChunkedBacktest(chunks, strategy, warmup_bars=WARMUP.get(strategy, 0),
+                                                  equity_path=equity_path, trades_path=trades_path,
+                                                  **kwargs).run(**params)
+                        diffs = compare(full, chunked, equity_path, trades_path)
+                        runs += 1
+                        if diffs:
+                            mismatches += 1
+                            print(f"   {strategy.__name__} {params} chunk={size}: {', '.join(diffs)}")
+
+            print(f"{strategy.__name__:<20} {runs - mismatches}/{runs} identical")
+            failures += mismatches
+    return failures == 0
+
+
+def lazy_chunks(n_bars, size):
+    """Consecutive slices of one long random walk, generated on demand."""
+    rng = np.random.default_rng(0)
+    last, start = 100.0, pd.Timestamp("2020-01-01")
+    for i in range(0, n_bars, size):
+        m = min(size, n_bars - i)
+        close = last * np.exp(np.cumsum(rng.normal(0, 0.001, m)))
+        open_ = np.r_[last, close[:-1]]
+        last = close[-1]
+        yield pd.DataFrame({"Open": open_,
+                            "High": np.maximum(open_, close) * 1.001,
+                            "Low": np.minimum(open_, close) * 0.999,
+                            "Close": close,
+                            "Volume": 1000.0},
+                           index=pd.date_range(start + pd.Timedelta(minutes=i), periods=m, freq="min"))
+
+
+def peak_memory(n_bars, size=50_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        ChunkedBacktest(lazy_chunks(n_bars, size), strategies.SmaCross, cash=50_000,
+                        commission=(0.35, 0.001), finalize_trades=True,
+                        equity_path=os.path.join(tmp, "equity.csv"),
+                        trades_path=os.path.join(tmp, "trades.csv")).run(n1=10, n2=50)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak
+
+
+def verify_bounded_memory(n_bars=500_000):
+    """Peak traced memory may not grow with the history length (a 4x longer one within 25%)."""
+    short, long = peak_memory(n_bars), peak_memory(4 * n_bars)
+    ok = long <= 1.25 * short
+    print(f"\nPeak memory: {n_bars:,} bars {short / 2**20:.1f} MB | "
+          f"{4 * n_bars:,} bars {long / 2**20:.1f} MB {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    ok = verify_chunked()
+    ok &= verify_bounded_memory()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,139 @@
+import sys
+import os
+import time
+import tempfile
+from datetime import datetime
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import pandas as pd
+from alpaca.data.timeframe import TimeFrame
+
+from core.coverage import Coverage, timestamp_checksum
+from core.csv_backup import CsvBackup
+from core.data_manager import DataManager
+from core.mmap_store import MmapStore
+from core.parquet_store import ParquetStore
+from verify_downloader import FakeClient, reference, ny
+
+# The coverage manifest: interval bookkeeping (gaps, merges, counts, round
+# trip), then DataManager against the local stand-in client: a repeated request
+# downloads nothing, a chunk that failed is the only range fetched later, and
+# verify_coverage() catches stored bars gone missing. Last, the cost of
+# the "anything missing?" decision from the manifest vs. reading the data.
+
+
+def ts(text):
+    return pd.Timestamp(text, tz="America/New_York")
+
+
+def verify_intervals():
+    bars = reference("AAA", ny("2024-01-01"), ny("2024-03-31"))
+    with tempfile.TemporaryDirectory() as tmp:
+        coverage = Coverage(os.path.join(tmp, "AAA", "1Min", "coverage.json"))
+        coverage.add(ts("2024-01-01"), ts("2024-01-31"), bars)
+        coverage.add(ts("2024-03-01"), ts("2024-03-31"), bars)
+        case = coverage.missing(ts("2023-12-01"), ts("2024-04-15")) == [
+            (ts("2023-12-01"), ts("2024-01-01")), (ts("2024-01-31"), ts("2024-03-01")), (ts("2024-03-31"), ts("2024-04-15"))]
+        case &= coverage.missing(ts("2024-01-05"), ts("2024-01-20")) == []
+
+        # Filling the hole merges all three; bars on shared boundaries count once
+        coverage.add(ts("2024-01-31"), ts("2024-03-01"), bars)
+        whole = bars.loc[ts("2024-01-01"):ts("2024-03-31")]
+        case &= (len(coverage.intervals) == 1 and coverage.rows == len(whole)
+                 and coverage.intervals[0]["checksum"] == timestamp_checksum(whole.index))
+        coverage.save()
+        case &= Coverage.load(coverage.path).intervals == coverage.intervals
+    print(f"   gaps, merge, counts and round trip {'ok' if case else 'FAIL'}")
+    return case
+
+
+def data_manager(tmp, client):
+    dm = DataManager("key", "secret", frame_cache_bytes=0, requests_per_minute=None)
+    dm.store = ParquetStore(os.path.join(tmp, "parquet"))
+    dm.csv = CsvBackup(os.path.join(tmp, "csv"), policy="off")
+    dm.mapped = MmapStore(os.path.join(tmp, "mmap"))
+    dm.downloader.client = client
+    dm.downloader.backoff = 0.01
+    return dm
+
+
+def verify_data_manager():
+    ok = True
+    start, end = datetime(2024, 1, 1), datetime(2024, 4, 15, 16)
+    expected = reference("AAA", ny("2024-01-01"), ny("2024-04-15 16:00"))
+    with tempfile.TemporaryDirectory() as tmp:
+        # The February chunk fails: everything else is stored and marked as covered
+        broken = (ny("2024-02-10"), ny("2024-02-11"))
+        client = FakeClient(broken=broken)
+        dm = data_manager(tmp, client)
+        dm.get_data("AAA", start, end)
+        coverage = dm._coverage("AAA", "1Min")
+        hole = coverage.missing(ts("2024-01-01"), ts("2024-04-15 16:00"))
+        case = len(hole) == 1 and hole[0][0] <= broken[0] and hole[0][1] >= broken[1]
+
+        # Next run: only the hole is requested
+        client.broken, client.calls = None, []
+        df = dm.get_data("AAA", start, end)
+        case &= bool(client.calls) and all(call[2] >= hole[0][0] and call[3] <= hole[0][1] for call in client.calls)
+        case &= df.equals(expected)
+        print(f"   failed chunk left as an interior gap {hole[0][0]:%Y-%m-%d} -> {hole[0][1]:%Y-%m-%d}, "
+              f"refetched alone in {len(client.calls)} requests {'ok' if case else 'FAIL'}")
+        ok &= case
+
+        client.calls = []
+        df = dm.get_data("AAA", datetime(2024, 2, 1), datetime(2024, 3, 1))
+        case = not client.calls and df.equals(expected.loc[ts("2024-02-01"):ts("2024-03-01")])
+        print(f"   covered range: no request {'ok' if case else 'FAIL'}")
+        ok &= case
+
+        # A part file lost behind the manifest's back: verify finds it, repair refetches it
+        dm.store.wait()
+        folder = os.path.join(tmp, "parquet", "AAA", "1Min", "year=2024")
+        os.remove(os.path.join(folder, sorted(os.listdir(folder))[-1]))
+        bad = dm.verify_coverage("AAA", TimeFrame.Minute, repair=True)
+        client.calls = []
+        df = dm.get_data("AAA", start, end)
+        case = len(bad) == 1 and len(client.calls) > 0 and not dm.verify_coverage("AAA", TimeFrame.Minute)
+        case &= df.equals(expected)
+        print(f"   verify_coverage found {len(bad)} changed interval, repaired in {len(client.calls)} requests "
+              f"{'ok' if case else 'FAIL'}")
+        ok &= case
+        dm.close()
+    return ok
+
+
+def benchmark(n_bars=1_000_000):
+    days = pd.bdate_range("2015-01-01", periods=n_bars // 390 + 1, tz="America/New_York")
+    index = (days.repeat(390) + pd.to_timedelta(list(range(390)) * len(days), unit="min")
+             + pd.Timedelta(hours=9, minutes=30))[:n_bars]
+    df = pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1.0},
+                      index=pd.DatetimeIndex(index, name="timestamp"))
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "TEST_1Min.parquet")
+        df.to_parquet(legacy)
+        coverage = Coverage(os.path.join(tmp, "coverage.json"))
+        coverage.add(df.index[0], df.index[-1], df)
+        coverage.save()
+
+        t0 = time.perf_counter()
+        stored = pd.read_parquet(legacy)
+        old = stored.index[0] <= ts("2016-01-01") and stored.index[-1] >= ts("2019-12-31")
+        t1 = time.perf_counter()
+        new = not Coverage.load(coverage.path).missing(ts("2016-01-01"), ts("2019-12-31"))
+        t2 = time.perf_counter()
+        print(f"\n'Is 2016-2019 stored?' over {n_bars:,} bars: whole-file read {(t1 - t0) * 1000:.1f} ms | "
+              f"manifest {(t2 - t1) * 1000:.2f} ms")
+        return old and new
+
+
+if __name__ == "__main__":
+    ok = verify_intervals()
+    ok &= verify_data_manager()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,164 @@
+import sys
+import os
+import io
+import itertools
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from optimization import SweepPool, cpcv, group_layout, split_masks
+from optimization.cpcv import HEAD, TAIL
+from optimization.sweep import _get_backtest
+from strategies import SmaCross
+from verify_fast_path import synthetic_ohlc
+
+# Combinatorial purged cross-validation: group bounds and their embargo /
+# purge segments, train bars of every split kept `purge` bars before and
+# `embargo` bars after each test group (never inside one), PBO on return
+# series built to give a known answer (a set that wins everywhere: 0, sets
+# that win only in-sample: 1), and the per-split Sharpe of a real sweep
+# against the same number computed straight from its equity curve.
+
+
+class ReturnsPool:
+    """Stands in for SweepPool: parameter set {"name": k} has the per-bar returns returns[k]."""
+
+    def __init__(self, returns):
+        self.returns = returns
+        self.df = pd.DataFrame(index=pd.date_range("2020-01-01", periods=len(next(iter(returns.values()))), freq="D"))
+
+    def map(self, func, items):
+        out = []
+        for params, layout in items:
+            r = self.returns[params["name"]]
+            out.append(np.array([[(b - a, r[a:b].sum(), (r[a:b] ** 2).sum()) for a, b in layout.segments(g)]
+                                 for g in range(len(layout.bounds))], dtype=float))
+        return out
+
+
+def bar_masks(layout, n_bars, groups):
+    """Bar-level (train, test) masks of a split."""
+    train_seg, test_seg = split_masks(len(layout.bounds), groups)
+    train, test = np.zeros(n_bars, bool), np.zeros(n_bars, bool)
+    for g in range(len(layout.bounds)):
+        for seg, (a, b) in enumerate(layout.segments(g)):
+            train[a:b] |= train_seg[g, seg]
+            test[a:b] |= test_seg[g, seg]
+    return train, test
+
+
+def verify_layout():
+    layout = group_layout(1_000, 10, purge=5, embargo=3)
+    case = layout.bounds[:2] == ((0, 100), (100, 200)) and layout.bounds[-1] == (900, 1_000)
+    case &= layout.segments(1) == ((100, 103), (103, 195), (195, 200))
+    # Purge + embargo wider than a group: segments shrink, never overlap
+    tight = group_layout(20, 4, purge=4, embargo=3)
+    case &= tight.segments(0) == ((0, 3), (3, 3), (3, 5))
+    print(f"   1000 bars / 10 groups: group 1 = embargo {layout.segments(1)[HEAD]}, purge {layout.segments(1)[TAIL]} "
+          f"{'ok' if case else 'FAIL'}")
+    ok = case
+
+    train, test = split_masks(6, (1, 4))
+    case = test[[1, 4]].all() and not test[[0, 2, 3, 5]].any()
+    case &= not train[0, TAIL] and not train[3, TAIL] and not train[2, HEAD] and not train[5, HEAD]
+    case &= train[0, HEAD] and train[2, TAIL] and train[3, HEAD]
+    train, test = split_masks(6, (2, 3))
+    case &= not train[1, TAIL] and not train[4, HEAD] and not train[[2, 3]].any() and train[[0, 5]].all()
+    print(f"   split masks: purge before / embargo after each test group, adjacent test groups merged "
+          f"{'ok' if case else 'FAIL'}")
+    ok &= case
+
+    n, purge, embargo = 1_000, 7, 4
+    layout = group_layout(n, 8, purge=purge, embargo=embargo)
+    case = True
+    for groups in itertools.combinations(range(8), 3):
+        train, test = bar_masks(layout, n, groups)
+        test_bars = np.flatnonzero(test)
+        case &= not (train & test).any() and len(test_bars) == sum(b - a for a, b in (layout.bounds[g] for g in groups))
+        near = np.zeros(n, bool)
+        for t in test_bars:
+            near[max(0, t - purge):min(n, t + embargo + 1)] = True
+        case &= not (train & near).any() and (train | near).all()
+    print(f"   every 3-of-8 split: train bars exactly {purge} before / {embargo} after the test groups "
+          f"{'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_pbo():
+    rng = np.random.default_rng(0)
+    n = 1_200
+    noise = lambda: rng.normal(0, 0.01, n)
+    ok = True
+
+    # One set beats the others in every group: never overfit
+    returns = {"good": noise() + 0.004, "a": noise(), "b": noise() - 0.002}
+    with redirect_stdout(io.StringIO()):
+        splits, summary = cpcv(ReturnsPool(returns), [{"name": k} for k in returns], n_groups=6, test_groups=2)
+    case = summary["PBO"] == 0.0 and (splits["name"] == "good").all() and summary["Splits"] == 15
+    print(f"   a set that wins everywhere: PBO {summary['PBO']:.2f} over {summary['Splits']} splits "
+          f"{'ok' if case else 'FAIL'}")
+    ok &= case
+
+    # Each set only makes money in its own half: the in-sample winner is the out-of-sample loser
+    half = np.arange(n) < n // 2
+    returns = {"first": noise() + np.where(half, 0.005, -0.005), "second": noise() + np.where(half, -0.005, 0.005)}
+    with redirect_stdout(io.StringIO()):
+        splits, summary = cpcv(ReturnsPool(returns), [{"name": k} for k in returns], n_groups=2, test_groups=1)
+    case = summary["PBO"] == 1.0 and list(splits["name"]) == ["second", "first"]
+    case &= np.allclose(splits["OOS Rank"], 1 / 3) and (splits["OOS Sharpe"] < 0).all()
+    print(f"   sets that win only in-sample: PBO {summary['PBO']:.2f}, OOS rank {splits['OOS Rank'].iloc[0]:.2f} "
+          f"{'ok' if case else 'FAIL'}")
+    ok &= case
+
+    try:
+        cpcv(ReturnsPool(returns), [{"name": "first"}])
+        case = False
+    except ValueError:
+        case = True
+    print(f"   one parameter set: ValueError {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_sweep():
+    df = synthetic_ohlc(3_000, 8)
+    df.index = pd.date_range("2015-01-01", periods=len(df), freq="D")
+    param_sets = [{"n1": 5, "n2": 20}, {"n1": 10, "n2": 40}, {"n1": 20, "n2": 80}]
+    with redirect_stdout(io.StringIO()), SweepPool(df, SmaCross, dict(cash=50_000, finalize_trades=True)) as pool:
+        splits, summary = cpcv(pool, param_sets, n_groups=5, test_groups=2, purge=20, embargo=10)
+        curves = [pool.map(_equity, [p])[0] for p in param_sets]
+
+    layout = group_layout(len(df), 5, purge=20, embargo=10)
+    annualize = np.sqrt(len(df) / ((df.index[-1] - df.index[0]).days / 365.25))
+    case = len(splits) == 10
+    for _, row in splits.iterrows():
+        groups = tuple(int(g) for g in row["Test_Groups"].split("-"))
+        train, test = bar_masks(layout, len(df), groups)
+        equity = curves[row["Best_Index"]]
+        returns = np.r_[0.0, equity[1:] / equity[:-1] - 1]
+        sharpe = lambda m: returns[m].mean() / returns[m].std(ddof=1) * annualize
+        is_sharpe = [r[train].mean() / r[train].std(ddof=1)
+                     for r in (np.r_[0.0, c[1:] / c[:-1] - 1] for c in curves)]
+        case &= np.isclose(row["IS Sharpe"], sharpe(train)) and np.isclose(row["OOS Sharpe"], sharpe(test))
+        case &= row["Best_Index"] == int(np.nanargmax(is_sharpe))
+    print(f"   SmaCross, 10 splits: IS/OOS Sharpe match the equity curves, PBO {summary['PBO']:.2f} "
+          f"{'ok' if case else 'FAIL'}")
+    return case
+
+
+def _equity(params):
+    return _get_backtest(None).run(**params)._equity_curve["Equity"].values
+
+
+if __name__ == "__main__":
+    ok = verify_layout()
+    ok &= verify_pbo()
+    ok &= verify_sweep()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
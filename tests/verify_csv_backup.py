@@ -0,0 +1,93 @@
+import sys
+import os
+import time
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from core.csv_backup import CsvBackup
+
+# The write-behind CSV mirror: each policy writes (or skips) the right file with
+# the right contents after flush(), queueing returns without waiting for the
+# write, and a full queue holds the caller back instead of growing.
+
+
+def synthetic_minutes(n_bars, start="2024-01-02 09:30"):
+    index = pd.date_range(start, periods=n_bars, freq="min", tz="America/New_York", name="timestamp")
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.05, n_bars))
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 100.0}, index=index)
+
+
+def read_back(path):
+    df = pd.read_csv(path, index_col="timestamp")
+    df.index = pd.to_datetime(df.index)
+    return df
+
+
+def verify_policies():
+    ok = True
+    df = synthetic_minutes(5_000)
+    head, tail = df.iloc[:3_000], df.iloc[3_000:]
+    with tempfile.TemporaryDirectory() as tmp:
+        for policy, name in [("on", "TEST_1Min.csv"), ("gzip", "TEST_1Min.csv.gz"), ("off", None)]:
+            folder = os.path.join(tmp, policy)
+            os.makedirs(folder)
+            backup = CsvBackup(folder, policy=policy)
+            backup.rewrite("TEST", "1Min", lambda: head)
+            backup.append("TEST", "1Min", tail)
+            backup.flush()
+
+            files = os.listdir(folder)
+            if name is None:
+                case = files == []
+            else:
+                written = read_back(os.path.join(folder, name))
+                case = (files == [name] and np.allclose(written.to_numpy(), df.to_numpy())
+                        and (written.index == df.index).all())
+            case &= not backup.errors
+            print(f"   policy={policy:<5} files={files} {'ok' if case else 'FAIL'}")
+            ok &= case
+    return ok
+
+
+def verify_write_behind(delay=0.3):
+    ok = True
+    df = synthetic_minutes(100)
+    with tempfile.TemporaryDirectory() as tmp:
+        backup = CsvBackup(tmp, policy="on", max_pending=1)
+
+        def slow_load():
+            time.sleep(delay)
+            return df
+
+        start = time.perf_counter()
+        backup.rewrite("A", "1Min", slow_load)          # picked up by the writer
+        first = time.perf_counter() - start
+        time.sleep(0.05)
+        backup.rewrite("B", "1Min", slow_load)          # waits in the queue (max_pending=1)
+        backup.rewrite("C", "1Min", slow_load)          # queue full: blocks until A is written
+        blocked = time.perf_counter() - start
+        exists = backup.exists("C", "1Min")
+        backup.flush()
+        total = time.perf_counter() - start
+
+        case = first < delay / 3 and blocked >= delay * 0.9 and exists and total >= 3 * delay
+        case &= sorted(os.listdir(tmp)) == ["A_1Min.csv", "B_1Min.csv", "C_1Min.csv"]
+        print(f"   queueing returned in {first * 1000:.1f} ms; full queue blocked {blocked:.2f}s; "
+              f"flushed after {total:.2f}s {'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+if __name__ == "__main__":
+    ok = verify_policies()
+    ok &= verify_write_behind()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
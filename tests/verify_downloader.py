@@ -0,0 +1,188 @@
+import sys
+import os
+import json
+import time
+import threading
+from types import SimpleNamespace
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+from alpaca.common.exceptions import APIError
+from alpaca.data.timeframe import TimeFrame
+
+from core.downloader import BulkDownloader, TokenBucket, split_bars
+
+# The bulk downloader against a local stand-in for StockHistoricalDataClient:
+# grouped + chunked downloads equal one request per symbol, the token bucket
+# holds the request rate, throttling is retried, a rejected symbol is isolated
+# from its group and a broken range is reported exactly. Then the throughput of
+# one-request-per-symbol against grouped, concurrent chunks.
+
+
+class FakeBars:
+    """What the client returns: .data (non-empty when there are bars) and .df (symbol, timestamp) rows."""
+    def __init__(self, df):
+        self.df = df
+        self.data = {symbol: [] for symbol in df.index.unique(level="symbol")}
+
+
+class FakeClient:
+    """
+    Deterministic extended-hours minute bars for any symbol. Each request costs
+    `latency` + `per_bar` seconds per bar returned; `bad` symbols get a 422,
+    requests overlapping `broken` (start, end) a 500, and the first `throttle`
+    requests a 429.
+    """
+
+    def __init__(self, latency=0.0, per_bar=0.0, bad=(), broken=None, throttle=0):
+        self.latency, self.per_bar = latency, per_bar
+        self.bad, self.broken, self.throttle = set(bad), broken, throttle
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_stock_bars(self, request):
+        symbols = request.symbol_or_symbols
+        start, end = utc(request.start), utc(request.end)
+        with self._lock:
+            self.calls.append((time.monotonic(), tuple(symbols), start, end))
+            throttled = len(self.calls) <= self.throttle
+        if throttled:
+            raise _api_error(429, "too many requests")
+        if self.bad & set(symbols):
+            raise _api_error(422, f"invalid symbol: {sorted(self.bad & set(symbols))[0]}")
+        if self.broken and start < self.broken[1] and end > self.broken[0]:
+            raise _api_error(500, "internal server error")
+
+        df = pd.concat([minute_bars(symbol, start, end) for symbol in symbols])
+        time.sleep(self.latency + self.per_bar * len(df))
+        return FakeBars(df)
+
+
+def _api_error(status, message):
+    http_error = SimpleNamespace(response=SimpleNamespace(status_code=status), request=None)
+    return APIError(json.dumps({"code": status, "message": message}), http_error)
+
+
+def utc(moment):
+    """Request bounds as the API reads them: naive = UTC (StockBarsRequest converts to naive UTC)."""
+    moment = pd.Timestamp(moment)
+    return moment.tz_localize("UTC") if moment.tz is None else moment.tz_convert("UTC")
+
+
+def minute_bars(symbol, start, end):
+    index = pd.date_range(utc(start).ceil("min"), utc(end), freq="min", name="timestamp")
+    index = index[(index.weekday < 5) & (index.hour >= 8)]
+    minutes = index.as_unit("ns").asi8 // 60_000_000_000
+    close = 100 + sum(map(ord, symbol)) % 50 + (minutes % 997) / 10
+    df = pd.DataFrame({"open": close, "high": close + 0.5, "low": close - 0.5, "close": close,
+                       "volume": 100.0, "trade_count": 1.0, "vwap": close}, index=index)
+    return df.set_index(pd.MultiIndex.from_arrays([[symbol] * len(df), index], names=["symbol", "timestamp"]))
+
+
+def ny(text):
+    return pd.Timestamp(text, tz="America/New_York").to_pydatetime()
+
+
+def reference(symbol, start, end):
+    return split_bars(FakeBars(minute_bars(symbol, start, end)), TimeFrame.Minute)[symbol]
+
+
+def verify_downloads():
+    ok = True
+    start, end = ny("2024-01-01"), ny("2024-04-15 16:00")
+    symbols = [f"S{i:02d}" for i in range(7)]
+
+    client = FakeClient()
+    result = BulkDownloader(client, symbols_per_request=3, workers=3, requests_per_minute=None).download(
+        symbols, start, end, TimeFrame.Minute)
+    case = result.ok and sorted(result.frames) == symbols and len(client.calls) == 3 * 4
+    case &= all(result.frames[s].equals(reference(s, start, end)) for s in symbols)
+    case &= max(len(call[1]) for call in client.calls) == 3
+    print(f"   {len(symbols)} symbols in groups of 3 x 4 date chunks: {len(client.calls)} requests, "
+          f"same bars as one request per symbol {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    # 429s are retried with backoff
+    client = FakeClient(throttle=3)
+    result = BulkDownloader(client, workers=1, requests_per_minute=None, backoff=0.01).download(
+        ["AAA"], start, end, TimeFrame.Minute)
+    case = result.ok and result.requests == 4 + 3 and result.frames["AAA"].equals(reference("AAA", start, end))
+    print(f"   3 throttled requests retried: {result.requests} requests {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    # A rejected symbol is split out of its group; a range failing past the retries is reported exactly
+    broken = (ny("2024-02-10"), ny("2024-02-11"))
+    client = FakeClient(bad={"BAD"}, broken=broken)
+    result = BulkDownloader(client, symbols_per_request=8, workers=2, requests_per_minute=None,
+                            retries=2, backoff=0.01).download(symbols + ["BAD"], start, end, TimeFrame.Minute)
+    rejected = [f for f in result.failures if "422" in f.error]
+    failed_range = [f for f in result.failures if "500" in f.error]
+    case = sorted(result.frames) == symbols and result.failed_symbols() == sorted(symbols + ["BAD"])
+    case &= len(rejected) == 4 and all(f.symbols == ("BAD",) and f.attempts == 1 for f in rejected)
+    # The broken chunk's group was split while isolating BAD: its parts fail separately, same range
+    case &= (sorted(s for f in failed_range for s in f.symbols) == symbols
+             and len({(f.start, f.end) for f in failed_range}) == 1
+             and failed_range[0].start <= broken[0] and failed_range[0].end >= broken[1]
+             and all(f.attempts == 3 for f in failed_range))
+    print(f"   partial failures: BAD in each of {len(rejected)} chunks (422), broken chunk (500) in "
+          f"{len(failed_range)} parts, e.g. {failed_range[0] if failed_range else None} {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    # The token bucket caps the request rate across the pool
+    client = FakeClient()
+    BulkDownloader(client, symbols_per_request=1, workers=4, requests_per_minute=1200).download(
+        [f"R{i}" for i in range(25)], ny("2024-01-02"), ny("2024-01-02 16:00"), TimeFrame.Minute)
+    stamps = sorted(call[0] for call in client.calls)
+    busiest = max(np.searchsorted(stamps, t + 0.5) - i for i, t in enumerate(stamps))
+    case = len(stamps) == 25 and stamps[-1] - stamps[0] >= 24 / 20 * 0.95 and busiest <= 20 * 0.5 + 1
+    print(f"   25 requests at 20/s: took {stamps[-1] - stamps[0]:.2f}s, at most {busiest} in any 0.5s "
+          f"{'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_bucket():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    burst = time.monotonic() - start
+    for _ in range(10):
+        bucket.acquire()
+    steady = time.monotonic() - start
+    case = burst < 0.02 and 10 / 50 * 0.9 <= steady < 10 / 50 + 0.1
+    print(f"   bucket: burst of 5 in {burst * 1000:.1f} ms, 10 more in {steady:.2f}s {'ok' if case else 'FAIL'}")
+    return case
+
+
+def benchmark(n_symbols=10, latency=0.3, per_bar=2e-6):
+    """Network modelled as a fixed latency per request plus transfer time per bar."""
+    start, end = ny("2024-01-01"), ny("2024-03-31 16:00")
+    symbols = [f"B{i:02d}" for i in range(n_symbols)]
+
+    client = FakeClient(latency=latency, per_bar=per_bar)
+    t0 = time.perf_counter()
+    single = {s: split_bars(client.get_stock_bars(SimpleNamespace(symbol_or_symbols=[s], start=start, end=end)),
+                            TimeFrame.Minute)[s] for s in symbols}
+    t1 = time.perf_counter()
+    client = FakeClient(latency=latency, per_bar=per_bar)
+    result = BulkDownloader(client, symbols_per_request=50, workers=4, requests_per_minute=180).download(
+        symbols, start, end, TimeFrame.Minute)
+    t2 = time.perf_counter()
+    bars = sum(len(df) for df in single.values())
+    print(f"\n{n_symbols} symbols, {bars:,} minute bars: one request per symbol {t1 - t0:.2f}s | "
+          f"grouped, {len(client.calls)} concurrent chunks {t2 - t1:.2f}s")
+    return result.ok and all(result.frames[s].equals(single[s]) for s in symbols)
+
+
+if __name__ == "__main__":
+    ok = verify_downloads()
+    ok &= verify_bucket()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
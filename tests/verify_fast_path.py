@@ -0,0 +1,109 @@
+import sys
+import os
+import time
+import warnings
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+# Strategies import their modules relative to src/
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+
+import strategies
+from core.vector_backtest import VectorBacktest
+from optimization import build_grid
+
+# Parity harness: every parameter set must produce the SAME trades, equity curve
+# and summary metrics on the vectorized fast path as on backtesting.py's
+# event-driven loop (exact float equality, not a tolerance).
+
+STRATEGIES = [strategies.SmaCross, strategies.BollingerReversion, strategies.LrcReversion, strategies.MacdCross]
+METRICS = ['Return [%]', 'Sharpe Ratio', 'Max. Drawdown [%]', 'Win Rate [%]', '# Trades', 'Equity Final [$]']
+TRADE_COLUMNS = ['Size', 'EntryBar', 'ExitBar', 'EntryPrice', 'ExitPrice', 'PnL']
+
+# (bars, cash, commission): a normal account, one so small that orders get
+# canceled for lack of cash, and a relative-only commission
+SCENARIOS = [(3000, 50_000, (0.35, 0.001)),
+             (1500, 300, (2.0, 0.002)),
+             (800, 10_000, 0.001)]
+
+
+def synthetic_ohlc(n_bars, seed):
+    """Hourly random walk with gaps between Close and the next Open (exercises stop fills)."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n_bars, freq="h")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    open_ = np.r_[close[0], close[:-1]] * np.exp(rng.normal(0, 0.004, n_bars))
+    return pd.DataFrame({"Open": open_,
+                         "High": np.maximum(open_, close) * 1.004,
+                         "Low": np.minimum(open_, close) * 0.996,
+                         "Close": close,
+                         "Volume": 1000.0}, index=index)
+
+
+def same(a, b):
+    return a == b or (pd.isna(a) and pd.isna(b))
+
+
+def compare(event, fast):
+    """Returns a list of differences between two stats Series."""
+    diffs = [f"{m}: {event[m]} != {fast[m]}" for m in METRICS if not same(event[m], fast[m])]
+
+    if not np.array_equal(event._equity_curve["Equity"].values, fast._equity_curve["Equity"].values):
+        diffs.append("equity curve differs")
+
+    t1 = event._trades[TRADE_COLUMNS].to_numpy(dtype=float)
+    t2 = fast._trades[TRADE_COLUMNS].to_numpy(dtype=float)
+    if t1.shape != t2.shape or not np.array_equal(t1, t2):
+        diffs.append(f"trades differ ({len(t1)} vs {len(t2)})")
+    return diffs
+
+
+def verify_fast_path(max_tries=40):
+    warnings.filterwarnings("ignore")
+    failures = 0
+
+    for strategy in STRATEGIES:
+        grid = build_grid(strategy, max_tries=max_tries)
+        runs = mismatches = 0
+        event_time = fast_time = 0.0
+
+        for seed, (n_bars, cash, commission) in enumerate(SCENARIOS):
+            df = synthetic_ohlc(n_bars, seed)
+            kwargs = dict(cash=cash, commission=commission, finalize_trades=True)
+            bt = Backtest(df, strategy, **kwargs)
+            vbt = VectorBacktest(df, strategy, **kwargs)
+
+            for params in grid:
+                start = time.perf_counter()
+                event = bt.run(**params)
+                event_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                fast = vbt.run(**params)
+                fast_time += time.perf_counter() - start
+
+                runs += 1
+                diffs = compare(event, fast)
+                if diffs:
+                    mismatches += 1
+                    if mismatches <= 3:
+                        print(f"   MISMATCH {strategy.__name__} seed={seed} {params}: {'; '.join(diffs)}")
+
+        failures += mismatches
+        print(f"{strategy.__name__:<20} {runs - mismatches}/{runs} identical | "
+              f"event-driven {event_time / runs * 1e3:7.1f} ms/run | "
+              f"fast path {fast_time / runs * 1e3:6.2f} ms/run | {event_time / fast_time:5.1f}x")
+
+    print("\nPASS" if not failures else f"\nFAIL: {failures} mismatching runs")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    ok = verify_fast_path()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,121 @@
+import sys
+import os
+import time
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from core.frame_cache import FrameCache
+from core.parquet_store import ParquetStore
+
+# The in-process frame cache: sub-ranges of a cached frame come back equal to a
+# fresh slice and share its memory (tz-aware and tz-naive), eviction keeps the
+# byte budget, invalidation drops a symbol/timeframe, then the cost of a cached
+# sub-range against a Parquet read.
+
+
+def synthetic_minutes(start, n_bars, seed=0):
+    """Regular-hours minute bars (390 a day, weekdays), tz-aware like the Alpaca frames."""
+    days = pd.bdate_range(start, periods=n_bars // 390 + 1, tz="America/New_York")
+    index = (days.repeat(390) + pd.to_timedelta(np.tile(np.arange(390), len(days)), unit="min")
+             + pd.Timedelta(hours=9, minutes=30))[:n_bars]
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.0005, n_bars)))
+    df = pd.DataFrame({"Open": close, "High": close * 1.001, "Low": close * 0.999,
+                       "Close": close, "Volume": 1000.0}, index=index)
+    df.index.name = "timestamp"
+    return df
+
+
+def ts(text):
+    return pd.Timestamp(text, tz="America/New_York")
+
+
+def shares_data(a, b):
+    return np.shares_memory(a["Close"].to_numpy(), b["Close"].to_numpy())
+
+
+def verify_slices():
+    ok = True
+    df = synthetic_minutes("2023-01-02", 100_000)
+    cache = FrameCache()
+    cache.put("TEST", "1Min", ts("2023-01-01"), ts("2024-12-31"), df)
+
+    for start, end in [(ts("2023-01-01"), ts("2024-12-31")), (ts("2023-03-01"), ts("2023-04-01")),
+                       (ts("2023-06-05 09:30"), ts("2023-06-05 09:30")), (ts("2023-06-03"), ts("2023-06-04 23:59"))]:
+        expected = df.loc[start:end]
+        aware = cache.get("TEST", "1Min", start, end)
+        naive = cache.get("TEST", "1Min", start, end, tz_naive=True)
+        case = aware.equals(expected) and (expected.empty or shares_data(aware, df))
+        case &= (naive.index.tz is None and (naive.index == expected.index.tz_localize(None)).all()
+                 and np.array_equal(naive.to_numpy(), expected.to_numpy()))
+        case &= expected.empty or shares_data(naive, df)
+        print(f"   {start} -> {end}: {len(expected)} rows, shared {'ok' if case else 'FAIL'}")
+        ok &= case
+
+    # Outside the cached range, another timeframe or symbol: misses
+    case = (cache.get("TEST", "1Min", ts("2022-12-01"), ts("2023-02-01")) is None
+            and cache.get("TEST", "1Hour", ts("2023-03-01"), ts("2023-04-01")) is None
+            and cache.get("OTHER", "1Min", ts("2023-03-01"), ts("2023-04-01")) is None)
+    stats = cache.stats()
+    case &= stats["hits"] == 8 and stats["misses"] == 3 and stats["entries"] == 1
+    print(f"   {cache.summary()} {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_budget():
+    df = synthetic_minutes("2023-01-02", 20_000)
+    size = int(df.memory_usage(index=True).sum())
+    cache = FrameCache(max_bytes=int(2.1 * size))
+    for symbol in "ABC":
+        cache.put(symbol, "1Min", ts("2023-01-01"), ts("2023-12-31"), df)
+    case = cache.get("A", "1Min", ts("2023-02-01"), ts("2023-03-01")) is None      # least recently used
+    case &= cache.get("B", "1Min", ts("2023-02-01"), ts("2023-03-01")) is not None
+
+    # B's tz-naive index counts against the budget too: C (least recently used now) goes
+    cache.get("B", "1Min", ts("2023-02-01"), ts("2023-03-01"), tz_naive=True)
+    case &= cache.stats()["entries"] == 1 and cache.stats()["bytes"] <= cache.max_bytes
+    case &= cache.stats()["evictions"] == 2
+
+    cache.invalidate("B", "1Min")
+    case &= cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+    print(f"   budget of {cache.max_bytes / 2**20:.1f} MB, {cache.stats()['evictions']} evictions "
+          f"{'ok' if case else 'FAIL'}")
+    return case
+
+
+def benchmark(n_bars=1_000_000, rounds=20):
+    df = synthetic_minutes("2015-01-01", n_bars)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetStore(tmp)
+        store.write("TEST", "1Min", df)
+        start, end = ts("2016-01-01"), ts("2020-12-31")
+
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            fresh = store.read("TEST", "1Min", start, end)
+            fresh.index = fresh.index.tz_localize(None)
+        t1 = time.perf_counter()
+        cache = FrameCache()
+        cache.put("TEST", "1Min", ts("2015-01-01"), ts("2025-12-31"), store.read("TEST", "1Min"))
+        t2 = time.perf_counter()
+        for _ in range(rounds):
+            cached = cache.get("TEST", "1Min", start, end, tz_naive=True)
+        t3 = time.perf_counter()
+        print(f"\n{rounds} loads of {len(fresh):,} bars: Parquet read + tz strip {(t1 - t0) / rounds * 1000:.1f} ms | "
+              f"cached slice {(t3 - t2) / rounds * 1000:.2f} ms")
+        return (cached.index == fresh.index).all() and np.array_equal(cached.to_numpy(), fresh.to_numpy())
+
+
+if __name__ == "__main__":
+    ok = verify_slices()
+    ok &= verify_budget()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
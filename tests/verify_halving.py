@@ -0,0 +1,97 @@
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import pandas as pd
+
+from optimization import successive_halving, rung_schedule, build_grid, SweepPool
+from strategies import SmaCross
+from verify_fast_path import synthetic_ohlc
+
+# Successive halving: one rung per whole power of eta in the number of configs
+# (exact powers included, where the float log falls just short), prefix
+# lengths per rung, configs and bars simulated per rung through a pool that
+# scores configs by a known value, and a real sweep whose last rung ranks its
+# survivors on the full history.
+
+
+class ScoredPool:
+    """Stands in for SweepPool: the metric of config {"i": i} is i, on every prefix."""
+
+    def __init__(self, bars):
+        self.df = pd.DataFrame(index=range(bars))
+        self.calls = []
+
+    def evaluate(self, param_sets, window=None, progress=True):
+        self.calls.append((len(param_sets), window))
+        return pd.DataFrame([{**p, "Score": p["i"]} for p in param_sets])
+
+
+def verify_schedule():
+    ok = True
+    cases = [(243, 3, 243_000, [1_000, 3_000, 9_000, 27_000, 81_000, 243_000]),
+             (1_000, 10, 10_000_000, [10_000, 100_000, 1_000_000, 10_000_000]),
+             (242, 3, 243_000, [3_000, 9_000, 27_000, 81_000, 243_000]),
+             (125, 5, 125_000, [1_000, 5_000, 25_000, 125_000]),
+             (1, 3, 50_000, [50_000])]
+    for n, eta, total, expected in cases:
+        bars = rung_schedule(n, total, eta=eta, min_bars=1_000)
+        case = bars == expected
+        print(f"   {n} configs, eta={eta}: {len(bars)} rungs {bars} {'ok' if case else 'FAIL'}")
+        ok &= case
+
+    # Short history: prefixes spread between min_bars and the full length
+    bars = rung_schedule(1_000, 20_000, eta=10, min_bars=1_000)
+    case = len(bars) == 4 and bars[0] == 1_000 and bars[-1] == 20_000 and bars == sorted(bars)
+    print(f"   1000 configs on 20000 bars: {bars} {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_budget():
+    ok = True
+    for n, eta, total in [(243, 3, 243_000), (1_000, 10, 10_000_000)]:
+        pool = ScoredPool(total)
+        with redirect_stdout(io.StringIO()):
+            results, report = successive_halving(pool, [{"i": i} for i in range(n)], "Score", eta=eta)
+        schedule = rung_schedule(n, total, eta=eta)
+        configs = [n // eta ** r for r in range(len(schedule))]
+        case = [r.configs for r in report.rungs] == configs and [c for c, _ in pool.calls] == configs
+        case &= [w for _, w in pool.calls] == [(0, b) for b in schedule]
+        case &= report.bars_simulated == sum(c * b for c, b in zip(configs, schedule))
+        case &= report.bars_exhaustive == n * total
+        last = results[results["Rung"] == len(schedule) - 1]
+        case &= sorted(last["i"]) == list(range(n - configs[-1], n))
+        print(f"   {n} configs, eta={eta}: configs per rung {configs}, {report.bars_simulated:,} bars "
+              f"({report.pruned_pct:.1f}% pruned), best survive {'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def verify_sweep():
+    df = synthetic_ohlc(9_000, 4)
+    param_sets = build_grid(SmaCross)
+    with redirect_stdout(io.StringIO()), SweepPool(df, SmaCross, dict(cash=50_000, finalize_trades=True)) as pool:
+        results, report = successive_halving(pool, param_sets, "Sharpe Ratio", eta=3, min_bars=1_000)
+        last = results[results["Rung"] == results["Rung"].max()]
+        full = pool.evaluate([{"n1": n1, "n2": n2} for n1, n2 in zip(last["n1"], last["n2"])])
+    case = [r.configs for r in report.rungs] == [51, 17, 6, 2] and report.rungs[-1].bars == len(df)
+    case &= list(last["Sharpe Ratio"]) == list(full["Sharpe Ratio"])
+    print(f"   SmaCross grid: {[r.configs for r in report.rungs]} configs per rung, "
+          f"last rung on the full history {'ok' if case else 'FAIL'}")
+    print(report.summary())
+    return case
+
+
+if __name__ == "__main__":
+    ok = verify_schedule()
+    ok &= verify_budget()
+    ok &= verify_sweep()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+import pickle
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from indicators import technical, regression
+from indicators.incremental import (EMA, RSI, MACD, SMA, BollingerBands, ParabolicSAR,
+                                    LinearRegressionChannel)
+
+# Online indicators must be BIT-identical to their batch functions, including
+# when the state is snapshotted, pickled and restored half way through.
+
+
+def synthetic_bars(n_bars, seed):
+    """Random walk crossing several kernel blocks, with NaN gaps and a flat stretch."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n_bars)))
+    close[:3] = np.nan
+    close[2500:2504] = np.nan
+    close[5000:5040] = close[4999]
+    high = close * (1 + np.abs(rng.normal(0, 0.002, n_bars)))
+    low = close * (1 - np.abs(rng.normal(0, 0.002, n_bars)))
+    return pd.Series(close), pd.Series(high).bfill(), pd.Series(low).bfill()
+
+
+def cases(close, high, low):
+    """(label, factory, input columns, batch outputs)"""
+    return [
+        ("EMA(span=12)", lambda: EMA(span=12), (close,),
+         (close.ewm(span=12, adjust=False).mean().values,)),
+        ("EMA(alpha=1/14)", lambda: EMA(alpha=1/14), (close,),
+         (close.ewm(alpha=1/14, adjust=False).mean().values,)),
+        ("RSI(14)", lambda: RSI(14), (close,), (technical.rsi(close, 14).values,)),
+        ("MACD(12,26,9)", lambda: MACD(12, 26, 9), (close,),
+         tuple(s.values for s in technical.macd(close, 12, 26, 9))),
+        ("SMA(30)", lambda: SMA(30), (close,), (technical.sma(close, 30).values,)),
+        ("SMA(1)", lambda: SMA(1), (close,), (technical.sma(close, 1).values,)),
+        ("BollingerBands(50,2)", lambda: BollingerBands(50, 2.0), (close,),
+         technical.bollinger_bands_batch(close, 50, 2.0)),
+        ("BollingerBands(2000,2)", lambda: BollingerBands(2000, 2.0), (close,),
+         technical.bollinger_bands_batch(close, 2000, 2.0)),
+        ("ParabolicSAR", lambda: ParabolicSAR(0.02, 0.2), (high, low),
+         (technical.parabolic_sar(high, low, 0.02, 0.2).values,)),
+        ("LinearRegressionChannel(40)", lambda: LinearRegressionChannel(40, 2.0), (close,),
+         regression.rolling_lrc(close, 40, 2.0)),
+    ]
+
+
+def identical(expected, actual):
+    if not isinstance(actual, tuple):
+        actual = (actual,)
+    return len(expected) == len(actual) and all(
+        np.array_equal(np.asarray(e, dtype=float), a, equal_nan=True) for e, a in zip(expected, actual))
+
+
+def verify_incremental(n_bars=10_000):
+    close, high, low = synthetic_bars(n_bars, 0)
+    split = 6_123
+    ok = True
+
+    for label, factory, columns, expected in cases(close, high, low):
+        start = time.perf_counter()
+        full = factory().update_many(*columns)
+        elapsed = time.perf_counter() - start
+        same = identical(expected, full)
+
+        # Replay: first part, snapshot -> pickle -> restore into a fresh object, then the rest
+        first = factory()
+        head = first.update_many(*(col[:split] for col in columns))
+        state = pickle.loads(pickle.dumps(first.snapshot()))
+        tail = factory().restore(state).update_many(*(col[split:] for col in columns))
+        if isinstance(head, tuple):
+            resumed = tuple(np.concatenate(parts) for parts in zip(head, tail))
+        else:
+            resumed = np.concatenate([head, tail])
+        same_resumed = identical(expected, resumed)
+
+        print(f"   {label:<28} {'identical' if same else 'MISMATCH':<9} | "
+              f"restored {'identical' if same_resumed else 'MISMATCH':<9} | "
+              f"{elapsed / n_bars * 1e6:5.1f} us/bar")
+        ok &= same and same_resumed
+    return ok
+
+
+if __name__ == "__main__":
+    ok = verify_incremental()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
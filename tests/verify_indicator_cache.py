@@ -0,0 +1,188 @@
+import sys
+import os
+import time
+import types
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from indicators import cache as indicator_cache
+from indicators.cache import IndicatorCache, code_fingerprint
+from indicators.technical import sma
+from indicators.regression import rolling_lrc
+
+# Indicator cache: memory hits for equal data in another object and misses for
+# other arguments, read-only results (arrays and Series), LRU eviction by
+# bytes, the disk tier serving a fresh cache, keys that change when a project
+# helper an indicator calls is edited or a library it uses changes version
+# (not only its own code), uncacheable calls bypassed, and a hit vs. a compute.
+
+HELPER = '''
+import numpy as np
+import fakelib
+
+def scale(values):
+    return values * {factor}
+
+def indicator(values):
+    return scale(np.asarray(values, dtype=float)) + fakelib.OFFSET
+'''
+
+
+def close_series(n=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+                     index=pd.date_range("2024-01-01", periods=n, freq="h"))
+
+
+def project_module(factor):
+    """indicator() calling scale(), compiled as if it lived in src/indicators."""
+    module = types.ModuleType("indicators._probe")
+    path = os.path.join(PROJECT_ROOT, "src", "indicators", "_probe.py")
+    exec(compile(HELPER.format(factor=factor), path, "exec"), module.__dict__)
+    return module
+
+
+def verify_memory():
+    cache = IndicatorCache(max_bytes=64 * 2**20)
+    close = close_series()
+    first = cache.call(sma, close, 20)
+    again = cache.call(sma, close.copy(), 20)
+    other = cache.call(sma, close, 30)
+    case = again is first and cache.hits == 1 and cache.misses == 2
+    case &= np.array_equal(first, sma(close, 20), equal_nan=True) and not np.array_equal(first, other, equal_nan=True)
+    print(f"   same data in a new object: hit, other period: miss ({cache.hits} hits, {cache.misses} misses) "
+          f"{'ok' if case else 'FAIL'}")
+    ok = case
+
+    frozen = []
+    upper = cache.call(rolling_lrc, close.to_numpy(), window=20)[1]
+    series = cache.call(_as_series, close)
+    for target in (lambda: upper.__setitem__(0, 1.0), lambda: series.iloc.__setitem__(0, 1.0),
+                   lambda: series.values.__setitem__(0, 1.0)):
+        try:
+            target()
+            frozen.append(False)
+        except ValueError:
+            frozen.append(True)
+    case = all(frozen) and cache.call(_as_series, close).iloc[0] == close.iloc[0]
+    print(f"   results read-only (array, Series.iloc, Series.values) {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def _as_series(close):
+    return close * 1.0
+
+
+def verify_lru():
+    close = close_series(1_000)
+    size = int(sma(close, 10).memory_usage())  # One sma() result, index included
+    cache = IndicatorCache(max_bytes=2 * size)
+    for period in (10, 20, 30):               # 10 evicted
+        cache.call(sma, close, period)
+    case = cache.evictions == 1 and cache.stats()["entries"] == 2
+    cache.call(sma, close, 20)                # hit, 20 now most recent
+    cache.call(sma, close, 10)                # miss, evicts 30
+    cache.call(sma, close, 20)                # hit
+    cache.call(sma, close, 30)                # miss
+    case &= cache.hits == 2 and cache.misses == 5 and cache.evictions == 3 and cache.stats()["bytes"] <= 2 * size
+
+    small = IndicatorCache(max_bytes=size // 2)
+    small.call(sma, close, 10)
+    small.call(sma, close, 10)
+    case &= small.misses == 2 and small.stats()["entries"] == 0
+    print(f"   LRU by bytes: least recently used evicted, oversize results not kept "
+          f"({cache.evictions} evictions) {'ok' if case else 'FAIL'}")
+    return case
+
+
+def verify_disk():
+    close = close_series()
+    with tempfile.TemporaryDirectory() as tmp:
+        warm = IndicatorCache(disk_dir=tmp)
+        expected = warm.call(rolling_lrc, close.to_numpy(), window=40)
+        fresh = IndicatorCache(disk_dir=tmp)
+        loaded = fresh.call(rolling_lrc, close.to_numpy(), window=40)
+        fresh.call(rolling_lrc, close.to_numpy(), window=40)
+        case = fresh.disk_hits == 1 and fresh.hits == 1 and fresh.misses == 0
+        case &= all(np.array_equal(a, b, equal_nan=True) for a, b in zip(expected, loaded))
+        case &= not any(a.flags.writeable for a in loaded)
+    print(f"   new cache on the same directory: disk hit, then memory hit, read-only {'ok' if case else 'FAIL'}")
+    return case
+
+
+def verify_invalidation():
+    values = np.arange(10.0)
+    sys.modules["fakelib"] = fakelib = types.ModuleType("fakelib")
+    fakelib.OFFSET, fakelib.__version__ = 0.0, "1.0"
+    try:
+        v1, v1_again, v2 = project_module(2), project_module(2), project_module(3)
+        key = lambda module: IndicatorCache().key(module.indicator, (values,), {})
+        case = key(v1) == key(v1_again) and key(v1) != key(v2)
+        case &= code_fingerprint(v1.indicator) != code_fingerprint(v2.indicator)
+        case &= code_fingerprint(v1.scale) != code_fingerprint(v2.scale)
+        with tempfile.TemporaryDirectory() as tmp:
+            IndicatorCache(disk_dir=tmp).call(v1.indicator, values)
+            edited = IndicatorCache(disk_dir=tmp)
+            result = edited.call(v2.indicator, values)
+            case &= edited.misses == 1 and edited.disk_hits == 0 and np.array_equal(result, values * 3)
+            restored = IndicatorCache(disk_dir=tmp)
+            restored.call(project_module(2).indicator, values)
+            case &= restored.disk_hits == 1
+        print(f"   helper edited: new key, disk entry of the old code not served {'ok' if case else 'FAIL'}")
+        ok = case
+
+        # Library upgraded between two sessions (the fingerprint is computed once per process)
+        before = key(v1)
+        fakelib.__version__ = "2.0"
+        code_fingerprint.cache_clear()
+        case = key(v1) != before
+        print(f"   library version changed: new key {'ok' if case else 'FAIL'}")
+    finally:
+        del sys.modules["fakelib"]
+        code_fingerprint.cache_clear()
+    return ok & case
+
+
+def verify_bypass():
+    cache = IndicatorCache()
+    close = close_series(100)
+    cache.call(lambda s: s * 2, close)
+    cache.call(sma, close.astype(object), 10)
+    case = cache.bypassed == 2 and cache.stats()["entries"] == 0
+    indicator_cache.configure(enabled=False)
+    case &= indicator_cache.active() is None and np.array_equal(indicator_cache.cached(sma, close, 10),
+                                                                sma(close, 10), equal_nan=True)
+    print(f"   lambda and object data bypassed, disabled cache computes {'ok' if case else 'FAIL'}")
+    return case
+
+
+def benchmark(n=50_000):
+    close = close_series(n).to_numpy()
+    cache = IndicatorCache()
+    t0 = time.perf_counter()
+    cache.call(rolling_lrc, close, window=40)
+    t1 = time.perf_counter()
+    cache.call(rolling_lrc, close, window=40)
+    t2 = time.perf_counter()
+    print(f"\nrolling_lrc on {n} bars: compute {(t1 - t0) * 1000:.1f} ms | hit {(t2 - t1) * 1000:.2f} ms "
+          f"(key hashes the input)")
+    return cache.hits == 1
+
+
+if __name__ == "__main__":
+    ok = verify_memory()
+    ok &= verify_lru()
+    ok &= verify_disk()
+    ok &= verify_invalidation()
+    ok &= verify_bypass()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,160 @@
+import sys
+import os
+import time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from indicators.regression import rolling_lrc, rolling_percentile_rank
+
+# Numeric parity of the O(n) LRC kernel with the pandas implementation it
+# replaced (kept below as the reference), rolling_percentile_rank against
+# pandas rank on ties and NaNs, and benchmarks at 1M bars and long rank windows.
+
+OUTPUTS = ["center_line", "upper", "lower", "slope_pct", "r_squared", "width_rank"]
+
+
+def reference_lrc_metrics(close, window=10, num_std=2, days_per_year=252):
+    """The previous LrcReversion implementation (rolling pandas passes)."""
+    y = pd.Series(close)
+    x = pd.Series(np.arange(len(y)))
+
+    rolling_y = y.rolling(window=window)
+
+    cov_xy = y.rolling(window=window).cov(x)
+    var_x = x.rolling(window=window).var()
+    slope = cov_xy / var_x
+
+    mean_y = rolling_y.mean()
+    mean_x = x.rolling(window=window).mean()
+    intercept = mean_y - (slope * mean_x)
+
+    center_line = (slope * x) + intercept
+
+    corr_xy = rolling_y.corr(x)
+    r_squared = corr_xy ** 2
+    std_y = rolling_y.std()
+
+    n = window
+    see = std_y * np.sqrt(1 - r_squared) * np.sqrt((n-1) / (n-2))
+
+    upper = center_line + (num_std * see)
+    lower = center_line - (num_std * see)
+
+    slope_pct = (slope / center_line) * days_per_year * 100
+
+    width_pct = (upper - lower) / center_line
+
+    width_rank = width_pct.rolling(200).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1], raw=True)
+
+    return (center_line.values,
+            upper.values,
+            lower.values,
+            slope_pct.values,
+            r_squared.values,
+            width_rank.values), width_pct.values
+
+
+def synthetic_close(n_bars, seed, vol=0.0005):
+    """Minute-like random walk; a few NaN gaps and a flat stretch with repeated prices."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n_bars)))
+    close[n_bars // 3: n_bars // 3 + 5] = np.nan
+    close[n_bars // 2: n_bars // 2 + 30] = np.round(close[n_bars // 2: n_bars // 2 + 30], 1)
+    return close
+
+
+def verify_parity(n_bars=20_000):
+    """
+    Channel outputs: same NaN positions, within floating-point tolerance (the
+    kernel's running sums round differently from pandas' rolling passes).
+    width_rank: exactly pandas' rank when fed the same widths; on the kernel's
+    own widths only near-ties may order differently.
+    """
+    failures = 0
+    for seed, (window, num_std) in enumerate([(20, 2.0), (40, 2.0), (100, 1.5)]):
+        close = synthetic_close(n_bars, seed)
+        expected, width_pct = reference_lrc_metrics(close, window, num_std)
+        actual = rolling_lrc(close, window, num_std)
+
+        for name, a, b in zip(OUTPUTS, expected, actual):
+            if not np.array_equal(np.isnan(a), np.isnan(b)):
+                failures += 1
+                print(f"   FAIL window={window} {name}: NaN positions differ")
+                continue
+
+            valid = ~np.isnan(a)
+            if name == "width_rank":
+                ok = (a[valid] != b[valid]).mean() <= 1e-3
+            else:
+                # Relative to the output's scale: slope/r2 pass through zero
+                scale = np.abs(a[valid]).max()
+                ok = np.allclose(b[valid], a[valid], rtol=1e-9, atol=1e-7 * scale)
+            worst = np.abs(a[valid] - b[valid]).max()
+            print(f"   window={window:<4} {name:<12} max abs diff {worst:.3e} {'ok' if ok else 'FAIL'}")
+            failures += not ok
+
+        if not np.array_equal(rolling_percentile_rank(width_pct, 200), expected[5], equal_nan=True):
+            failures += 1
+            print(f"   FAIL window={window}: rolling_percentile_rank differs from pandas rank")
+
+    return failures == 0
+
+
+def pandas_percentile_rank(values, window):
+    return pd.Series(values).rolling(window).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1], raw=True).values
+
+
+def verify_percentile_rank():
+    rng = np.random.default_rng(7)
+    ok = True
+    for label, values in [("random", rng.normal(size=4_000)),
+                          ("ties", rng.integers(0, 20, 4_000).astype(float)),
+                          ("NaNs", np.where(rng.random(4_000) < 0.01, np.nan, rng.normal(size=4_000)))]:
+        for window in (1, 5, 200, 1_500):
+            case = np.allclose(rolling_percentile_rank(values, window), pandas_percentile_rank(values, window),
+                               rtol=0, atol=1e-12, equal_nan=True)
+            ok &= case
+            if not case:
+                print(f"   FAIL {label} window={window}: rolling_percentile_rank differs from pandas rank")
+    print(f"   rolling_percentile_rank = pandas rank (random, ties, NaNs; windows 1 to 1500) {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def benchmark(n_bars=1_000_000, reference_bars=100_000, window=40):
+    """
+    Kernel on `n_bars`. The reference is O(n * 200) with a Series built per bar,
+    so it's timed on `reference_bars` and scaled linearly.
+    """
+    close = synthetic_close(n_bars, seed=42)
+
+    start = time.perf_counter()
+    rolling_lrc(close, window, 2.0)
+    kernel = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference_lrc_metrics(close[:reference_bars], window, 2.0)
+    reference = (time.perf_counter() - start) * n_bars / reference_bars
+
+    print(f"\n{n_bars:,} bars, window={window}: kernel {kernel:.2f}s | "
+          f"pandas ~{reference:.1f}s (timed on {reference_bars:,} bars) | {reference / kernel:.0f}x")
+
+    # Percentile rank: per-bar cost grows with log(window), not with the window
+    for rank_window in (200, 20_000, 200_000):
+        start = time.perf_counter()
+        rolling_percentile_rank(close[:500_000], rank_window)
+        print(f"rolling_percentile_rank, 500,000 bars, window={rank_window:,}: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    ok = verify_parity()
+    ok &= verify_percentile_rank()
+    benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
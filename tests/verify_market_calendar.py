@@ -0,0 +1,156 @@
+import sys
+import os
+import io
+import gc
+import time
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+from alpaca.data.timeframe import TimeFrame
+from backtesting import Backtest
+
+from core import market_calendar
+from core.market_calendar import sessions, session_masks, session_mask, early_closes
+from core.downloader import split_bars
+from core.resample import resample_bars
+from strategies.periodic.monthly_dca import MonthlyDCA
+from verify_downloader import FakeBars, minute_bars
+from verify_resample import extended_minutes, session
+
+# The local NYSE calendar against the exchange's published trading-day counts
+# and half days, then the vectorized masks against pandas groupbys of the same
+# bars (tz-aware and tz-naive, minutes and derived hours), their per-index
+# cache, the download filter on a holiday week and MonthlyDCA buying on the
+# first bar of each month. Last, masks vs. the per-bar date comparisons they
+# replace.
+
+# Trading days per year as published by NYSE (Sandy 2012, Bush 2018, Carter 2025)
+TRADING_DAYS = {2012: 250, 2018: 251, 2019: 252, 2020: 253, 2021: 252, 2022: 251, 2023: 250, 2024: 252, 2025: 250}
+
+
+def verify_calendar():
+    counts = {year: len(sessions(f"{year}-01-01", f"{year}-12-31")) for year in TRADING_DAYS}
+    case = counts == TRADING_DAYS
+    print(f"   trading days of {len(counts)} years match the published counts {'ok' if case else 'FAIL'}")
+    ok = case
+
+    half_days = [day.strftime("%m-%d") for day in early_closes(2024)]
+    table = sessions("2024-11-27", "2024-12-02")
+    case = half_days == ["07-03", "11-29", "12-24"] and list(table.index.day) == [27, 29, 2]
+    case &= table.loc["2024-11-29", "close"] == pd.Timestamp("2024-11-29 13:00", tz="America/New_York")
+    print(f"   2024 half days {', '.join(half_days)}; no session on Thanksgiving {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def reference_masks(df):
+    """The masks by pandas: regular minutes from the calendar table, first/last by groupby."""
+    regular = df.index.isin(session(df).index)
+    bars = df.index[regular].tz_localize(None)
+    positions = np.flatnonzero(regular)
+    masks = {"regular": regular}
+    for name, keys in [("day", bars.normalize()), ("week", bars.to_period("W-SUN")), ("month", bars.to_period("M"))]:
+        keys = pd.Series(keys)
+        for edge, keep in [("first", "first"), ("last", "last")]:
+            mask = np.zeros(len(df), dtype=bool)
+            mask[positions[~keys.duplicated(keep=keep).to_numpy()]] = True
+            masks[f"{edge}_of_{name}"] = mask
+    return masks
+
+
+def verify_masks():
+    ok = True
+    minutes = extended_minutes("2023-06-01", 400)
+    expected = reference_masks(minutes)
+    for label, index in [("tz-aware", minutes.index), ("tz-naive", minutes.index.tz_localize(None))]:
+        masks = session_masks(index, bar="1min")
+        case = all(np.array_equal(getattr(masks, name), mask) for name, mask in expected.items())
+        dates = index[masks.half_day].normalize().unique()
+        case &= [date.strftime("%Y-%m-%d") for date in dates] == ["2023-07-03", "2023-11-24", "2024-07-03", "2024-11-29"]
+        print(f"   {label} minutes: {masks.regular.sum()} regular of {len(index)}, "
+              f"{masks.first_of_month.sum()} month starts, same as pandas {'ok' if case else 'FAIL'}")
+        ok &= case
+
+    # Derived hours are labeled 09:00 for 09:30-09:59: still a session bar (bar length inferred)
+    hours = resample_bars(minutes, TimeFrame.Hour)
+    masks = session_masks(hours.index)
+    case = masks.regular.all() and hours.index[masks.first_of_day][0].hour == 9
+    days = resample_bars(session(minutes), TimeFrame.Day).index
+    days = days.append(pd.DatetimeIndex([pd.Timestamp("2024-12-25", tz="America/New_York")])).sort_values()
+    case &= list(session_masks(days).regular).count(False) == 1
+    print(f"   derived 1Hour bars all regular, a 1Day bar on Christmas is not {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    index = pd.DatetimeIndex(minutes.index[:1000])
+    cached = session_masks(index) is session_masks(index) and session_mask(index) is session_masks(index).regular
+    entries = len(market_calendar._masks)
+    del index
+    gc.collect()
+    case = cached and len(market_calendar._masks) == entries - 1
+    print(f"   masks cached per index, dropped with it {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_download_filter():
+    """A Thanksgiving week of extended-hours minutes through split_bars()."""
+    raw = minute_bars("AAA", pd.Timestamp("2024-11-27", tz="UTC"), pd.Timestamp("2024-11-30 23:00", tz="UTC"))
+    df = split_bars(FakeBars(raw), TimeFrame.Minute)["AAA"]
+    last = df.groupby(df.index.date).apply(lambda day: day.index[-1].strftime("%H:%M"))
+    case = list(last.index.astype(str)) == ["2024-11-27", "2024-11-29"] and list(last) == ["16:00", "13:00"]
+    print(f"   download filter: last bars {dict(zip(last.index.astype(str), last))}, none on Thanksgiving "
+          f"{'ok' if case else 'FAIL'}")
+    return case
+
+
+def verify_monthly_dca():
+    hours = resample_bars(extended_minutes("2023-01-02", 300), TimeFrame.Hour)
+    data = hours.tz_localize(None)
+    with redirect_stdout(io.StringIO()):
+        stats = Backtest(data, MonthlyDCA, cash=1_000_000, finalize_trades=True).run()
+    # Old rule: buy on the bar whose month differs from the previous one; filled on the next bar's open
+    months = data.index.month
+    expected = [i + 1 for i in np.flatnonzero(months[1:] != months[:-1]) + 1 if i + 1 < len(data) - 1]
+    entries = sorted(stats._trades["EntryBar"])
+    case = entries == expected
+    print(f"   MonthlyDCA: {len(entries)} monthly buys on the same bars as the date comparison "
+          f"{'ok' if case else 'FAIL'}")
+    return case
+
+
+def benchmark(days=2_500, loop_days=250):
+    minutes = extended_minutes("2015-01-01", days)
+    index = session(minutes.iloc[:loop_days * 960]).index.tz_localize(None)
+
+    t0 = time.perf_counter()
+    # What MonthlyDCA.next() did: two Timestamps per bar
+    starts = [i for i in range(1, len(index)) if pd.to_datetime(index[i]).month != pd.to_datetime(index[i - 1]).month]
+    t1 = time.perf_counter()
+    masks = session_masks(index)
+    t2 = time.perf_counter()
+    looked_up = [i for i in range(1, len(index)) if masks.first_of_month[i]]
+    t3 = time.perf_counter()
+    filtered = minutes.between_time("09:30", "16:00")
+    t4 = time.perf_counter()
+    regular = session_mask(minutes.index, bar=0)
+    t5 = time.perf_counter()
+    print(f"\nMonth starts over {len(index):,} bars: per-bar dates {t1 - t0:.2f}s | "
+          f"masks {(t2 - t1) * 1000:.1f} ms + per-bar lookup {(t3 - t2) * 1000:.1f} ms")
+    print(f"Session filter over {len(minutes):,} minutes: between_time {(t4 - t3) * 1000:.1f} ms "
+          f"(no holidays / half days) | calendar mask {(t5 - t4) * 1000:.1f} ms")
+    return starts == looked_up and regular.sum() <= len(filtered)
+
+
+if __name__ == "__main__":
+    ok = verify_calendar()
+    ok &= verify_masks()
+    ok &= verify_download_filter()
+    ok &= verify_monthly_dca()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,241 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import subprocess
+from datetime import datetime
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from core.frame_cache import tz_naive_frame
+from core.mmap_store import MmapStore
+from core.parquet_store import ParquetStore
+
+# Memory-mapped snapshots against the Parquet store they are taken from: same
+# bars tz-aware and tz-naive for any range, nothing copied within a year
+# (every array is a view of the mapped files), float32 within float32
+# precision, a new version of only the year whose parts changed (other years
+# and their files untouched, stale layouts dropped), and DataManager serving
+# identical frames with mmap_frames on and off, derived weekly bars included.
+# Last, load time and resident memory of a whole minute history: Parquet read
+# + tz strip vs. mapped float64 / float32, each measured in a fresh process,
+# and the snapshot refresh after an append vs. snapshotting every year.
+
+
+def minutes(start, days, seed=0):
+    dates = pd.bdate_range(start, periods=days)
+    index = (dates.repeat(391) + pd.to_timedelta(np.tile(np.arange(391), len(dates)), unit="min")
+             + pd.Timedelta(hours=9, minutes=30)).tz_localize("America/New_York")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, len(index))))
+    df = pd.DataFrame({"Open": close * (1 + rng.normal(0, 1e-4, len(index))),
+                       "High": close * 1.001, "Low": close * 0.999, "Close": close,
+                       "Volume": rng.integers(1, 100_000, len(index)).astype(float)},
+                      index=pd.DatetimeIndex(index, name="timestamp"))
+    return df
+
+
+def mapped(array):
+    """True if `array` is a view of a memory-mapped file."""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def ts(text):
+    return pd.Timestamp(text, tz="America/New_York")
+
+
+def year_reader(store, built=None):
+    """build(year) for MmapStore.read(): the year's stored minutes (years recorded in `built`)."""
+    def build(year):
+        if built is not None:
+            built.append(year)
+        return store.read("TEST", "1Min", ts(f"{year}-01-01"), ts(f"{year}-12-31 23:59:59.999999"))
+    return build
+
+
+def verify_snapshot():
+    ok = True
+    df = minutes("2023-11-01", 120)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetStore(os.path.join(tmp, "parquet"))
+        store.write("TEST", "1Min", df)
+        snapshots = MmapStore(os.path.join(tmp, "mmap"))
+        partitions = store.partitions("TEST", "1Min")
+        built = []
+        build = year_reader(store, built)
+
+        for start, end, one_year in [(None, None, False), (ts("2023-12-29 15:00"), ts("2024-01-02 10:00"), False),
+                                     (ts("2024-03-10 01:00"), ts("2024-03-12 23:00"), True),   # DST change
+                                     (ts("2023-11-20"), ts("2023-12-01"), True),
+                                     (ts("2024-06-01"), ts("2024-06-30"), True)]:              # after the data
+            aware, naive = snapshots.read("TEST", "1Min", partitions, start, end, build=build)
+            expected = store.read("TEST", "1Min", start, end)
+            case = aware.equals(expected) and naive.equals(tz_naive_frame(expected))
+            views = all(mapped(a) for a in (aware._mgr.blocks[0].values, naive._mgr.blocks[0].values,
+                                            aware.index.asi8, naive.index.asi8)) if len(aware) else True
+            case &= views == one_year and len(aware._mgr.blocks) <= 1
+            label = "all" if start is None else f"{start:%Y-%m-%d %H:%M} -> {end:%Y-%m-%d %H:%M}"
+            print(f"   {label}: {len(aware)} bars, aware + naive, {'mapped' if views else 'concatenated'} "
+                  f"{'ok' if case else 'FAIL'}")
+            ok &= case
+        case = sorted(built) == [2023, 2024]
+        print(f"   each year snapshotted once {'ok' if case else 'FAIL'}")
+        ok &= case
+
+        folder = os.path.join(tmp, "mmap", "TEST", "1Min")
+        versions = lambda: {year: os.listdir(os.path.join(folder, year)) for year in sorted(os.listdir(folder))}
+        before = versions()
+        stamp = os.stat(os.path.join(folder, "2023", before["2023"][0], "block.npy")).st_mtime_ns
+        os.makedirs(os.path.join(folder, "0123456789abcdef"))      # whole-history snapshot of the old layout
+        built.clear()
+        store.write("TEST", "1Min", minutes("2024-06-03", 5, seed=1))
+        partitions = store.partitions("TEST", "1Min")
+        aware, _ = snapshots.read("TEST", "1Min", partitions, build=build)
+        after = versions()
+        case = built == [2024] and list(after) == ["2023", "2024"] and after["2023"] == before["2023"]
+        case &= len(after["2024"]) == 1 and after["2024"] != before["2024"]
+        case &= os.stat(os.path.join(folder, "2023", after["2023"][0], "block.npy")).st_mtime_ns == stamp
+        case &= aware.equals(store.read("TEST", "1Min"))
+        print(f"   store changed in 2024: only 2024 rebuilt ({before['2024'][0]} -> {after['2024'][0]}), "
+              f"2023 untouched, old layout dropped {'ok' if case else 'FAIL'}")
+        ok &= case
+
+        half = MmapStore(os.path.join(tmp, "mmap32"), dtype="float32")
+        aware, _ = half.read("TEST", "1Min", partitions, build=build)
+        expected = store.read("TEST", "1Min")
+        case = (aware.dtypes == np.float32).all() and aware.index.equals(expected.index)
+        case &= np.allclose(aware.to_numpy(), expected.to_numpy(), rtol=1e-7, atol=0)
+        print(f"   float32: within {np.max(np.abs(aware.to_numpy() / expected.to_numpy() - 1)):.1e} "
+              f"{'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def verify_data_manager():
+    """
+    get_data() with mmap_frames on returns the same frames as the Parquet path,
+    tz-naive too, and weekly bars derived from minutes across a year end.
+    """
+    from alpaca.data.timeframe import TimeFrame
+    from core.resample import DerivedBars
+    from verify_coverage import data_manager
+    from verify_downloader import FakeClient
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dm = data_manager(tmp, FakeClient())
+        dm.derived = DerivedBars(dm.store, os.path.join(tmp, "derived"))
+        requests = [(datetime(2023, 11, 1), datetime(2024, 3, 1), TimeFrame.Minute, False),
+                    (datetime(2024, 1, 15), datetime(2024, 2, 15), TimeFrame.Minute, True),
+                    (datetime(2023, 11, 1), datetime(2024, 3, 1), TimeFrame.Week, True)]
+        mapped_frames = [dm.get_data("AAA", start, end, timeframe, tz_naive=naive)
+                         for start, end, timeframe, naive in requests]
+        weekly_dir = os.path.join(dm.mapped.root, "AAA", "1Week")
+        weekly = {year: os.listdir(os.path.join(weekly_dir, year)) for year in os.listdir(weekly_dir)}
+        dm.frames = None
+        dm.mapped = None
+        parquet_frames = [dm.get_data("AAA", start, end, timeframe, tz_naive=naive)
+                          for start, end, timeframe, naive in requests]
+        dm.close()
+    case = all(m.equals(p) for m, p in zip(mapped_frames, parquet_frames))
+    case &= mapped(mapped_frames[1].index.asi8) and sorted(weekly) == ["2023", "2024"]
+    print(f"   DataManager: {len(mapped_frames[0])} minute and {len(mapped_frames[2])} weekly bars, "
+          f"same frames with and without mmap {'ok' if case else 'FAIL'}")
+    return case
+
+
+def _rss():
+    """(current, peak) resident set in MB, from /proc."""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                values[line.split(":")[0]] = int(line.split()[1]) / 1024
+    return values["VmRSS"], values["VmHWM"]
+
+
+def measure(mode, tmp):
+    """Runs in a fresh process: loads the whole history once, touches every value, reports time and memory."""
+    base, _ = _rss()
+    t0 = time.perf_counter()
+    if mode == "parquet":
+        df = tz_naive_frame(ParquetStore(os.path.join(tmp, "parquet")).read("TEST", "1Min"))
+    else:
+        store = ParquetStore(os.path.join(tmp, "parquet"))
+        snapshots = MmapStore(os.path.join(tmp, mode), dtype=mode)
+        _, df = snapshots.read("TEST", "1Min", store.partitions("TEST", "1Min"))
+    loaded = time.perf_counter() - t0
+    checksum = float(np.sum(df["Close"].to_numpy(), dtype=np.float64)) + float(df.index.asi8[-1])
+    _ = df.to_numpy().sum(axis=0)       # every page of every column, as a backtest would
+    current, peak = _rss()
+    print(json.dumps({"load": loaded, "rss": current - base, "peak": peak - base, "checksum": checksum}))
+
+
+def benchmark(days=4_000):
+    df = minutes("2010-01-01", days)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetStore(os.path.join(tmp, "parquet"))
+        store.write("TEST", "1Min", df)
+        store.wait()
+        partitions = store.partitions("TEST", "1Min")
+        for dtype in ("float64", "float32"):
+            MmapStore(os.path.join(tmp, dtype), dtype=dtype).read("TEST", "1Min", partitions,
+                                                                   build=year_reader(store))
+        for mode in ("parquet", "float64", "float32"):
+            out = subprocess.run([sys.executable, __file__, "--measure", mode, tmp],
+                                 capture_output=True, text=True, check=True)
+            results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"\nWhole history, {len(df):,} minute bars (load, then every value read), fresh process each:")
+    for mode, label in [("parquet", "Parquet read + tz strip"), ("float64", "mmap float64"),
+                        ("float32", "mmap float32")]:
+        r = results[mode]
+        print(f"   {label:<24} load {r['load'] * 1000:8.2f} ms | resident +{r['rss']:6.1f} MB "
+              f"(peak +{r['peak']:6.1f} MB)")
+    # Same bars read both ways (float32 rounds them, checked above)
+    same = results["parquet"]["checksum"] == results["float64"]["checksum"]
+    return same and results["float64"]["load"] < results["parquet"]["load"] and refresh(df)
+
+
+def refresh(df):
+    """Snapshot upkeep after a day is appended: the changed year only vs. every year."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetStore(os.path.join(tmp, "parquet"))
+        store.write("TEST", "1Min", df)
+        snapshots = MmapStore(os.path.join(tmp, "mmap"))
+        snapshots.read("TEST", "1Min", store.partitions("TEST", "1Min"), build=year_reader(store))
+        store.write("TEST", "1Min", minutes(df.index[-1].normalize().tz_localize(None) + pd.offsets.BDay(), 1))
+        store.wait()
+        partitions = store.partitions("TEST", "1Min")
+        built = []
+        t0 = time.perf_counter()
+        snapshots.read("TEST", "1Min", partitions, build=year_reader(store, built))
+        t1 = time.perf_counter()
+        MmapStore(os.path.join(tmp, "full")).read("TEST", "1Min", partitions, build=year_reader(store))
+        t2 = time.perf_counter()
+    print(f"   after a 1-day append: {len(built)} of {len(partitions)} years re-snapshotted in "
+          f"{(t1 - t0) * 1000:.0f} ms | every year {(t2 - t1) * 1000:.0f} ms")
+    return len(built) == 1
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    ok = verify_snapshot()
+    ok &= verify_data_manager()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,173 @@
+import sys
+import os
+import io
+import time
+import warnings
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+from backtesting import Backtest
+
+from indicators import cache as indicator_cache
+from strategies import MacdCross, LrcReversion, BollingerReversion
+from strategies.trend.macd_cross import get_macd
+from verify_fast_path import synthetic_ohlc
+
+# Multi-output indicators: I_multi() registers every output as its own
+# indicator (names, 2-D outputs, per-output options, DataFrame columns) with
+# the values of one call, rejects a wrong number of declared outputs, and
+# MacdCross on I_multi trades exactly like its former two-I() version, with
+# and without the indicator cache. Last, indicator computations per init.
+
+BT_KWARGS = dict(cash=50_000, commission=0.001, finalize_trades=True)
+
+
+def legacy_get_macd(close, fast, slow, signal, hist=False):
+    """get_macd() before I_multi: lines or histogram, one ta.macd() call each."""
+    macd_df = ta.macd(close=close, fast=fast, slow=slow, signal=signal)
+    if not hist:
+        return macd_df.iloc[:, 0].values, macd_df.iloc[:, 2].values
+    return macd_df.iloc[:, 1].values
+
+
+class LegacyMacdCross(MacdCross):
+    """MacdCross.init() as it was: MACD lines and histogram from two I() calls."""
+
+    def init(self):
+        self.macd_bundle = self.I(legacy_get_macd, pd.Series(self.data.Close), self.macd_fast, self.macd_slow,
+                                  self.macd_signal, False, name=["MACD", "MACD_signal"], overlay=False)
+        self.macd_hist = self.I(legacy_get_macd, pd.Series(self.data.Close), self.macd_fast, self.macd_slow,
+                                self.macd_signal, True, name="MACD_hist", overlay=False)
+
+
+def bands_frame(close, period):
+    mid = pd.Series(close).rolling(period).mean()
+    return pd.DataFrame({"Mid": mid, "Up": mid + 1, "Down": mid - 1})
+
+
+class FrameStrategy(MacdCross):
+    declared = ["Mid", "Up", "Down"]
+
+    def init(self):
+        self.bands = self.I_multi(bands_frame, self.data.Close, 10, outputs=self.declared, overlay=True)
+
+    def next(self):
+        pass
+
+
+class MiscountedStrategy(FrameStrategy):
+    declared = ["Mid", "Up"]
+
+
+def run(strategy, df, **params):
+    with warnings.catch_warnings(), redirect_stdout(io.StringIO()):
+        warnings.simplefilter("ignore")
+        return Backtest(df, strategy, **BT_KWARGS).run(**params)
+
+
+def verify_registration():
+    df = synthetic_ohlc(2_000, 11)
+    ok = True
+
+    strategy = run(MacdCross, df)._strategy
+    (lines, hist), indicators = get_macd(pd.Series(df["Close"].to_numpy()), 12, 26, 9), strategy._indicators
+    case = [ind.name for ind in indicators] == [["MACD", "MACD_signal"], "MACD_hist"]
+    case &= indicators[0].shape == (2, len(df)) and indicators[1].shape == (len(df),)
+    case &= np.array_equal(indicators[0], lines, equal_nan=True) and np.array_equal(indicators[1], hist, equal_nan=True)
+    case &= not any(ind._opts["overlay"] for ind in indicators)
+    print(f"   MacdCross: 2-line MACD + histogram registered from one call {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    strategy = run(LrcReversion, df)._strategy
+    names = [ind.name for ind in strategy._indicators]
+    case = len(names) == 6 and names[:3] == ["LRC_Center", "LRC_Upper", "LRC_Lower"]
+    case &= all(strategy._indicators[i]._opts["overlay"] for i in range(3))
+    case &= len({id(ind) for ind in strategy._indicators}) == 6
+    print(f"   LrcReversion: {len(names)} outputs, own names and options {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    strategy = run(BollingerReversion, df)._strategy
+    bands = strategy._indicators[-3:]
+    case = [ind.name for ind in bands] == ["UpperBB", "MidBB", "LowerBB"]
+    case &= [ind._opts["color"] for ind in bands] == ["purple", "pink", "yellow"]
+    case &= all(ind._opts["overlay"] for ind in bands) and (bands[0] >= bands[2])[~np.isnan(bands[0])].all()
+    print(f"   BollingerReversion: 3 bands with their own colours {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    strategy = run(FrameStrategy, df)._strategy
+    frame = bands_frame(df["Close"].to_numpy(), 10)
+    case = [ind.name for ind in strategy._indicators] == ["Mid", "Up", "Down"]
+    case &= all(np.array_equal(ind, frame[col].to_numpy(), equal_nan=True)
+                for ind, col in zip(strategy._indicators, frame.columns))
+    print(f"   DataFrame result: one output per column {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    try:
+        run(MiscountedStrategy, df)
+        case = False
+    except ValueError as e:
+        case = "returned 3 outputs, but 2 were declared" in str(e)
+    print(f"   outputs miscounted: ValueError {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_macd_trades():
+    ok = True
+    saved = indicator_cache.current_config()
+    try:
+        for enabled in (False, True):
+            indicator_cache.configure(enabled=enabled)
+            for seed, params in [(1, {}), (2, {"macd_fast": 8, "macd_slow": 32, "macd_signal": 5}), (3, {})]:
+                df = synthetic_ohlc(3_000, seed)
+                new, old = run(MacdCross, df, **params), run(LegacyMacdCross, df, **params)
+                case = new._trades.equals(old._trades) and new._equity_curve.equals(old._equity_curve)
+                case &= new["Return [%]"] == old["Return [%]"] and new["# Trades"] > 0
+                print(f"   cache {'on ' if enabled else 'off'} seed {seed} {params or 'defaults'}: "
+                      f"{new['# Trades']} trades, same as the two-I() version {'ok' if case else 'FAIL'}")
+                ok &= case
+    finally:
+        indicator_cache.configure(**(saved or dict(enabled=False)))
+    return ok
+
+
+def benchmark(runs=10):
+    """MACD computations and time for `runs` inits on the same frame (indicator cache off)."""
+    df = synthetic_ohlc(20_000, 4)
+    calls = {"n": 0}
+    original = ta.macd
+
+    def counting(*args, **kwargs):
+        calls["n"] += 1
+        return original(*args, **kwargs)
+
+    ta.macd = counting
+    saved = indicator_cache.current_config()
+    indicator_cache.configure(enabled=False)
+    print()
+    try:
+        for cls in (LegacyMacdCross, MacdCross):
+            calls["n"] = 0
+            t0 = time.perf_counter()
+            for _ in range(runs):
+                run(cls, df)
+            print(f"{cls.__name__:<16} {runs} runs: {calls['n']} ta.macd() calls, {time.perf_counter() - t0:.2f}s")
+    finally:
+        ta.macd = original
+        indicator_cache.configure(**(saved or dict(enabled=False)))
+    return True
+
+
+if __name__ == "__main__":
+    ok = verify_registration()
+    ok &= verify_macd_trades()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,106 @@
+import sys
+import os
+import io
+import csv
+import time
+import tempfile
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+from core.parallel import run_isolated
+from core.report_manager import ReportGenerator
+
+# Failure isolation of run_isolated(): a task that raises, one that kills its
+# process and one that outlives the timeout each come back as a failed result,
+# in submission order, while the tasks around them finish normally. Then
+# several processes appending to one summary log at once: one header, every
+# row intact. Last, pool wall time vs. the same tasks one after the other.
+
+
+def square(x, sleep=0.0):
+    time.sleep(sleep)
+    return x * x
+
+
+def boom(_):
+    raise ValueError("bad symbol")
+
+
+def crash(_):
+    os._exit(3)
+
+
+def hang(_):
+    time.sleep(60)
+
+
+def verify_isolation():
+    tasks = [("a", (square, 2)), ("raise", (boom, 0)), ("b", (square, 3)), ("crash", (crash, 0)),
+             ("hang", (hang, 0)), ("c", (square, 4))]
+    t0 = time.perf_counter()
+    results = list(run_isolated(_call, tasks, workers=3, timeout=2))
+    elapsed = time.perf_counter() - t0
+    by_key = {r.key: r for r in results}
+    case = [r.key for r in results] == [key for key, _ in tasks]
+    case &= [by_key[k].value for k in "abc"] == [4, 9, 16] and all(by_key[k].ok for k in "abc")
+    case &= not by_key["raise"].ok and "ValueError: bad symbol" in by_key["raise"].error
+    case &= not by_key["crash"].ok and "exited with code 3" in by_key["crash"].error
+    case &= not by_key["hang"].ok and "Timed out" in by_key["hang"].error and elapsed < 10
+    print(f"   raise / crash / timeout fail alone, others done, in order ({elapsed:.1f}s) {'ok' if case else 'FAIL'}")
+    return case
+
+
+def _call(func, arg):
+    return func(arg)
+
+
+def _append_rows(path, writer, rows):
+    with redirect_stdout(io.StringIO()):
+        for i in range(rows):
+            ReportGenerator.append_log_row(path, _row(writer, i))
+    return rows
+
+
+def _row(writer, i):
+    row = {field: f"{field}-{writer}-{i}" for field in ReportGenerator.LOG_FIELDS}
+    row["Parameters"] = "x" * 5_000          # Longer than one write() buffer
+    return row
+
+
+def verify_log(writers=4, rows=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "summary_log.csv")
+        results = list(run_isolated(_append_rows, [(w, (path, w, rows)) for w in range(writers)], workers=writers))
+        with open(path, newline="") as f:
+            lines = list(csv.reader(f))
+    header, body = lines[0], lines[1:]
+    expected = {tuple(_row(w, i).values()) for w in range(writers) for i in range(rows)}
+    case = all(r.ok for r in results) and header == ReportGenerator.LOG_FIELDS
+    case &= len(body) == writers * rows and {tuple(line) for line in body} == expected
+    print(f"   {writers} processes x {rows} rows into one log: one header, {len(body)} intact rows "
+          f"{'ok' if case else 'FAIL'}")
+    return case
+
+
+def benchmark(tasks=8, sleep=0.3):
+    work = [(i, (i, sleep)) for i in range(tasks)]
+    t0 = time.perf_counter()
+    sequential = [square(*args) for _, args in work]
+    t1 = time.perf_counter()
+    pooled = [r.value for r in run_isolated(square, work, workers=4)]
+    t2 = time.perf_counter()
+    print(f"\n{tasks} tasks of {sleep}s: one after the other {t1 - t0:.2f}s | 4 workers {t2 - t1:.2f}s")
+    return sequential == pooled
+
+
+if __name__ == "__main__":
+    ok = verify_isolation()
+    ok &= verify_log()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,96 @@
+import sys
+import os
+import io
+import glob
+import tempfile
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import pandas as pd
+
+import config
+import backtest_settings as settings
+from strategies import SmaCross
+from verify_fast_path import synthetic_ohlc
+
+# Parallel BATCH with SHARED_DATA: a symbol without data and one whose load
+# raises are skipped by the parent, a worker that dies mid-backtest fails only
+# its own symbol, the others are logged in BATCH_SYMBOLS order, and every
+# shared-memory segment published for the batch is gone afterwards.
+
+CRASH_CLOSE = 13.0
+
+
+class CrashingSmaCross(SmaCross):
+    """SmaCross whose worker process dies on the frame marked by CRASH_CLOSE."""
+
+    def init(self):
+        super().init()
+        if self.data.Close[0] == CRASH_CLOSE:
+            os._exit(7)
+
+
+def frames():
+    crash = synthetic_ohlc(500, 9)
+    crash["Close"] = CRASH_CLOSE
+    return {"AAA": synthetic_ohlc(500, 1), "EMPTY": pd.DataFrame(), "CRASH": crash, "BBB": synthetic_ohlc(500, 2)}
+
+
+def segments():
+    return set(glob.glob("/dev/shm/psm_*"))
+
+
+def verify_batch():
+    import main
+
+    available = frames()
+
+    def load_frame(symbol, warmup=False):
+        if symbol == "BROKEN":
+            raise ConnectionError("feed down")
+        return available[symbol]
+
+    symbols = ["AAA", "EMPTY", "BROKEN", "CRASH", "BBB"]
+    saved = {name: getattr(settings, name) for name in ("SHARED_DATA", "CHUNKED", "STRATEGY_PARAMS", "WARMUP")}
+    saved_output = config.OUTPUT_DIR
+    settings.SHARED_DATA, settings.CHUNKED, settings.STRATEGY_PARAMS, settings.WARMUP = True, False, {}, False
+    before = segments()
+    out = io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Workers fork from here and build their own engine: they write under tmp too
+            config.OUTPUT_DIR = tmp
+            with redirect_stdout(out):
+                engine = main.BacktestEngine(CrashingSmaCross)
+                engine._load_frame = load_frame
+                done = engine._run_batch_parallel(symbols, workers=2)
+                engine.dm.close()
+            log = pd.read_csv(engine._log_path())
+    finally:
+        config.OUTPUT_DIR = saved_output
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+    text = out.getvalue()
+    case = done == 2 and list(log["Symbol"]) == ["AAA", "BBB"]
+    case &= "[EMPTY] Skipped (no data)" in text and "[BROKEN] Failed to load: ConnectionError" in text
+    case &= "[CRASH] Failed: Worker exited with code 7" in text
+    print(f"   empty and failing loads skipped, crashed worker fails alone, {done} symbols logged "
+          f"{'ok' if case else 'FAIL'}")
+    ok = case
+
+    leaked = segments() - before
+    case = not leaked
+    print(f"   shared-memory segments released ({len(leaked)} left) {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+if __name__ == "__main__":
+    ok = verify_batch()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
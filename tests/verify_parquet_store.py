@@ -0,0 +1,150 @@
+import sys
+import os
+import time
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from core.parquet_store import ParquetStore
+
+# The year-partitioned store against a plain DataFrame: migration of a legacy
+# single file, range reads (read() and iter_batches()), upserts across a year
+# boundary, append-only parts + background compaction, then the cost of a
+# one-month read and of a daily append on ~10 years of minute bars.
+
+
+def synthetic_minutes(start, n_bars, seed=0):
+    """Regular-hours minute bars (390 a day, weekdays), tz-aware like the Alpaca frames."""
+    days = pd.bdate_range(start, periods=n_bars // 390 + 1, tz="America/New_York")
+    index = (days.repeat(390) + pd.to_timedelta(np.tile(np.arange(390), len(days)), unit="min")
+             + pd.Timedelta(hours=9, minutes=30))[:n_bars]
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, n_bars)))
+    df = pd.DataFrame({"Open": close, "High": close * 1.001, "Low": close * 0.999,
+                       "Close": close, "Volume": 1000.0}, index=index)
+    df.index.name = "timestamp"
+    return df
+
+
+def ts(text):
+    return pd.Timestamp(text, tz="America/New_York")
+
+
+def same_frame(expected, actual):
+    if expected.empty or actual.empty:
+        return expected.empty and actual.empty
+    return (np.array_equal(expected.index.as_unit("us").asi8, actual.index.as_unit("us").asi8)
+            and np.array_equal(expected.to_numpy(), actual.to_numpy()))
+
+
+def verify_store():
+    ok = True
+    df = synthetic_minutes("2022-11-01", 150_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetStore(os.path.join(tmp, "parquet"))
+
+        legacy = os.path.join(tmp, "TEST_1Min.parquet")
+        df.to_parquet(legacy)
+        ok &= store.migrate("TEST", "1Min", legacy) and not os.path.exists(legacy)
+        years = sorted(os.listdir(os.path.join(tmp, "parquet", "TEST", "1Min")))
+        print(f"   migrated into {years}")
+        ok &= store.stored_range("TEST", "1Min") == (df.index[0], df.index[-1])
+
+        for start, end in [(None, None), (ts("2023-03-01"), ts("2023-04-01")),
+                           (ts("2023-12-29 15:00"), ts("2024-01-02 10:00")),
+                           (ts("2020-01-01"), ts("2022-11-02")), (ts("2030-01-01"), None)]:
+            expected = df.loc[start:end]
+            case = same_frame(expected, store.read("TEST", "1Min", start, end))
+            batches = list(store.iter_batches("TEST", "1Min", start, end, batch_rows=7_000))
+            case &= all(len(b) <= 7_000 for b in batches)
+            case &= same_frame(expected, pd.concat(batches) if batches else pd.DataFrame())
+            print(f"   read {start} -> {end}: {len(expected)} rows {'ok' if case else 'FAIL'}")
+            ok &= case
+
+        # Upsert: overlapping rows are replaced, new ones added on both sides of a year boundary
+        update = synthetic_minutes("2023-12-20", 6_000, seed=1)
+        store.write("TEST", "1Min", update)
+        expected = pd.concat([df, update]).sort_index(kind="stable")
+        expected = expected[~expected.index.duplicated(keep="last")]
+        case = same_frame(expected, store.read("TEST", "1Min"))
+        print(f"   upsert of {len(update)} rows across a year boundary {'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def verify_append_only(compact_after=4):
+    """Daily appends add parts without touching stored ones; reads stay right before and after compaction."""
+    ok = True
+    df = synthetic_minutes("2023-06-01", 390 * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetStore(tmp, compact_after=compact_after)
+        store.write("TEST", "1Min", df.iloc[:390 * 50])
+        folder = os.path.join(tmp, "TEST", "1Min", "year=2023")
+        first_part = os.path.join(folder, "part-00000.parquet")
+        stamp = os.stat(first_part).st_mtime_ns
+
+        for day in range(50, 50 + compact_after - 1):
+            store.write("TEST", "1Min", df.iloc[390 * day:390 * (day + 1)])
+        parts = sorted(os.listdir(folder))
+        case = len(parts) == compact_after and os.stat(first_part).st_mtime_ns == stamp
+        expected = df.iloc[:390 * (50 + compact_after - 1)]
+        case &= same_frame(expected, store.read("TEST", "1Min"))
+        batches = list(store.iter_batches("TEST", "1Min", batch_rows=5_000))
+        case &= same_frame(expected, pd.concat(batches))
+        print(f"   {len(parts)} parts after {compact_after - 1} appends, first part untouched {'ok' if case else 'FAIL'}")
+        ok &= case
+
+        # A re-downloaded bar with a corrected value wins, then one more part triggers compaction
+        fix = df.iloc[[390 * 10]].copy()
+        fix["Close"] = -1.0
+        store.write("TEST", "1Min", fix)
+        store.wait()
+        expected = df.iloc[:390 * (50 + compact_after - 1)].copy()
+        expected.iloc[390 * 10, expected.columns.get_loc("Close")] = -1.0
+        parts = sorted(os.listdir(folder))
+        case = parts == [f"part-{compact_after:05d}.parquet"] and same_frame(expected, store.read("TEST", "1Min"))
+        print(f"   compacted into {parts}, newest value kept {'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def benchmark(n_bars=1_000_000):
+    df = synthetic_minutes("2015-01-01", n_bars)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "TEST_1Min.parquet")
+        df.to_parquet(legacy)
+        store = ParquetStore(os.path.join(tmp, "parquet"))
+        store.write("TEST", "1Min", df)
+
+        start, end = ts("2020-03-01"), ts("2020-04-01")
+        t0 = time.perf_counter()
+        whole = pd.read_parquet(legacy).loc[start:end]
+        t1 = time.perf_counter()
+        month = store.read("TEST", "1Min", start, end)
+        t2 = time.perf_counter()
+        print(f"\nOne month of {n_bars:,} minute bars: whole file + slice {t1 - t0:.3f}s | "
+              f"partitioned, pushed-down filter {t2 - t1:.3f}s ({len(month)} rows)")
+
+        day = synthetic_minutes(df.index[-1].normalize() + pd.Timedelta(days=1), 390, seed=2)
+        t0 = time.perf_counter()
+        pd.concat([pd.read_parquet(legacy), day]).to_parquet(legacy)
+        t1 = time.perf_counter()
+        store.write("TEST", "1Min", day)
+        t2 = time.perf_counter()
+        print(f"Appending one day: full-file rewrite {t1 - t0:.3f}s | new part {t2 - t1:.3f}s")
+        return same_frame(whole, month)
+
+
+if __name__ == "__main__":
+    ok = verify_store()
+    ok &= verify_append_only()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,157 @@
+import sys
+import os
+import io
+import time
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import pandas as pd
+from backtesting import Backtest
+
+from core.pipeline import Pipeline, Stage
+from strategies import SmaCross
+from verify_fast_path import synthetic_ohlc
+
+# The staged BATCH pipeline: outcomes in input order, with failed and skipped
+# items passing through the later stages untouched; the loader held back by
+# the backlog of frames waiting to be backtested and by the byte budget; stage
+# timings that name the slow stage; threads gone when the caller stops early.
+# Last, load (disk + simulated download latency) -> Backtest -> HTML report
+# for a batch of symbols, one at a time vs. pipelined.
+
+
+def verify_outcomes():
+    def load(key, _):
+        if key == "missing":
+            return None
+        if key == "broken":
+            raise ValueError("bad data")
+        return key.upper()
+
+    reported = []
+    pipeline = Pipeline([Stage("load", load), Stage("report", lambda key, value: reported.append(value) or value)])
+    outcomes = list(pipeline.run((key, None) for key in ["a", "missing", "b", "broken", "c"]))
+    case = [o.key for o in outcomes] == ["a", "missing", "b", "broken", "c"]
+    case &= [o.value for o in outcomes] == ["A", None, "B", None, "C"] and reported == ["A", "B", "C"]
+    case &= [o.stage for o in outcomes] == [None, "load", None, "load", None]
+    case &= [o.ok for o in outcomes] == [True, True, True, False, True] and "bad data" in outcomes[3].error
+    case &= pipeline.stats[0].failed == 1 and pipeline.stats[1].items == 3
+    print(f"   in order; skipped and failed items stop at their stage {'ok' if case else 'FAIL'}")
+    return case
+
+
+def verify_backpressure(backlog=2):
+    lock = threading.Lock()
+    counts = {"loaded": 0, "started": 0, "ahead": 0}
+
+    def load(key, _):
+        with lock:
+            counts["loaded"] += 1
+            counts["ahead"] = max(counts["ahead"], counts["loaded"] - counts["started"])
+        return key
+
+    def backtest(key, value):
+        with lock:
+            counts["started"] += 1
+        time.sleep(0.02)
+        return value
+
+    pipeline = Pipeline([Stage("load", load), Stage("backtest", backtest, backlog=backlog)])
+    list(pipeline.run((i, None) for i in range(20)))
+    # `backlog` waiting, one being put: never more loaded ahead of the backtest
+    case = counts["ahead"] <= backlog + 1
+    print(f"   backlog {backlog}: loader at most {counts['ahead']} symbols ahead {'ok' if case else 'FAIL'}")
+    ok = case
+
+    frame_mb, budget_mb = 100, 250
+    pipeline = Pipeline([Stage("load", lambda key, _: key), Stage("backtest", backtest, backlog=10)],
+                        max_bytes=budget_mb * 2**20, sizeof=lambda _: frame_mb * 2**20)
+    list(pipeline.run((i, None) for i in range(10)))
+    peak = pipeline.budget.peak / 2**20
+    case = peak <= budget_mb and pipeline.budget.used == 0 and pipeline.stats[0].blocked > 0.05
+    print(f"   {budget_mb} MB budget, {frame_mb} MB frames: peak {peak:.0f} MB in flight, "
+          f"loader blocked {pipeline.stats[0].blocked:.2f}s {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    # One frame over budget still goes through (alone)
+    pipeline = Pipeline([Stage("load", lambda key, _: key)], max_bytes=10, sizeof=lambda _: 100)
+    case = [o.value for o in pipeline.run((i, None) for i in range(3))] == [0, 1, 2]
+    print(f"   a frame larger than the budget runs alone {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_timing(items=10):
+    sleeps = {"load": 0.03, "backtest": 0.08, "report": 0.04}
+    stages = [Stage(name, lambda key, value, s=s: time.sleep(s) or key) for name, s in sleeps.items()]
+    pipeline = Pipeline(stages)
+    list(pipeline.run((i, None) for i in range(items)))
+    stats = {s.name: s for s in pipeline.stats}
+    sequential = items * sum(sleeps.values())
+    summary = pipeline.summary()
+    case = pipeline.elapsed < 0.8 * sequential and "Bottleneck: backtest" in summary
+    case &= stats["backtest"].starved < stats["report"].starved
+    print(f"   sleeping stages: {pipeline.elapsed:.2f}s vs {sequential:.2f}s one at a time, "
+          f"bottleneck found {'ok' if case else 'FAIL'}")
+    ok = case
+
+    before = threading.active_count()
+    pipeline = Pipeline([Stage("load", lambda key, _: key), Stage("slow", lambda key, v: time.sleep(0.01) or v)])
+    for outcome in pipeline.run((i, None) for i in range(1000)):
+        if outcome.key == 5:
+            break
+    time.sleep(0.3)
+    case = threading.active_count() == before
+    print(f"   caller stops early: stage threads exit {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def benchmark(symbols=6, bars=4_000, latency=0.3):
+    """A BATCH run's stages on real work; `latency` stands in for a download's network wait."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(symbols):
+            synthetic_ohlc(bars, i).to_parquet(os.path.join(tmp, f"S{i}.parquet"))
+
+        def load(symbol, _):
+            time.sleep(latency)
+            return pd.read_parquet(os.path.join(tmp, f"{symbol}.parquet"))
+
+        def backtest(symbol, df):
+            bt = Backtest(df, SmaCross, cash=50_000, commission=0.001, finalize_trades=True)
+            return bt, bt.run()
+
+        def report(symbol, result):
+            bt, stats = result
+            bt.plot(filename=os.path.join(tmp, f"{symbol}.html"), open_browser=False)
+            return round(stats["Return [%]"], 6)
+
+        keys = [f"S{i}" for i in range(symbols)]
+        with redirect_stdout(io.StringIO()):
+            report(keys[0], backtest(keys[0], load(keys[0], None)))     # imports, bokeh warm-up
+            t0 = time.perf_counter()
+            sequential = [report(key, backtest(key, load(key, None))) for key in keys]
+            t1 = time.perf_counter()
+            pipeline = Pipeline([Stage("load", load), Stage("backtest", backtest, backlog=2),
+                                 Stage("report", report)])
+            pipelined = [o.value for o in pipeline.run((key, None) for key in keys)]
+            t2 = time.perf_counter()
+
+    print(f"\n{symbols} symbols x {bars:,} bars, load ({latency:.1f}s latency) -> Backtest -> HTML report:")
+    print(f"   one at a time {t1 - t0:.2f}s | pipelined {t2 - t1:.2f}s")
+    print(pipeline.summary())
+    return sequential == pipelined and t2 - t1 < t1 - t0
+
+
+if __name__ == "__main__":
+    ok = verify_outcomes()
+    ok &= verify_backpressure()
+    ok &= verify_timing()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
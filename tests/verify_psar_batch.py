@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+
+from indicators.technical import parabolic_sar, parabolic_sar_batch
+
+# Every row of parabolic_sar_batch() must equal the scalar parabolic_sar() for
+# that (af_step, max_af) exactly; then the two are timed on a sweep-sized grid.
+
+
+def synthetic_high_low(n_bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    spread = np.abs(rng.normal(0, 0.004, n_bars))
+    index = pd.date_range("2024-01-01", periods=n_bars, freq="h")
+    return pd.Series(close * (1 + spread), index=index), pd.Series(close * (1 - spread), index=index)
+
+
+def sar_grid(n_steps, n_max):
+    af_step, max_af = np.meshgrid(np.linspace(0.01, 0.04, n_steps), np.linspace(0.1, 0.4, n_max))
+    return af_step.ravel(), max_af.ravel()
+
+
+def verify_psar_batch():
+    ok = True
+    for seed, n_bars in enumerate([1, 2, 3, 500, 5000]):
+        high, low = synthetic_high_low(n_bars, seed)
+        af_step, max_af = sar_grid(4, 5)
+
+        batch = parabolic_sar_batch(high, low, af_step, max_af)
+        scalar = np.array([parabolic_sar(high, low, a, m).values for a, m in zip(af_step, max_af)])
+        same = batch.shape == scalar.shape and np.array_equal(batch, scalar)
+        print(f"   {n_bars:>5} bars x {len(af_step)} combinations: {'identical' if same else 'MISMATCH'}")
+        ok &= same
+
+    # Scalars broadcast to a single row
+    high, low = synthetic_high_low(300, 7)
+    ok &= np.array_equal(parabolic_sar_batch(high, low)[0], parabolic_sar(high, low).values)
+    return ok
+
+
+def benchmark(n_bars=5000):
+    high, low = synthetic_high_low(n_bars, 42)
+    print()
+    for n_steps, n_max in [(5, 5), (10, 10), (20, 20)]:
+        af_step, max_af = sar_grid(n_steps, n_max)
+
+        start = time.perf_counter()
+        parabolic_sar_batch(high, low, af_step, max_af)
+        batch = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for a, m in zip(af_step, max_af):
+            parabolic_sar(high, low, a, m)
+        scalar = time.perf_counter() - start
+
+        print(f"{n_bars} bars x {len(af_step):>3} combinations: batch {batch:.3f}s | "
+              f"one loop per combination {scalar:.3f}s | {scalar / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    ok = verify_psar_batch()
+    benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
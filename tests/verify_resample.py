@@ -0,0 +1,187 @@
+import sys
+import os
+import time
+import tempfile
+from datetime import datetime
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import numpy as np
+import pandas as pd
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+
+from core.market_calendar import sessions
+from core.parquet_store import ParquetStore
+from core.resample import DerivedBars, resample_bars
+from verify_coverage import data_manager
+from verify_downloader import FakeClient
+
+# Bars derived from minutes against pandas' own resample/groupby of the session
+# minutes (across DST changes, holidays, early closes and year ends, with
+# extended-hours minutes mixed in), then the per-year cache: built once, reused, rebuilt only for the year
+# whose minute partition changed, and DataManager serving 1Hour from stored
+# minutes. Last, derived vs pandas resample timing.
+
+OHLCV = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def extended_minutes(start, days, seed=0):
+    """04:00-20:00 minute bars on weekdays, tz-aware New York (as stored before the session filter)."""
+    dates = pd.bdate_range(start, periods=days)
+    index = (dates.repeat(960) + pd.to_timedelta(np.tile(np.arange(960), len(dates)), unit="min")
+             + pd.Timedelta(hours=4)).tz_localize("America/New_York")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, len(index))))
+    df = pd.DataFrame({"Open": close * (1 + rng.normal(0, 1e-4, len(index))),
+                       "High": close * 1.001, "Low": close * 0.999, "Close": close,
+                       "Volume": rng.integers(1, 1000, len(index)).astype(float)}, index=index)
+    df.index.name = "timestamp"
+    return df
+
+
+def session(df):
+    """Minutes of the trading sessions (the calendar's table, not its masks), 09:30 to the close."""
+    calendar = sessions(df.index[0], df.index[-1])
+    wall = df.index.tz_localize(None)
+    close = calendar["close"].dt.tz_localize(None).reindex(wall.normalize()).to_numpy()
+    return df[(wall >= wall.normalize() + pd.Timedelta(hours=9, minutes=30)) & (wall <= close)]
+
+
+def reference(minutes, timeframe):
+    """pandas' take on the same bars: left-labeled, clock-aligned, empty bars dropped."""
+    df = session(minutes)
+    wall = df.tz_localize(None)
+    unit, amount = timeframe.unit, timeframe.amount
+    if unit in (TimeFrameUnit.Minute, TimeFrameUnit.Hour):
+        rule = f"{amount}{'min' if unit == TimeFrameUnit.Minute else 'h'}"
+        out = wall.resample(rule, label="left", closed="left", origin="start_day").agg(OHLCV).dropna()
+    elif unit == TimeFrameUnit.Day:
+        out = wall.groupby(wall.index.normalize()).agg(OHLCV)
+    elif unit == TimeFrameUnit.Week:
+        out = wall.groupby(wall.index.to_period("W-SUN").start_time).agg(OHLCV)
+    else:
+        months = wall.index.to_period("M").asfreq("M")
+        starts = pd.PeriodIndex(
+            [pd.Period(year=p.year, month=(p.month - 1) // amount * amount + 1, freq="M") for p in months])
+        out = wall.groupby(starts.to_timestamp()).agg(OHLCV)
+    out.index = pd.DatetimeIndex(out.index).as_unit("ns").tz_localize("America/New_York")
+    return out
+
+
+def same_bars(expected, actual):
+    return (len(expected) == len(actual)
+            and np.array_equal(expected.index.as_unit("ns").asi8, actual.index.as_unit("ns").asi8)
+            and np.allclose(expected.to_numpy(), actual.to_numpy()))
+
+
+TIMEFRAMES = [TimeFrame(5, TimeFrameUnit.Minute), TimeFrame(15, TimeFrameUnit.Minute), TimeFrame.Hour,
+              TimeFrame(4, TimeFrameUnit.Hour), TimeFrame.Day, TimeFrame.Week, TimeFrame(3, TimeFrameUnit.Month)]
+
+
+def verify_bars():
+    ok = True
+    # Spans the March and November DST changes and a year end
+    minutes = extended_minutes("2023-02-20", 240)
+    for timeframe in TIMEFRAMES:
+        derived = resample_bars(minutes, timeframe)
+        case = same_bars(reference(minutes, timeframe), derived)
+        if timeframe.value == "1Hour":
+            # Clock-aligned: the 09:00 bar opens with the 09:30 minute (February 20th is Presidents' Day)
+            first = derived.index[0].tz_localize(None)
+            case &= first == pd.Timestamp("2023-02-21 09:00") and derived.iloc[0]["Open"] == minutes.at[
+                pd.Timestamp("2023-02-21 09:30", tz="America/New_York"), "Open"]
+        print(f"   {timeframe.value:<7} {len(derived):>6} bars {'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def ts(text):
+    return pd.Timestamp(text, tz="America/New_York")
+
+
+def verify_cache():
+    ok = True
+    minutes = session(extended_minutes("2023-06-01", 300))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetStore(os.path.join(tmp, "parquet"))
+        store.write("TEST", "1Min", minutes)
+        derived = DerivedBars(store, os.path.join(tmp, "derived"))
+        start, end = ts("2023-09-01"), ts("2024-06-30")
+
+        for timeframe in [TimeFrame.Hour, TimeFrame.Week]:
+            expected = reference(minutes, timeframe)
+            expected = expected[(expected.index >= start) & (expected.index <= end)]
+            case = same_bars(expected, derived.read("TEST", timeframe, start, end))
+            print(f"   {timeframe.value} from the cache, {start:%Y-%m-%d} -> {end:%Y-%m-%d} {'ok' if case else 'FAIL'}")
+            ok &= case
+
+        folder = os.path.join(tmp, "derived", "TEST", "1Hour")
+        stamps = {name: os.stat(os.path.join(folder, name)).st_mtime_ns for name in os.listdir(folder)}
+        derived.read("TEST", TimeFrame.Hour, start, end)
+        case = stamps == {name: os.stat(os.path.join(folder, name)).st_mtime_ns for name in os.listdir(folder)}
+
+        # New minutes in 2024 only: that year is rebuilt, 2023 is reused
+        extra = session(extended_minutes("2024-08-26", 3, seed=1))
+        store.write("TEST", "1Min", extra)
+        after = derived.read("TEST", TimeFrame.Hour, start, ts("2024-12-31"))
+        case &= os.stat(os.path.join(folder, "2023.parquet")).st_mtime_ns == stamps["2023.parquet"]
+        case &= os.stat(os.path.join(folder, "2024.parquet")).st_mtime_ns != stamps["2024.parquet"]
+        expected = reference(pd.concat([minutes, extra]), TimeFrame.Hour)
+        case &= same_bars(expected[expected.index >= start], after)
+        print(f"   cache reused, only the changed year rebuilt {'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def verify_data_manager():
+    """
+    derive_bars="auto": 1Hour bars of a range the stored minutes cover come from
+    them, no request; a range they only partly cover is downloaded as 1Hour.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        client = FakeClient()
+        dm = data_manager(tmp, client)
+        dm.derived = DerivedBars(dm.store, os.path.join(tmp, "derived"))
+        minutes = dm.get_data("AAA", datetime(2024, 1, 1), datetime(2024, 3, 1))
+        minute_rows = dm._coverage("AAA", "1Min").rows
+        calls = len(client.calls)
+        hours = dm.get_data("AAA", datetime(2024, 1, 1), datetime(2024, 3, 1), TimeFrame.Hour)
+        case = len(client.calls) == calls and same_bars(reference(minutes, TimeFrame.Hour), hours)
+        case &= dm._coverage("AAA", "1Hour").empty
+        print(f"   DataManager: {len(hours)} 1Hour bars from stored minutes, no request {'ok' if case else 'FAIL'}")
+        ok = case
+
+        ny = lambda day: pd.Timestamp(day, tz="America/New_York")
+        wider = dm._source("AAA", TimeFrame.Hour, ny("2024-01-01"), ny("2024-06-01"))
+        none = dm._source("BBB", TimeFrame.Hour, ny("2024-01-01"), ny("2024-03-01"))
+        dm.get_data("AAA", datetime(2024, 1, 1), datetime(2024, 6, 1), TimeFrame.Hour)
+        case = wider.value == none.value == "1Hour" and len(client.calls) > calls
+        case &= not dm._coverage("AAA", "1Hour").empty and dm._coverage("AAA", "1Min").rows == minute_rows
+        dm.close()
+    print(f"   range past the stored minutes: 1Hour downloaded, no minutes fetched {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def benchmark(days=2_500):
+    minutes = session(extended_minutes("2015-01-01", days))
+    t0 = time.perf_counter()
+    derived = resample_bars(minutes, TimeFrame.Hour)
+    t1 = time.perf_counter()
+    expected = reference(minutes, TimeFrame.Hour)
+    t2 = time.perf_counter()
+    print(f"\n1Hour bars from {len(minutes):,} minutes: derived {t1 - t0:.3f}s | "
+          f"pandas resample (+ session filter) {t2 - t1:.3f}s")
+    return same_bars(expected, derived)
+
+
+if __name__ == "__main__":
+    ok = verify_bars()
+    ok &= verify_cache()
+    ok &= verify_data_manager()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
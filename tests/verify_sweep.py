@@ -0,0 +1,112 @@
+import sys
+import os
+import io
+import tempfile
+import warnings
+import subprocess
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import pandas as pd
+from alpaca.data.timeframe import TimeFrame
+from backtesting import Backtest
+
+from optimization import IntRange, FloatRange, Choice, build_grid, space_size, SweepPool, rank_results, best_params
+from optimization.sweep import METRICS
+from core.report_manager import ReportGenerator
+from strategies import SmaCross, MonthlyDCA
+from verify_fast_path import synthetic_ohlc
+
+# Parameter grids and sweeps: range expansion, param_constraint filtering, the
+# reproducible max_tries subset, SweepPool rows (in-process and across workers)
+# against plain Backtest runs with failed sets as Error rows, save_sweep's CSVs,
+# and that strategies import without API keys (no engine stack behind
+# optimization.param_space).
+
+BT_KWARGS = dict(cash=50_000, commission=0.001, finalize_trades=True)
+
+
+def verify_grid():
+    case = IntRange(10, 50, 10).values() == [10, 20, 30, 40, 50]
+    case &= FloatRange(0.1, 0.3, 0.1).values() == [0.1, 0.2, 0.3] and Choice((1.5, 2)).values() == [1.5, 2]
+    grid = build_grid(SmaCross)
+    expected = [{"n1": a, "n2": b} for a in range(5, 31, 5) for b in range(10, 101, 10) if a < b]
+    case &= space_size(SmaCross.param_space) == 60 and grid == expected
+    print(f"   SmaCross: {len(grid)} of {space_size(SmaCross.param_space)} combinations pass n1 < n2 "
+          f"{'ok' if case else 'FAIL'}")
+    ok = case
+
+    subset = build_grid(SmaCross, max_tries=10, seed=3)
+    case = len(subset) == 10 and subset == build_grid(SmaCross, max_tries=10, seed=3)
+    case &= all(p in grid for p in subset) and subset == [p for p in grid if p in subset]
+    case &= subset != build_grid(SmaCross, max_tries=10, seed=4)
+    print(f"   max_tries=10: same subset for the same seed, in grid order {'ok' if case else 'FAIL'}")
+    ok &= case
+
+    try:
+        build_grid(MonthlyDCA)
+        case = False
+    except ValueError:
+        case = True
+    print(f"   no param_space: ValueError {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_sweep():
+    df = synthetic_ohlc(2_000, 5)
+    param_sets = build_grid(SmaCross, max_tries=6) + [{"n1": 10, "n2": 20, "no_such_param": 1}]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = [{**p, **{m: Backtest(df, SmaCross, **BT_KWARGS).run(**p)[m] for m in METRICS}}
+                    for p in param_sets[:-1]]
+    ok = True
+    for workers in (1, 2):
+        with redirect_stdout(io.StringIO()), SweepPool(df, SmaCross, BT_KWARGS, workers=workers) as pool:
+            results = pool.evaluate(param_sets)
+            window = pool.evaluate(param_sets[:2], window=(0, 1_000))
+        rows = results[["n1", "n2", *METRICS]].iloc[:-1].to_dict("records")
+        case = rows == expected and results["Error"].iloc[:-1].isna().all()
+        case &= "no_such_param" in results["Error"].iloc[-1] and len(window) == 2
+        case &= pool.bars_simulated == 2_000 * len(param_sets) + 1_000 * 2
+        print(f"   SweepPool workers={workers}: {len(results)} rows same as Backtest, bad set as Error row "
+              f"{'ok' if case else 'FAIL'}")
+        ok &= case
+
+    ranked = rank_results(results, "Sharpe Ratio")
+    best = best_params(results, "Sharpe Ratio", ["n1", "n2"])
+    with tempfile.TemporaryDirectory() as tmp:
+        grid_path, top_path = ReportGenerator.save_sweep(ranked, "SmaCross", "TEST", TimeFrame.Hour, top_n=3,
+                                                         output_dir=tmp)
+        saved, top = pd.read_csv(grid_path), pd.read_csv(top_path)
+    case = len(saved) == len(results) and len(top) == 3
+    case &= {"n1": int(top.at[0, "n1"]), "n2": int(top.at[0, "n2"])} == best and type(best["n1"]) is int
+    case &= list(saved["Sharpe Ratio"].dropna()) == sorted(saved["Sharpe Ratio"].dropna(), reverse=True)
+    print(f"   save_sweep: full grid + top 3, best first {best} {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_imports():
+    """Strategies (and optimization's grid helpers) import in a process without API keys."""
+    env = {k: v for k, v in os.environ.items() if k not in ("ALPACA_API_KEY", "ALPACA_SECRET_KEY")}
+    code = ("import sys, strategies, optimization; from optimization import build_grid; "
+            "print(sorted(m for m in ('config', 'core.data_manager', 'optimization.sweep') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.join(PROJECT_ROOT, "src"), env=env,
+                         capture_output=True, text=True)
+    case = out.returncode == 0 and out.stdout.strip() == "[]"
+    print(f"   strategies import without API keys, engine modules not loaded {'ok' if case else 'FAIL'}")
+    if not case:
+        print(out.stderr[-500:])
+    return case
+
+
+if __name__ == "__main__":
+    ok = verify_grid()
+    ok &= verify_sweep()
+    ok &= verify_imports()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,122 @@
+import sys
+import os
+import io
+import warnings
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import pandas as pd
+from backtesting import Backtest
+
+from core.warmup import lookback_bars
+from optimization import SweepPool, walk_forward, make_folds
+from optimization.walk_forward import stitch_equity
+from strategies import SmaCross, LrcReversion
+from verify_fast_path import synthetic_ohlc
+
+# Walk-forward: fold layout (rolling and anchored, a short tail merged into
+# the last fold), chaining of per-fold equity curves, test windows shorter
+# than the strategy's lookback still trading from their first bar (lookback
+# from core.warmup, not measured on the test window), and a fold that raises
+# coming back as an Error row while the other folds finish.
+
+BT_KWARGS = dict(cash=50_000, finalize_trades=True)
+FAIL_AT = None
+
+
+class FailingSmaCross(SmaCross):
+    """SmaCross that raises once it reaches FAIL_AT."""
+
+    def next(self):
+        if self.data.index[-1] >= FAIL_AT:
+            raise RuntimeError("feed glitch")
+        super().next()
+
+
+def verify_folds():
+    ok = True
+    cases = [(1_000, False, [(500, 600), (600, 700), (700, 800), (800, 900), (900, 1_000)]),
+             (1_099, False, [(500, 600), (600, 700), (700, 800), (800, 900), (900, 1_099)]),
+             (1_001, False, [(500, 600), (600, 700), (700, 800), (800, 900), (900, 1_001)]),
+             (550, False, [(500, 550)]),
+             (1_099, True, [(500, 600), (600, 700), (700, 800), (800, 900), (900, 1_099)])]
+    for n, anchored, tests in cases:
+        folds = make_folds(n, 500, 100, anchored=anchored)
+        case = [f.test for f in folds] == tests and [f.fold for f in folds] == list(range(len(tests)))
+        case &= all(f.train == ((0 if anchored else f.test[0] - 500), f.test[0]) for f in folds)
+        print(f"   {n} bars, 500 train / 100 test{' anchored' if anchored else ''}: "
+              f"{len(folds)} folds, last test {folds[-1].test} {'ok' if case else 'FAIL'}")
+        ok &= case
+
+    try:
+        make_folds(500, 500, 100)
+        case = False
+    except ValueError:
+        case = True
+    print(f"   no bar after the train window: ValueError {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_stitch():
+    index = pd.date_range("2024-01-01", periods=5, freq="D")
+    curves = [pd.Series([100.0, 110.0], index=index[:2]), pd.Series([50.0, 55.0, 44.0], index=index[2:])]
+    equity = stitch_equity(curves, 1_000)
+    case = list(equity.round(6)) == [1_000, 1_100, 1_100, 1_210, 968] and list(equity.index) == list(index)
+    print(f"   two folds chained from 1000: {list(equity.round(2))} {'ok' if case else 'FAIL'}")
+    return case
+
+
+def verify_short_test_windows():
+    """Test windows of 150 bars (250 with the tail) for a strategy that needs 238+ bars of history."""
+    df = synthetic_ohlc(1_300, 6)
+    param_sets = [{"lrc_window": 40}, {"lrc_window": 60}]
+    with redirect_stdout(io.StringIO()), SweepPool(df, LrcReversion, BT_KWARGS, workers=1) as pool:
+        folds, equity, oos = walk_forward(pool, param_sets, "Return [%]", train_bars=600, test_bars=150)
+
+    ok = "Error" not in folds and len(equity) == len(df) - 600
+    for fold in make_folds(len(df), 600, 150):
+        row = folds.iloc[fold.fold]
+        bars = lookback_bars(LrcReversion, {"lrc_window": int(row["lrc_window"])})
+        start = fold.test[0] - bars - 1
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ref = Backtest(df.iloc[start:fold.test[1]], LrcReversion, **BT_KWARGS).run(lrc_window=int(row["lrc_window"]))
+        # next() first runs on the first test bar, and the fold reports the trades from there
+        case = 1 + ref._strategy.warmup_bars() == bars + 1 and row["Test_Start"] == df.index[fold.test[0]]
+        case &= row["Test # Trades"] == (ref._trades["EntryBar"] >= bars + 1).sum()
+        case &= row["Test_Bars"] == fold.test[1] - fold.test[0]
+        print(f"   fold {fold.fold}: {row['Test_Bars']} test bars, lookback {bars}, first decision on the first "
+              f"test bar, {row['Test # Trades']} trades {'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def verify_failing_fold():
+    global FAIL_AT
+    df = synthetic_ohlc(1_000, 7)
+    folds_layout = make_folds(len(df), 500, 100)
+    FAIL_AT = df.index[folds_layout[-1].test[0] + 10]
+    param_sets = [{"n1": 5, "n2": 20}, {"n1": 10, "n2": 30}]
+    with redirect_stdout(io.StringIO()), SweepPool(df, FailingSmaCross, BT_KWARGS, workers=2) as pool:
+        folds, equity, oos = walk_forward(pool, param_sets, "Return [%]", train_bars=500, test_bars=100)
+
+    errors = folds["Error"]
+    case = len(folds) == len(folds_layout) and errors.iloc[:-1].isna().all()
+    case &= "RuntimeError: feed glitch" in errors.iloc[-1] and folds["Fold"].tolist() == list(range(len(folds)))
+    case &= len(equity) == 400 and equity.index[-1] == df.index[899] and "Return [%]" in oos
+    print(f"   last fold raises: Error row, {len(folds) - 1} folds stitched {'ok' if case else 'FAIL'}")
+    return case
+
+
+if __name__ == "__main__":
+    ok = verify_folds()
+    ok &= verify_stitch()
+    ok &= verify_short_test_windows()
+    ok &= verify_failing_fold()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)
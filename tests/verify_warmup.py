@@ -0,0 +1,160 @@
+import sys
+import os
+import io
+import time
+import tempfile
+from datetime import datetime
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+# --- START HERE ---
+import pandas as pd
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+from backtesting import Backtest
+
+import backtest_settings as settings
+from core.resample import resample_bars
+from core.warmup import lookback_bars, measure_lookback, warmup_start, with_warmup, trim_warmup
+from strategies import SmaCross, BollingerReversion, LrcReversion, MacdCross
+from verify_resample import extended_minutes, session
+
+# Warm-up history derived from strategy lookbacks: declared max_lookback()
+# against the lookback measured from the indicators, the fetch start found on
+# the trading calendar for minute to weekly bars (enough bars, not many more),
+# a backtest whose first decision is on the start bar with stats from there on,
+# and a SINGLE run through the engine doing the same. Last, the dead bars of a
+# run without warm-up vs. the extra bars fetched for it.
+
+START = datetime(2024, 3, 1)
+
+
+def verify_lookbacks():
+    ok = True
+    cases = [(SmaCross, {}), (SmaCross, {"n1": 30, "n2": 90}), (BollingerReversion, {}),
+             (BollingerReversion, {"bb_period": 20}), (LrcReversion, {}), (LrcReversion, {"lrc_window": 90})]
+    for cls, params in cases:
+        declared = lookback_bars(cls, params)
+        measured = measure_lookback(cls, tuple(sorted(params.items())))
+        case = declared == measured
+        print(f"   {cls.__name__}{params or ''}: declared {declared}, measured {measured} {'ok' if case else 'FAIL'}")
+        ok &= case
+    # No declaration: measured
+    case = lookback_bars(MacdCross, {}) == measure_lookback(MacdCross, ())
+    print(f"   MacdCross: measured {lookback_bars(MacdCross, {})} {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_fetch_start():
+    ok = True
+    minutes = session(extended_minutes("2023-06-01", 200))
+    for timeframe, bars in [(TimeFrame.Minute, 1_000), (TimeFrame.Hour, 238), (TimeFrame(4, TimeFrameUnit.Hour), 40),
+                            (TimeFrame.Day, 49), (TimeFrame.Week, 19)]:
+        df = minutes if timeframe.value == "1Min" else resample_bars(minutes, timeframe)
+        first = pd.Timestamp(warmup_start(START, bars, timeframe), tz="America/New_York")
+        before = ((df.index >= first) & (df.index < pd.Timestamp(START, tz="America/New_York"))).sum()
+        # At least bars + 1, at most two weeks' worth more (bars per session are a lower bound)
+        per_week = {"1Min": 1_955, "1Hour": 35, "4Hour": 15, "1Day": 5, "1Week": 1}[timeframe.value]
+        case = bars + 1 <= before <= bars + 1 + 2 * per_week
+        print(f"   {timeframe.value}: {bars} bars -> from {first:%Y-%m-%d}, {before} bars before the start "
+              f"{'ok' if case else 'FAIL'}")
+        ok &= case
+    return ok
+
+
+def _first_decision(stats):
+    """Index of the first bar next() ran on."""
+    return 1 + stats._strategy.warmup_bars()
+
+
+def verify_backtest():
+    hours = resample_bars(session(extended_minutes("2023-06-01", 250, seed=3)), TimeFrame.Hour).tz_localize(None)
+    bars = lookback_bars(LrcReversion, {})
+    df = with_warmup(hours[hours.index >= warmup_start(START, bars, TimeFrame.Hour)], START, bars)
+    with redirect_stdout(io.StringIO()):
+        raw = Backtest(df, LrcReversion, cash=50_000, finalize_trades=True).run()
+    stats = trim_warmup(raw, df, START)
+    start_bar = df.index[df.index.searchsorted(START)]
+    case = df.index[_first_decision(raw)] == start_bar and stats["Start"] == start_bar
+    case &= stats["Return [%]"] == raw["Return [%]"] and stats["# Trades"] == raw["# Trades"]
+    case &= (stats._trades["EntryTime"] >= start_bar).all() and (stats._trades["EntryBar"] >= 0).all()
+    case &= len(stats._equity_curve) == len(df) - _first_decision(raw) and list(stats.index) == list(raw.index)
+    print(f"   LrcReversion: {bars + 1} bars before {START:%Y-%m-%d}, first decision on {start_bar}, "
+          f"{stats['# Trades']} trades, stats from the start {'ok' if case else 'FAIL'}")
+    ok = case
+
+    # Nothing before the start: next() runs from the start bar on, nothing to trim
+    with redirect_stdout(io.StringIO()):
+        cold = Backtest(hours[hours.index >= START], LrcReversion, cash=50_000, finalize_trades=True).run()
+    case = trim_warmup(cold, hours[hours.index >= START], START) is cold
+    print(f"   no warm-up bars: stats unchanged {'ok' if case else 'FAIL'}")
+    return ok & case
+
+
+def verify_engine():
+    """SINGLE mode on a fake feed: warm-up fetched, report and log row from START_DATE."""
+    import main
+    from verify_coverage import data_manager
+    from verify_downloader import FakeClient
+
+    saved = {name: getattr(settings, name) for name in ("SINGLE_SYMBOL", "START_DATE", "END_DATE", "TIMEFRAME",
+                                                          "STRATEGY_PARAMS", "WARMUP", "CHUNKED")}
+    settings.SINGLE_SYMBOL, settings.START_DATE, settings.END_DATE = "AAA", START, datetime(2024, 4, 1)
+    settings.TIMEFRAME, settings.STRATEGY_PARAMS, settings.CHUNKED = TimeFrame.Hour, {}, False
+    rows = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for warmup in (False, True):
+                settings.WARMUP = warmup
+                with redirect_stdout(io.StringIO()):
+                    engine = main.BacktestEngine(SmaCross)
+                    engine.dm.close()
+                    engine.dm = data_manager(tmp, FakeClient())
+                    engine.output_dir = os.path.join(tmp, f"output{int(warmup)}")
+                    df = engine._load_frame("AAA", warmup=True)
+                    rows[warmup] = engine._process_symbol("AAA", log=False)
+                    engine.dm.close()
+                rows[warmup]["bars_before"] = int((df.index < START).sum())
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+    bars = lookback_bars(SmaCross, {})
+    case = rows[False]["bars_before"] == 0 and rows[True]["bars_before"] == bars + 1
+    case &= rows[True]["Start"] == rows[False]["Start"] == START.strftime("%Y-%m-%d")
+    print(f"   engine: {rows[True]['bars_before']} warm-up bars fetched, report from {rows[True]['Start']} "
+          f"{'ok' if case else 'FAIL'}")
+    return case
+
+
+def benchmark():
+    """Bars of the requested range lost to warm-up without it, and history fetched with it."""
+    hours = resample_bars(session(extended_minutes("2023-06-01", 250, seed=3)), TimeFrame.Hour).tz_localize(None)
+    in_range = hours[hours.index >= START]
+    print()
+    for cls in (SmaCross, BollingerReversion, LrcReversion):
+        bars = lookback_bars(cls, {})
+        t0 = time.perf_counter()
+        first = warmup_start(START, bars, TimeFrame.Hour)
+        t1 = time.perf_counter()
+        fetched = ((hours.index >= first) & (hours.index < START)).sum()
+        with redirect_stdout(io.StringIO()):
+            cold = Backtest(in_range, cls, cash=50_000, finalize_trades=True).run()
+        dead = _first_decision(cold)
+        print(f"{cls.__name__:<20} without warm-up: first decision on {in_range.index[dead]:%Y-%m-%d} "
+              f"({dead} dead bars) | with: {fetched} extra bars fetched ({fetched - bars - 1} trimmed), "
+              f"start found in {(t1 - t0) * 1000:.1f} ms")
+    return True
+
+
+if __name__ == "__main__":
+    ok = verify_lookbacks()
+    ok &= verify_fetch_start()
+    ok &= verify_backtest()
+    ok &= verify_engine()
+    ok &= benchmark()
+    print("\nPASS" if ok else "\nFAIL")
+    sys.exit(0 if ok else 1)